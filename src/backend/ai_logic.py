@@ -5,7 +5,8 @@ AI player logic for the Doppelkopf web application.
 
 import os
 import sys
-import threading
+import time
+import functools
 
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -14,11 +15,46 @@ from src.reinforcementlearning.agents.random_agent import select_random_action
 from src.reinforcementlearning.agents.rl_agent import RLAgent
 
 from src.backend.game.doppelkopf import (
-    get_card_value, get_state_size, get_action_size, cards_equal
+    get_card_value, get_state_size, get_action_size, cards_equal, get_legal_actions, set_variant
 )
-from src.backend.config import games, MODEL_PATH
+from src.backend.config import games, MODEL_PATH, args
+from src.backend.model_registry import registry as model_registry, load_policy
+from src.backend.seat_policies import SeatPolicyExperiment
+from src.backend.ai_workers import AIWorkerPool
 from src.backend.game_state import print_scoreboard, check_team_revelation, get_game_state, generate_round_summary, update_scoreboard_for_game_over, card_to_dict
 
+# Seconds from the start of an AI decision until the next move, so each card stays visible
+AI_MOVE_DELAY = 0.5
+
+# Serve the checkpoint itself instead of its exported artifact if requested
+if args.eager_model:
+    model_registry.loader = functools.partial(load_policy, prefer_optimized=False)
+
+# Run the AI turns off the request handlers; worker processes are forked before any other thread starts
+think_time = args.ai_think_ms / 1000
+ai_workers = AIWorkerPool(args.ai_workers, args.ai_worker_mode, loader=model_registry.loader,
+                          q_cache_size=args.q_cache_size, think_time=think_time)
+
+# Cache the Q-values of recurring observations if requested
+if args.q_cache_size > 0:
+    model_registry.enable_cache(args.q_cache_size)
+
+# Batch the forward passes of all tables if requested
+if args.inference_batch_size > 1:
+    model_registry.enable_batching(args.inference_batch_size, args.inference_wait_us)
+
+# Swap in rewritten checkpoints without a restart
+if args.model_watch_interval > 0:
+    model_registry.watch(args.model_watch_interval)
+
+# Resolve the policies of the AI seats once for all games
+if args.seat_config:
+    seat_experiment = SeatPolicyExperiment.from_file(args.seat_config, 4 - args.human, model_registry,
+                                                     think_time=think_time)
+else:
+    seat_experiment = SeatPolicyExperiment.default(MODEL_PATH, 4 - args.human, model_registry,
+                                                   think_time=think_time)
+
 def handle_trick_completion(socketio, game_id, game):
     """Handle the completion of a trick."""
     if game.get('trick_winner') is None:
@@ -76,99 +112,62 @@ def handle_trick_completion(socketio, game_id, game):
     return True
 
 def initialize_ai_agents(socketio, game, game_id):
-    """Initialize AI agents for the game based on number of human players."""
+    """
+    Initialize AI agents for the game from the seat-policy experiment.
+
+    Returns:
+        Tuple of (the agents of the AI seats, the game's policy assignment with its 'arm' and
+        the policy spec of each AI seat in 'seats')
+    """
     from src.backend.config import args
     ai_agents = []
-    num_ai_players = 4 - args.human  # Total players (4) minus human players
     
     # Send progress update to all clients
     socketio.emit('progress_update', {'step': 'model_loading_start', 'message': 'Loading AI model...'})
     print(f"Sending progress update: model_loading_start")
     
-    # First AI player (index 1) uses the RL model
-    try:
-        # Send detailed progress update
-        socketio.emit('progress_update', {'step': 'model_loading_details', 'message': f'Loading model from {MODEL_PATH}...'})
-        print(f"Sending progress update: model_loading_details")
-        
-        # Create the RL agent
-        rl_agent = RLAgent(get_state_size(), get_action_size())
-        
-        # Load the model with a timeout to prevent hanging
-        print(f"Loading model from {MODEL_PATH}...")
-        
-        # Check if the model file exists
-        if not os.path.exists(MODEL_PATH):
-            print(f"Model file not found: {MODEL_PATH}")
-            print("Creating a dummy model for testing...")
-            
-            # Create a dummy model for testing
-            dummy_agent = RLAgent(get_state_size(), get_action_size())
-            os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-            dummy_agent.save(MODEL_PATH)
-            print(f"Created dummy model at {MODEL_PATH}")
-        
-        # Set a flag to track if model loading is complete
-        model_loaded = False
-        
-        # Define a function to load the model with a timeout
-        def load_model_with_timeout():
-            nonlocal model_loaded
-            try:
-                print(f"Thread starting to load model from {MODEL_PATH}")
-                rl_agent.load(MODEL_PATH)
-                model_loaded = True
-                print(f"Model loading completed successfully")
-                # Send success update
-                socketio.emit('progress_update', {'step': 'model_loading_success', 'message': 'Model loaded successfully!'})
-                print(f"Sending progress update: model_loading_success")
-            except Exception as e:
-                print(f"ERROR IN MODEL LOADING: {str(e)}")
-                print(f"Error type: {type(e).__name__}")
-                print(f"Error details: {e}")
-                import traceback
-                traceback.print_exc()
-                raise e
-        
-        # Start model loading in a separate thread
-        model_thread = threading.Thread(target=load_model_with_timeout)
-        model_thread.daemon = True
-        model_thread.start()
-        
-        # Wait for the model to load with a timeout
-        model_thread.join(timeout=5)  # 5 second timeout
-        
-        # Check if model loading completed
-        if not model_loaded:
-            print("Model loading timed out after 5 seconds")
-            raise TimeoutError("Model loading timed out")
+    # Check if the model file exists
+    if not os.path.exists(MODEL_PATH):
+        print(f"Model file not found: {MODEL_PATH}")
+        print("Creating a dummy model for testing...")
         
-        # Add the agent to the list
-        ai_agents.append(rl_agent.select_action)
-        print(f"Loaded RL model from {MODEL_PATH} for player 1")
-        
-        # Send success update
-        socketio.emit('progress_update', {'step': 'model_loading_success', 'message': 'Model loaded successfully!'})
-        print(f"Sending progress update: model_loading_success")
-    except Exception as e:
-        error_msg = f"Error loading RL model: {e}"
-        print(error_msg)
-        print("Using random agent for player 1 instead")
-        ai_agents.append(select_random_action)
-        
-        # Send error update
-        socketio.emit('progress_update', {'step': 'model_loading_error', 'message': error_msg}, room=game_id)
-        socketio.emit('progress_update', {'step': 'model_loading_fallback', 'message': 'Falling back to random agent...'}, room=game_id)
+        # Create a dummy model for testing
+        dummy_agent = RLAgent(get_state_size(), get_action_size())
+        os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+        dummy_agent.save(MODEL_PATH)
+        print(f"Created dummy model at {MODEL_PATH}")
+    
+    # Draw the arm of the experiment this game plays
+    arm = seat_experiment.assign()
+    assignment = {'arm': arm.name, 'seats': {}}
+    print(f"Game {game_id} plays arm '{arm.name}' of the seat-policy experiment")
     
-    # Send progress update for next steps
-    socketio.emit('progress_update', {'step': 'setup_other_agents', 'message': 'Setting up other AI players...'}, room=game_id)
+    for i, spec in enumerate(arm.seats):
+        player_idx = args.human + i
+        try:
+            # Send detailed progress update
+            socketio.emit('progress_update', {'step': 'model_loading_details', 'message': f'Setting up {spec} for player {player_idx}...'})
+            
+            # Model policies are handles on the registry's shared model
+            ai_agents.append(seat_experiment.create_policy(spec))
+            assignment['seats'][player_idx] = spec
+            print(f"Using {spec} for player {player_idx}")
+        except Exception as e:
+            error_msg = f"Error setting up {spec}: {e}"
+            print(error_msg)
+            print(f"Using random agent for player {player_idx} instead")
+            ai_agents.append(select_random_action)
+            assignment['seats'][player_idx] = 'random'
+            
+            # Send error update
+            socketio.emit('progress_update', {'step': 'model_loading_error', 'message': error_msg}, room=game_id)
+            socketio.emit('progress_update', {'step': 'model_loading_fallback', 'message': 'Falling back to random agent...'}, room=game_id)
     
-    # Add random agents for remaining AI players
-    remaining_agents = num_ai_players - 1 if len(ai_agents) == 1 else num_ai_players
-    for i in range(remaining_agents):
-        ai_agents.append(select_random_action)
+    # Send success update
+    socketio.emit('progress_update', {'step': 'model_loading_success', 'message': 'AI players ready!'})
+    print(f"Sending progress update: model_loading_success")
     
-    return ai_agents
+    return ai_agents, assignment
 
 def ai_play_turn(socketio, game_id):
     """Have AI players take their turns."""
@@ -219,14 +218,16 @@ def ai_play_turn(socketio, game_id):
         agent = ai_agents[ai_idx]
         
         # Handle both class-based and function-based agents
+        think_start = time.perf_counter()
         try:
-            if hasattr(agent, 'select_action'):
-                action_result = agent.select_action(game, current_player)
-            else:
-                action_result = agent(game, current_player)
+            spec = game_data.get('policy_assignment', {}).get('seats', {}).get(current_player, 'random')
+            action_result, search = ai_workers.decide(agent, spec, game, current_player)
             
             # Debug output to help diagnose AI actions
             print(f"AI player {current_player} selected action: {action_result}")
+            if search:
+                print(f"AI player {current_player} searched {search['samples']} deals "
+                      f"in {search['elapsed_ms']:.0f} ms")
         except Exception as e:
             print(f"Error in AI action selection: {str(e)}")
             # Fallback to random action if there's an error
@@ -282,8 +283,9 @@ def ai_play_turn(socketio, game_id):
         # Print scoreboard after each AI move
         print_scoreboard("After AI Move", game)
         
-        # Wait for 0.5 seconds after each card is played (only in web interface)
-        socketio.sleep(0.5)
+        # Wait until 0.5 seconds have passed since the AI started thinking about this card (only in
+        # web interface), so search time is spent inside the move animation rather than added to it
+        socketio.sleep(max(0.0, AI_MOVE_DELAY - (time.perf_counter() - think_start)))
         
         # If a trick was completed, pause to show it
         if game.get('trick_winner') is not None:
@@ -306,3 +308,57 @@ def ai_play_turn(socketio, game_id):
             
             # Emit a game state update to reflect the cleared trick
             socketio.emit('game_update', get_game_state(game_id), room=game_id)
+
+def choose_ai_variants(socketio, game_id):
+    """Have the AI players choose their variants in sequence until it's the human player's turn."""
+    game = games[game_id]['game']
+    while game['variant_selection_phase'] and game['current_player'] != 0:
+        current_player = game['current_player']
+        
+        # Emit an event to show the variant selection animation for this AI player
+        socketio.emit('ai_selecting_variant', {
+            'player': current_player,
+            'variant': 'normal'
+        })
+        
+        # Add a small delay to allow the animation to be visible
+        socketio.sleep(0.5)
+        
+        # Set the variant for the AI player
+        set_variant(game, 'normal', current_player)
+        
+        if 'player_variants' not in games[game_id]:
+            games[game_id]['player_variants'] = {}
+        games[game_id]['player_variants'][current_player] = 'normal'
+        
+        # Update the game state for the client
+        socketio.emit('game_update', get_game_state(game_id), room=game_id)
+
+def run_ai_turns(socketio, game_id):
+    """
+    Play the AI players' part of a game until it's the human player's turn again.
+
+    Runs as a task of the AI worker pool after a request handler has applied the human's action:
+    the AI players choose their variants or play their cards, and the final state, with the
+    human player's legal cards, is emitted to the game room.
+    """
+    if game_id not in games:
+        return
+    game = games[game_id]['game']
+    
+    if game['variant_selection_phase']:
+        choose_ai_variants(socketio, game_id)
+    if not game['variant_selection_phase'] and game['current_player'] != 0:
+        ai_play_turn(socketio, game_id)
+    
+    # Set legal actions for the player if it's their turn
+    if not game['variant_selection_phase'] and game['current_player'] == 0:
+        game['legal_actions'] = get_legal_actions(game, 0)
+        print(f"Setting legal actions for player after AI turns: {game['legal_actions']}")
+    
+    # Check if game is over and update scoreboard
+    if game['game_over']:
+        generate_round_summary(game_id)
+        update_scoreboard_for_game_over(game_id)
+    
+    socketio.emit('game_update', get_game_state(game_id), room=game_id)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Worker pool for the AI turns of the Doppelkopf web application.
+
+Request handlers only validate and apply the human's action and then queue the AI players'
+turns of the game here. Each game has its own FIFO queue, so the turns of one table never run
+concurrently or out of order, while different tables run in parallel on a fixed number of
+worker threads. The threads also do the socket emits and the pauses between AI moves, so no
+request handler sleeps.
+
+In 'thread' mode the AI decisions run on the worker threads with the game's own agents. In
+'process' mode they run in a pool of worker processes, which keeps CPU-bound searches from
+competing for the web server's interpreter lock. A worker process resolves the seat's policy
+spec itself and creates a new policy for every decision. An 'rl' seat still plays the checkpoint
+version its game was given: the decision carries the version's (path, mtime), and the process
+loads exactly that version, from the file while it is unchanged and otherwise from a snapshot of
+the server's copy. New games thus pick up a reloaded checkpoint, and running games keep theirs.
+Each process has its own Q-value cache; inference batching needs the threads and is not
+available in 'process' mode.
+"""
+
+import io
+import os
+import sys
+import threading
+import multiprocessing
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.reinforcementlearning.doppelkopf_game import GameStateView
+
+# Where the AI decisions run
+WORKER_MODES = ('thread', 'process')
+
+# Checkpoint versions a decision process keeps loaded for the games pinned to them
+PINNED_VERSIONS_PER_PROCESS = 8
+
+# Answer of a decision process that has neither the pinned version nor its file
+VERSION_MISSING = 'version-missing'
+
+# Policy settings, registry, policy factories and pinned versions of a decision process, set by its initializer
+_process_options = {}
+_process_registry = None
+_process_factories = {}
+_process_versions = OrderedDict()
+
+def _init_decision_process(loader, options, q_cache_size):
+    """Prepare a decision process: one torch thread each, since the processes run in parallel."""
+    global _process_options, _process_registry
+    import torch
+    from src.backend.model_registry import ModelRegistry
+
+    torch.set_num_threads(1)
+    _process_options = options
+    _process_registry = ModelRegistry(loader=loader) if loader is not None else ModelRegistry()
+    if q_cache_size > 0:
+        _process_registry.enable_cache(q_cache_size)
+
+def _snapshot(model):
+    """Serialize the network of a LoadedModel for a decision process; returns (kind, bytes)."""
+    import torch
+
+    # A batched policy wraps the loaded one
+    policy = getattr(model.policy, 'policy', model.policy)
+    buffer = io.BytesIO()
+    if isinstance(policy.network, torch.jit.ScriptModule):
+        torch.jit.save(policy.network, buffer)
+        return 'script', buffer.getvalue()
+    torch.save(policy.network.state_dict(), buffer)
+    return 'state_dict', buffer.getvalue()
+
+def _restore(version, snapshot):
+    """Load a snapshot of a checkpoint version into a LoadedModel of the process."""
+    import torch
+    from src.backend.model_registry import LoadedModel
+    from src.reinforcementlearning.agents.inference_policy import InferencePolicy
+
+    kind, data = snapshot
+    if kind == 'script':
+        policy = InferencePolicy(torch.jit.load(io.BytesIO(data), map_location='cpu'))
+    else:
+        policy = InferencePolicy.from_state_dict(torch.load(io.BytesIO(data), map_location='cpu'))
+    policy.cache = _process_registry.cache
+    policy.version = version
+    return LoadedModel(version[0], version[1], policy)
+
+def _pinned_model(version, snapshot):
+    """Get the LoadedModel of a checkpoint version, or None if the file no longer holds it."""
+    model = _process_versions.get(version)
+    if model is None:
+        if snapshot is not None:
+            model = _restore(version, snapshot)
+        else:
+            try:
+                model = _process_registry.get(version[0])
+            except OSError:
+                return None
+            if model.mtime != version[1]:
+                return None
+        _process_versions[version] = model
+        if len(_process_versions) > PINNED_VERSIONS_PER_PROCESS:
+            _process_versions.popitem(last=False)
+    _process_versions.move_to_end(version)
+    return model
+
+class _PinnedRegistry:
+    """Stands in for the registry when resolving a spec, handing out one pinned version."""
+
+    def __init__(self, model):
+        """
+        Initialize the stand-in.
+
+        Args:
+            model: The LoadedModel of the pinned version
+        """
+        self.model = model
+
+    def policy(self, path):
+        """Get a handle on the pinned version."""
+        from src.backend.model_registry import SeatPolicy
+
+        return SeatPolicy(self.model)
+
+def _decide_in_process(spec, version, snapshot, state, player_idx):
+    """
+    Select an action for a seat from its policy spec.
+
+    Args:
+        spec: The seat's policy spec
+        version: The (path, mtime) of the checkpoint the seat is pinned to, or None
+        snapshot: Snapshot of that version from _snapshot, or None to load it from its file
+        state: The game state dictionary
+        player_idx: Index of the player
+
+    Returns:
+        Tuple of (the action, the search statistics or None), or VERSION_MISSING if the
+        pinned version needs a snapshot
+    """
+    from src.backend.seat_policies import resolve_policy
+
+    if version is not None:
+        model = _pinned_model(version, snapshot)
+        if model is None:
+            return VERSION_MISSING
+        agent = resolve_policy(spec, _PinnedRegistry(model), **_process_options)()
+    else:
+        if spec not in _process_factories:
+            _process_factories[spec] = resolve_policy(spec, _process_registry, **_process_options)
+        agent = _process_factories[spec]()
+    return _select(agent, GameStateView(state), player_idx)
+
+def _seat_model(agent):
+    """Get the LoadedModel a seat's agent plays with, looking through an anytime search, or None."""
+    return getattr(getattr(agent, 'prior', agent), 'model', None)
+
+def _select(agent, game, player_idx):
+    """Ask an agent for its action; returns (action, search statistics or None)."""
+    if hasattr(agent, 'select_action'):
+        action = agent.select_action(game, player_idx)
+    else:
+        action = agent(game, player_idx)
+    return action, getattr(agent, 'last_search', None)
+
+class AIWorkerPool:
+    """Runs queued AI turns per game on worker threads, with decisions on threads or processes."""
+
+    def __init__(self, num_workers=4, mode='thread', loader=None, q_cache_size=0, **options):
+        """
+        Initialize the pool.
+
+        Args:
+            num_workers: Number of games whose AI turns run at the same time, and of decision
+                processes in 'process' mode
+            mode: 'thread' or 'process', where the AI decisions run
+            loader: Function that loads a checkpoint path into a policy in the decision
+                processes, or None for the registry's default
+            q_cache_size: Size of the Q-value cache of each decision process (0 disables it)
+            **options: Settings of the policy types, passed to resolve_policy in the decision processes
+
+        Raises:
+            ValueError: If the mode is unknown or there are no workers
+        """
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Unknown AI worker mode '{mode}' (known: {', '.join(WORKER_MODES)})")
+        if num_workers < 1:
+            raise ValueError("The AI worker pool needs at least one worker")
+
+        self.mode = mode
+        self.num_workers = num_workers
+        self._threads = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix='ai-turns')
+        self._processes = None
+        if mode == 'process':
+            # Fork so that the processes need not re-import the web application
+            self._processes = ProcessPoolExecutor(max_workers=num_workers,
+                                                  mp_context=multiprocessing.get_context('fork'),
+                                                  initializer=_init_decision_process,
+                                                  initargs=(loader, options, q_cache_size))
+            # Start the processes now, before the server starts its own threads
+            self._processes.submit(os.getpid).result()
+        # Game ID -> deque of (function, args, future) of its queued tasks; present while the game is busy
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._failed = 0
+
+    def submit(self, game_id, fn, *args):
+        """
+        Queue a task of a game, to run after the game's earlier tasks.
+
+        Args:
+            game_id: The ID of the game
+            fn: The function to run on a worker thread
+            *args: Arguments of the function
+
+        Returns:
+            A Future of the function's result
+        """
+        future = Future()
+        with self._lock:
+            queue = self._queues.get(game_id)
+            start = queue is None
+            if start:
+                queue = self._queues[game_id] = deque()
+            queue.append((fn, args, future))
+        # One worker drains a game's queue at a time, so its tasks stay in order
+        if start:
+            self._threads.submit(self._drain, game_id)
+        return future
+
+    def _drain(self, game_id):
+        """Run the queued tasks of a game until its queue is empty."""
+        while True:
+            with self._lock:
+                queue = self._queues[game_id]
+                if not queue:
+                    del self._queues[game_id]
+                    return
+                fn, args, future = queue[0]
+            try:
+                result = fn(*args)
+            except Exception as e:
+                print(f"Error in AI task of game {game_id}: {e}")
+                with self._lock:
+                    self._failed += 1
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    self._completed += 1
+                future.set_result(result)
+            # The task stays queued while it runs, so that the game counts as busy
+            with self._lock:
+                queue.popleft()
+
+    def busy(self, game_id):
+        """
+        Check whether a game has AI tasks queued or running.
+
+        Args:
+            game_id: The ID of the game
+
+        Returns:
+            True if the game's AI players are not done yet
+        """
+        with self._lock:
+            return game_id in self._queues
+
+    def decide(self, agent, spec, game, player_idx):
+        """
+        Select the action of an AI seat, on the calling thread or in a decision process.
+
+        Args:
+            agent: The seat's agent; in 'process' mode only its checkpoint version is used
+            spec: The seat's policy spec, used in 'process' mode
+            game: The game state dictionary
+            player_idx: Index of the player
+
+        Returns:
+            Tuple of (the action, the search statistics of an anytime policy or None)
+        """
+        if self._processes is None:
+            return _select(agent, GameStateView(game), player_idx)
+        model = _seat_model(agent)
+        version = (model.path, model.mtime) if model is not None else None
+        result = self._processes.submit(_decide_in_process, spec, version, None, game, player_idx).result()
+        if result == VERSION_MISSING:
+            # The checkpoint was rewritten since the game started; send the game's version along
+            result = self._processes.submit(_decide_in_process, spec, version, _snapshot(model),
+                                            game, player_idx).result()
+        return result
+
+    def stats(self):
+        """
+        Get the pool statistics.
+
+        Returns:
+            Dictionary with the mode, the number of workers, the number of busy games and the
+            numbers of completed and failed tasks
+        """
+        with self._lock:
+            return {'mode': self.mode, 'workers': self.num_workers, 'busy_games': len(self._queues),
+                    'completed': self._completed, 'failed': self._failed}
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers.
+
+        Args:
+            wait: Whether to wait for the queued tasks to finish
+        """
+        self._threads.shutdown(wait=wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
@@ -32,6 +32,26 @@ def parse_arguments():
                         help='Number of human players (1-4)')
     parser.add_argument('--human-settings', type=str, default='first',
                         help='Where to place human player(s): "first" or "random" (default: first)')
+    parser.add_argument('--inference-batch-size', type=int, default=0,
+                        help='Batch the AI forward passes of all tables up to this size (default: 0, off)')
+    parser.add_argument('--inference-wait-us', type=int, default=1000,
+                        help='Microseconds to wait for more AI decisions before running a batch (default: 1000)')
+    parser.add_argument('--q-cache-size', type=int, default=0,
+                        help='Cache the Q-values of up to this many observations (default: 0, off)')
+    parser.add_argument('--model-watch-interval', type=float, default=10.0,
+                        help='Seconds between checks for a rewritten model file (default: 10, 0 disables)')
+    parser.add_argument('--admin-token', type=str, default=None,
+                        help='Token required by the admin endpoints (default: none, local requests only)')
+    parser.add_argument('--seat-config', type=str, default=None,
+                        help='JSON file with weighted arms of AI seat policies (default: model in the first AI seat, random in the others)')
+    parser.add_argument('--ai-think-ms', type=int, default=350,
+                        help='Search time per move of anytime AI seats, within the 500 ms move animation (default: 350)')
+    parser.add_argument('--ai-workers', type=int, default=4,
+                        help='Number of games whose AI turns run at the same time (default: 4)')
+    parser.add_argument('--ai-worker-mode', type=str, default='thread', choices=['thread', 'process'],
+                        help='Run the AI decisions on the worker threads or in worker processes (default: thread)')
+    parser.add_argument('--eager-model', action='store_true',
+                        help='Serve the checkpoint itself even if an exported TorchScript artifact exists')
     args = parser.parse_args()
     
     # Validate human players argument
@@ -41,12 +61,17 @@ def parse_arguments():
     # Validate human-settings argument
     if args.human_settings not in ['first', 'random']:
         parser.error('Human-settings must be either "first" or "random"')
+
+    # Batching collects the decisions of concurrent threads, which process mode does not have
+    if args.ai_worker_mode == 'process' and args.inference_batch_size > 1:
+        parser.error('--inference-batch-size cannot be combined with --ai-worker-mode process')
         
     return args
 
 # Parse and validate command line arguments
 args = parse_arguments()
 MODEL_PATH = args.model
+ADMIN_TOKEN = args.admin_token
 
 # Configure Flask paths
 TEMPLATE_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '../frontend/templates'))
@@ -299,12 +299,7 @@ def create_game_state() -> Dict:
     }
     
     # Create a deck of cards (2 copies of each card)
-    for suit in [SUIT_CLUBS, SUIT_SPADES, SUIT_HEARTS, SUIT_DIAMONDS]:
-        for rank in [RANK_NINE, RANK_JACK, RANK_QUEEN, RANK_KING, RANK_TEN, RANK_ACE]:
-            # Skip Nine cards
-            if rank != RANK_NINE:
-                state['deck'].append(create_card(suit, rank, False))
-                state['deck'].append(create_card(suit, rank, True))
+    state['deck'] = create_deck()
     
     # Deal cards
     deal_cards(state)
@@ -317,6 +312,22 @@ def create_game_state() -> Dict:
     
     return state
 
+def create_deck() -> List[Dict]:
+    """
+    Create an unshuffled deck with two copies of each card.
+    
+    Returns:
+        The list of cards in the deck
+    """
+    deck = []
+    for suit in [SUIT_CLUBS, SUIT_SPADES, SUIT_HEARTS, SUIT_DIAMONDS]:
+        for rank in [RANK_NINE, RANK_JACK, RANK_QUEEN, RANK_KING, RANK_TEN, RANK_ACE]:
+            # Skip Nine cards
+            if rank != RANK_NINE:
+                deck.append(create_card(suit, rank, False))
+                deck.append(create_card(suit, rank, True))
+    return deck
+
 def deal_cards(state: Dict) -> None:
     """
     Deal cards to players.
@@ -1066,30 +1077,68 @@ def get_state_for_player(state: Dict, player_idx: int) -> List[float]:
         played_repr[card_idx] = 1
     state_repr.extend(played_repr)
     
+    # Add variant, team, current player, scores and announcements
+    state_repr.extend(get_context_features(state, player_idx))
+    
+    return state_repr
+
+def get_context_features(state: Dict, player_idx: int) -> List[float]:
+    """
+    Get the non-card features of a player's state representation.
+    
+    Args:
+        state: The game state
+        player_idx: Index of the player
+        
+    Returns:
+        A list of 17 floats: variant, team and current player (one-hot), scores and announcements
+    """
+    context = []
+    
     # Add game variant
     variant_repr = [0] * 6  # 6 possible variants
     variant_repr[state['game_variant'] - 1] = 1  # -1 because variants start at 1
-    state_repr.extend(variant_repr)
+    context.extend(variant_repr)
     
     # Add player's team
     team_repr = [0] * 3  # 3 possible teams
     team_repr[state['teams'][player_idx] - 1] = 1  # -1 because teams start at 1
-    state_repr.extend(team_repr)
+    context.extend(team_repr)
     
     # Add current player
     current_player_repr = [0] * 4  # 4 players
     current_player_repr[state['current_player']] = 1
-    state_repr.extend(current_player_repr)
+    context.extend(current_player_repr)
     
     # Add scores
-    state_repr.append(state['scores'][0] / 240.0)  # Normalize RE score
-    state_repr.append(state['scores'][1] / 240.0)  # Normalize KONTRA score
+    context.append(state['scores'][0] / 240.0)  # Normalize RE score
+    context.append(state['scores'][1] / 240.0)  # Normalize KONTRA score
     
     # Add announcements
-    state_repr.append(1.0 if state.get('re_announced', False) else 0.0)
-    state_repr.append(1.0 if state.get('contra_announced', False) else 0.0)
+    context.append(1.0 if state.get('re_announced', False) else 0.0)
+    context.append(1.0 if state.get('contra_announced', False) else 0.0)
     
-    return state_repr
+    return context
+
+def get_compact_state_for_player(state: Dict, player_idx: int) -> Dict[str, List]:
+    """
+    Get a compact state representation for a specific player.
+    Instead of one-hot planes, the cards are given as lists of card indices.
+    
+    Args:
+        state: The game state
+        player_idx: Index of the player
+        
+    Returns:
+        A dictionary with the card indices of the 'hand', the current 'trick' and the
+        'played' cards, and the 'context' features of get_context_features
+    """
+    return {
+        'hand': [card_to_idx(card) for card in state['hands'][player_idx]],
+        'trick': [card_to_idx(card) for card in state['current_trick']],
+        'played': [card_to_idx(card) for past_trick in state['tricks'] for card in past_trick],
+        'context': get_context_features(state, player_idx)
+    }
 
 def card_to_idx(card: Dict) -> int:
     """
@@ -5,6 +5,7 @@ Game state management functions for the Doppelkopf web application.
 
 import os
 import sys
+import itertools
 
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -18,6 +19,11 @@ from src.backend.game.doppelkopf import (
     create_card, cards_equal, has_hochzeit
 )
 from src.backend.config import games, scoreboard
+from src.backend.seat_policies import experiment_stats
+
+# Sequence number of every state snapshot. The AI turns emit their snapshots while the response to
+# the human's action is on its way, so clients drop a snapshot older than the newest they have seen.
+_state_versions = itertools.count(1)
 
 def print_scoreboard(label, game=None):
     """Print the current scoreboard with a label."""
@@ -106,7 +112,8 @@ def get_game_state(game_id, player_id=0, player_idx=None):
         'can_announce_re': game['teams'][player_id] == TEAM_RE and (len(game['current_trick']) + sum(len(trick) for trick in game['tricks'])) < 5,
         'can_announce_contra': game['teams'][player_id] == TEAM_KONTRA and (len(game['current_trick']) + sum(len(trick) for trick in game['tricks'])) < 5,
         # Add card giver information
-        'card_giver': game['card_giver']
+        'card_giver': game['card_giver'],
+        'state_version': next(_state_versions)
     }
     
     # If the game is over, include the round summary
@@ -449,6 +456,10 @@ def update_scoreboard_for_game_over(game_id):
     else:
         scoreboard['ai_wins'] += 1
     
+    # Record the outcome for the seat-policy experiment
+    if 'policy_assignment' in game_data:
+        experiment_stats.record(game, game_data['policy_assignment'])
+    
     # Mark that scores have been updated for this game
     game_data['scores_updated'] = True
     
@@ -0,0 +1,56 @@
+"""
+Admin route handlers for the Doppelkopf web application.
+These let an operator swap in a new model without restarting the server.
+"""
+
+import os
+from flask import request, jsonify
+from src.backend.config import MODEL_PATH, ADMIN_TOKEN
+from src.backend.model_registry import registry as model_registry
+
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+def is_authorized():
+    """
+    Check whether the current request may use the admin endpoints.
+
+    Returns:
+        bool: True if the request carries the admin token, or comes from this machine when no
+        token is configured.
+    """
+    if ADMIN_TOKEN:
+        return request.headers.get('X-Admin-Token') == ADMIN_TOKEN
+    return request.remote_addr in LOCAL_ADDRESSES
+
+def reload_model(data):
+    """
+    Load the current version of the model file, validate it and swap it in for new games.
+    Games in progress keep playing with the version they started with.
+
+    Args:
+        data (dict): Optional 'model_path' of the checkpoint (default: the server's model); it
+            must be in the directory of the server's model.
+
+    Returns:
+        JSON: The version now in service, and the error if the new version was rejected.
+    """
+    if not is_authorized():
+        return jsonify({'error': 'Not authorized'}), 403
+
+    path = os.path.abspath((data or {}).get('model_path') or MODEL_PATH)
+    if os.path.dirname(path) != os.path.dirname(os.path.abspath(MODEL_PATH)):
+        return jsonify({'error': 'Models can only be loaded from the model directory'}), 400
+    if not os.path.exists(path):
+        return jsonify({'error': f'Model file not found: {path}'}), 404
+
+    try:
+        model = model_registry.reload(path)
+    except Exception as e:
+        return jsonify({'error': f'Could not load {path}: {e}'}), 500
+
+    stats = model_registry.stats().get(path, {})
+    return jsonify({
+        'model_path': path,
+        'mtime': model.mtime,
+        'rejected': stats.get('rejected')
+    })
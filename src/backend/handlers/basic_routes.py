@@ -6,6 +6,9 @@ These include the main page and model information.
 
 from flask import render_template, jsonify
 from src.backend.config import MODEL_PATH
+from src.backend.model_registry import registry as model_registry
+from src.backend.seat_policies import experiment_stats
+from src.backend.ai_logic import ai_workers
 
 def index():
     """Render the main game page."""
@@ -14,5 +17,9 @@ def index():
 def model_info():
     """Get information about the model being used."""
     return jsonify({
-        'model_path': MODEL_PATH
+        'model_path': MODEL_PATH,
+        'loaded_models': model_registry.stats(),
+        'q_cache': model_registry.cache_stats(),
+        'experiment': experiment_stats.summary(),
+        'ai_workers': ai_workers.stats()
     })
@@ -16,7 +16,7 @@ from src.backend.game_state import (
     get_game_state, check_team_revelation, 
     generate_round_summary, update_scoreboard_for_game_over
 )
-from src.backend.ai_logic import ai_play_turn, handle_trick_completion
+from src.backend.ai_logic import ai_workers, run_ai_turns, handle_trick_completion
 
 def set_variant_route(socketio, data):
     """Set the game variant."""
@@ -27,6 +27,10 @@ def set_variant_route(socketio, data):
     if game_id not in games:
         return jsonify({'error': 'Game not found'}), 404
     
+    # The AI players' task may be choosing their variants on this game right now
+    if ai_workers.busy(game_id):
+        return jsonify({'error': 'The AI players are still taking their turns'}), 409
+    
     game = games[game_id]['game']
     
     # Make sure we have player_variants initialized
@@ -45,51 +49,22 @@ def set_variant_route(socketio, data):
     # Make sure all players get the updated game state
     socketio.emit('game_update', get_game_state(game_id), room=game_id)
     
-    # If the variant selection phase is over, have AI play if it's not the player's turn
-    if not game['variant_selection_phase'] and game['current_player'] != 0:
-        ai_play_turn(socketio, game_id)
-    
-    # If we're still in variant selection phase and it's an AI player's turn,
-    # have all remaining AI players choose their variants in sequence
-    elif game['variant_selection_phase'] and game['current_player'] != 0:
-        # Have all remaining AI players choose their variants in sequence
-        while game['variant_selection_phase'] and game['current_player'] != 0:
-            current_player = game['current_player']
-            
-            # Emit an event to show the variant selection animation for this AI player
-            socketio.emit('ai_selecting_variant', {
-                'player': current_player,
-                'variant': 'normal'
-            })
-            
-            # Add a small delay to allow the animation to be visible
-            import time
-            time.sleep(0.5)
-            
-            # Set the variant for the AI player
-            set_variant(game, 'normal', current_player)
-            
-            if 'player_variants' not in games[game_id]:
-                games[game_id]['player_variants'] = {}
-            games[game_id]['player_variants'][current_player] = 'normal'
-            
-            # Update the game state for the client
-            socketio.emit('game_update', get_game_state(game_id), room=game_id)
-        
-        # If the variant selection phase is now over, have AI play if it's not the player's turn
-        if not game['variant_selection_phase'] and game['current_player'] != 0:
-            ai_play_turn(socketio, game_id)
-    
     # Set legal actions for the player if it's their turn
     if not game['variant_selection_phase'] and game['current_player'] == 0:
         game['legal_actions'] = get_legal_actions(game, 0)
         print(f"Setting legal actions for player: {game['legal_actions']}")
     
+    # Take the response state before the AI players act, then let them choose their variants
+    # and play off the request thread; their moves reach the client through the socket
+    state = get_game_state(game_id)
+    if game['current_player'] != 0:
+        ai_workers.submit(game_id, run_ai_turns, socketio, game_id)
+    
     return jsonify({
-        'state': get_game_state(game_id),
-        'variant_selection_phase': game['variant_selection_phase'],
-        'current_player': game['current_player'],
-        'game_variant': VARIANT_NAMES[game['game_variant']]
+        'state': state,
+        'variant_selection_phase': state['variant_selection_phase'],
+        'current_player': state['current_player'],
+        'game_variant': state['game_variant']
     })
 
 def play_card_route(socketio, data):
@@ -102,8 +77,8 @@ def play_card_route(socketio, data):
     
     game = games[game_id]['game']
     
-    # Check if it's the player's turn
-    if game['current_player'] != 0:
+    # Check if it's the player's turn and the AI players are done with the previous one
+    if game['current_player'] != 0 or ai_workers.busy(game_id):
         return jsonify({'error': 'Not your turn'}), 400
     
     # Find the card in the player's hand
@@ -149,13 +124,9 @@ def play_card_route(socketio, data):
         # Handle trick completion
         handle_trick_completion(socketio, game_id, game)
     
-    # Have AI players take their turns
-    ai_play_turn(socketio, game_id)
-    
-    # Set legal actions for the player if it's their turn
+    # Set legal actions for the player if it's still their turn
     if game['current_player'] == 0:
         game['legal_actions'] = get_legal_actions(game, 0)
-        print(f"Setting legal actions for player after AI turns: {game['legal_actions']}")
     
     # Check if game is over and update scoreboard
     if game['game_over']:
@@ -165,14 +136,15 @@ def play_card_route(socketio, data):
         # Update scoreboard
         update_scoreboard_for_game_over(game_id)
     
-    # Create a response object
+    # Create a response object with the state after the player's card
     response_data = {
         'state': get_game_state(game_id),
         'trick_completed': trick_completed,
         'trick_winner': trick_winner,
         'is_player_winner': trick_winner == 0 if trick_winner is not None else False,
         'trick_points': trick_points if trick_completed else 0,
-        'scoreboard': scoreboard
+        'scoreboard': scoreboard,
+        'ai_turns_pending': False
     }
     
     # If the game is over, include the player scores in the state and add a game summary
@@ -190,6 +162,11 @@ def play_card_route(socketio, data):
         # Add the round summary to the response
         response_data['game_summary'] = games[game_id]['game_summary']
     
+    # The AI players take their turns off the request thread; their moves reach the client through the socket
+    if not game['game_over'] and game['current_player'] != 0:
+        response_data['ai_turns_pending'] = True
+        ai_workers.submit(game_id, run_ai_turns, socketio, game_id)
+    
     return jsonify(response_data)
 
 def announce_route(socketio, data):
@@ -200,6 +177,10 @@ def announce_route(socketio, data):
     if game_id not in games:
         return jsonify({'error': 'Game not found'}), 404
     
+    # The AI players' task reads the announcement flags while it plays
+    if ai_workers.busy(game_id):
+        return jsonify({'error': 'The AI players are still taking their turns'}), 409
+    
     game_data = games[game_id]
     game = game_data['game']
     
@@ -58,7 +58,7 @@ def new_game(socketio):
     scoreboard['last_starting_player'] = next_starting_player
     
     # Initialize AI agents
-    ai_agents = initialize_ai_agents(socketio, game, game_id)
+    ai_agents, policy_assignment = initialize_ai_agents(socketio, game, game_id)
     
     # Send progress updates
     socketio.emit('progress_update', {'step': 'game_preparation', 'message': 'Preparing game state...'})
@@ -74,6 +74,7 @@ def new_game(socketio):
     games[game_id] = {
         'game': game,
         'ai_agents': ai_agents,
+        'policy_assignment': policy_assignment,  # Arm and policy of each AI seat, for the experiment stats
         'human_positions': human_positions,  # Store human player positions
         'last_trick': None,
         'last_trick_players': None,
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Micro-batching inference service for the AI seats of the Doppelkopf web application.
+
+AI decisions of all tables are submitted to one background worker as (observation,
+legal-action mask) requests. The worker waits for up to max_wait_us after the first request,
+or until max_batch_size requests are queued, runs a single forward pass for all of them and
+resolves each request's future with its best legal action.
+"""
+
+import os
+import sys
+import time
+import queue
+import random
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.reinforcementlearning.doppelkopf_game import as_game
+from src.reinforcementlearning.agents.rl_agent import legal_action_mask
+
+# Number of recent queue latencies kept for the percentiles in InferenceService.stats
+LATENCY_WINDOW = 10000
+
+class InferenceService:
+    """Batches concurrent forward passes of one network on a background thread."""
+
+    def __init__(self, network, max_batch_size=32, max_wait_us=1000, device=None):
+        """
+        Start the service.
+
+        Args:
+            network: The Q-network, in eval mode
+            max_batch_size: Largest number of requests answered by one forward pass
+            max_wait_us: Time in microseconds to wait for more requests after the first one
+            device: Device the network runs on
+        """
+        self.network = network
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        self.device = device or torch.device("cpu")
+
+        self._requests = queue.SimpleQueue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="inference-service", daemon=True)
+        self._worker.start()
+
+    def submit(self, observation, mask, return_q_values=False):
+        """
+        Request the best legal action for an observation.
+
+        Args:
+            observation: The observation
+            mask: Boolean mask of the legal actions over the network's outputs
+            return_q_values: Whether to also return the Q-values of all actions
+
+        Returns:
+            A Future that resolves to the index of the selected action, or to a tuple of the
+            index and the Q-values if return_q_values is set
+        """
+        if self._closed:
+            raise RuntimeError("The inference service is closed")
+        future = Future()
+        self._requests.put((np.asarray(observation, dtype=np.float32), np.array(mask, dtype=bool),
+                            time.perf_counter(), future, return_q_values))
+        return future
+
+    def close(self):
+        """Stop the worker once the queued requests are answered."""
+        if not self._closed:
+            self._closed = True
+            self._requests.put(None)
+            self._worker.join(timeout=5)
+
+    def stats(self):
+        """
+        Get the service metrics.
+
+        Returns:
+            Dictionary with the number of 'requests' and 'batches', the 'batch_sizes'
+            distribution (batch size -> count), and the 'mean', 'p50', 'p95' and 'max' queue
+            latency in microseconds over the most recent requests
+        """
+        with self._stats_lock:
+            batch_sizes = dict(self._batch_sizes)
+            latencies = np.array(self._latencies) * 1e6
+
+        stats = {
+            'requests': sum(size * count for size, count in batch_sizes.items()),
+            'batches': sum(batch_sizes.values()),
+            'batch_sizes': batch_sizes
+        }
+        if len(latencies):
+            stats.update(mean=float(latencies.mean()), p50=float(np.percentile(latencies, 50)),
+                         p95=float(np.percentile(latencies, 95)), max=float(latencies.max()))
+        return stats
+
+    def _run(self):
+        """Gather requests into batches and answer them until the service is closed."""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            batch = [request]
+
+            # Collect more requests until the batch is full or the wait time is over
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = self._requests.get(timeout=timeout) if timeout > 0 else self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+
+            self._answer(batch)
+            if stop:
+                return
+
+    def _answer(self, batch):
+        """Run one forward pass for a batch of requests and resolve their futures."""
+        start = time.perf_counter()
+        observations, masks, submitted, futures, return_q_values = zip(*batch)
+        try:
+            with torch.inference_mode():
+                q_values = self.network(torch.from_numpy(np.stack(observations)).to(self.device)).cpu()
+                mask = torch.from_numpy(np.stack(masks))
+                actions = q_values.masked_fill(~mask, float('-inf')).argmax(dim=1).tolist()
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for i, (future, action) in enumerate(zip(futures, actions)):
+            future.set_result((action, q_values[i].numpy()) if return_q_values[i] else action)
+
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._latencies.extend(start - t for t in submitted)
+
+class BatchedPolicy:
+    """
+    Selects actions like its InferencePolicy, but sends the forward passes to an InferenceService.
+    Forced moves, exploration and Q-values found in the policy's cache are decided on the
+    caller's thread without a request.
+    """
+
+    def __init__(self, policy, service, timeout=5.0):
+        """
+        Initialize the policy.
+
+        Args:
+            policy: The InferencePolicy whose network the service runs
+            service: The InferenceService
+            timeout: Seconds to wait for the service before raising
+        """
+        self.policy = policy
+        self.service = service
+        self.timeout = timeout
+
+    def select_action(self, game, player_idx):
+        """
+        Select an action for the given player.
+
+        Args:
+            game: The game instance or state dictionary
+            player_idx: Index of the player
+
+        Returns:
+            The selected action, as returned by InferencePolicy.select_action
+        """
+        game = as_game(game)
+        mask = legal_action_mask(game, player_idx, self.policy.action_size)
+        legal = np.flatnonzero(mask)
+        if len(legal) == 0:
+            return None
+        if len(legal) == 1:
+            return self.policy.action_from_index(game, player_idx, int(legal[0]))
+        if self.policy.epsilon > 0 and random.random() < self.policy.epsilon:
+            return self.policy.action_from_index(game, player_idx, int(random.choice(legal)))
+
+        observation = np.asarray(game.get_state_for_player(player_idx), dtype=np.float32)
+        cache = self.policy.cache
+        if cache is None:
+            action_idx = self.service.submit(observation, mask).result(timeout=self.timeout)
+            return self.policy.action_from_index(game, player_idx, action_idx)
+
+        key = cache.key(observation, self.policy.version)
+        q_values = cache.get(key)
+        if q_values is None:
+            future = self.service.submit(observation, mask, return_q_values=True)
+            action_idx, q_values = future.result(timeout=self.timeout)
+            cache.put(key, q_values)
+        else:
+            action_idx = int(np.where(mask, q_values, -np.inf).argmax())
+        return self.policy.action_from_index(game, player_idx, action_idx)
+
+    def __call__(self, game, player_idx):
+        """Allow the policy to be used like select_random_action."""
+        return self.select_action(game, player_idx)
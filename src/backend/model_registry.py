@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Process-wide model registry for the Doppelkopf web application.
+
+Each checkpoint is loaded once per process and shared by all games: entries are keyed by
+the checkpoint's path and modification time. A rewritten file is loaded and validated outside
+the registry lock, then swapped in atomically, so new games get the new version while games
+that already hold the previous version keep playing with it. A rewritten checkpoint is picked
+up by the next request, by the background watcher, or through ModelRegistry.reload.
+Games get a lightweight SeatPolicy handle per AI seat instead of their own agent. With
+batching enabled, the forward passes of all games go through one InferenceService per model.
+A checkpoint's exported TorchScript artifact (see training/export.py) is served instead of the
+checkpoint when it is at least as new and still matches it. An optional QValueCache shared by
+all models skips the forward pass for observations seen before; its entries are keyed by
+model version and dropped when a checkpoint is replaced.
+"""
+
+import os
+import sys
+import weakref
+import threading
+from collections import namedtuple
+
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.reinforcementlearning.agents.inference_policy import InferencePolicy
+from src.reinforcementlearning.agents.q_cache import QValueCache, DEFAULT_CACHE_SIZE
+from src.reinforcementlearning.training.export import (
+    artifact_path, load_artifact, load_eager_network, validate_artifact, reference_observations
+)
+from src.backend.inference_service import InferenceService, BatchedPolicy
+
+# A loaded checkpoint: its path, the modification time it was loaded at, and the policy
+LoadedModel = namedtuple('LoadedModel', ['path', 'mtime', 'policy'])
+
+# Number of observations a new version must answer before it is swapped in
+VALIDATION_OBSERVATIONS = 64
+
+# Seconds between two checks of the watcher for rewritten checkpoints
+DEFAULT_WATCH_INTERVAL = 10.0
+
+_validation_set = None
+
+def validate_policy(policy):
+    """
+    Check that a freshly loaded policy can serve: its network must produce a finite Q-value
+    for every action on a set of observations from random games.
+
+    Args:
+        policy: The loaded InferencePolicy
+
+    Raises:
+        ValueError: If the network's output has the wrong shape or is not finite
+    """
+    global _validation_set
+    if _validation_set is None:
+        _validation_set = reference_observations(VALIDATION_OBSERVATIONS)
+    observations, masks = _validation_set
+
+    with torch.inference_mode():
+        q_values = policy.network(torch.from_numpy(observations).to(policy.device))
+    if tuple(q_values.shape) != masks.shape:
+        raise ValueError(f"Expected Q-values of shape {masks.shape}, got {tuple(q_values.shape)}")
+    if not torch.isfinite(q_values).all():
+        raise ValueError("The network produces non-finite Q-values")
+
+def load_optimized_network(path):
+    """
+    Load the best exported artifact of a checkpoint, preferring int8 over float32.
+    Artifacts older than the checkpoint, or that no longer match it, are skipped.
+
+    Args:
+        path: Path of a model saved by RLAgent.save
+
+    Returns:
+        The artifact's module, or None if there is no usable artifact
+    """
+    reference = None
+    for quantized in (True, False):
+        candidate = artifact_path(path, quantized)
+        if not os.path.exists(candidate) or os.path.getmtime(candidate) < os.path.getmtime(path):
+            continue
+        try:
+            module, _ = load_artifact(candidate)
+            reference = reference or load_eager_network(path)
+            result = validate_artifact(module, reference, quantized)
+        except Exception as e:
+            print(f"Could not load {candidate}: {e}")
+            continue
+        if result['passed']:
+            print(f"Serving {candidate} (action agreement {result['agreement']:.1%})")
+            return module
+        print(f"Skipping {candidate}: it does not match {path} ({result})")
+    return None
+
+def load_policy(path, prefer_optimized=True):
+    """
+    Load a checkpoint into a greedy inference-only policy.
+
+    Args:
+        path: Path of a model saved by RLAgent.save
+        prefer_optimized: Whether to serve the checkpoint's exported artifact if there is one
+
+    Returns:
+        The InferencePolicy
+    """
+    module = load_optimized_network(path) if prefer_optimized else None
+    if module is not None:
+        return InferencePolicy(module)
+    return InferencePolicy.load(path)
+
+class SeatPolicy:
+    """
+    A game's handle on a shared model for one AI seat.
+    The handle only references the model, so creating one per seat and game costs nothing.
+    """
+
+    def __init__(self, model):
+        """
+        Initialize the handle.
+
+        Args:
+            model: The LoadedModel to play with
+        """
+        self.model = model
+
+    @property
+    def version(self):
+        """The (path, mtime) of the model this seat plays with."""
+        return (self.model.path, self.model.mtime)
+
+    def select_action(self, game, player_idx):
+        """
+        Select an action with the shared model.
+
+        Args:
+            game: The game
+            player_idx: Index of the player
+
+        Returns:
+            The selected action, as returned by RLAgent.select_action
+        """
+        return self.model.policy.select_action(game, player_idx)
+
+    def __call__(self, game, player_idx):
+        """Allow the handle to be used like select_random_action."""
+        return self.select_action(game, player_idx)
+
+class ModelRegistry:
+    """Loads each checkpoint once per process and hands out shared handles to it."""
+
+    def __init__(self, loader=load_policy, batching=None, cache=None, validator=validate_policy):
+        """
+        Initialize the registry.
+
+        Args:
+            loader: Function that loads a checkpoint path into a policy
+            batching: Keyword arguments of InferenceService (max_batch_size, max_wait_us) to
+                batch the forward passes of all games, or None to run them on the caller's thread
+            cache: QValueCache shared by the loaded models, or None to run every forward pass
+            validator: Function that raises if a loaded policy must not be served, or None
+        """
+        self.loader = loader
+        self.batching = batching
+        self.cache = cache
+        self.validator = validator
+        self._models = {}
+        # Path -> (mtime, error) of the last version that failed to load
+        self._rejected = {}
+        self._lock = threading.Lock()
+        # Loads run one at a time, outside the lock that guards the swap
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
+    def enable_batching(self, max_batch_size=32, max_wait_us=1000):
+        """
+        Batch the forward passes of models loaded from now on through an InferenceService.
+
+        Args:
+            max_batch_size: Largest number of decisions answered by one forward pass
+            max_wait_us: Time in microseconds to wait for more decisions after the first one
+        """
+        with self._lock:
+            self.batching = {'max_batch_size': max_batch_size, 'max_wait_us': max_wait_us}
+            self._models.clear()
+
+    def enable_cache(self, max_size=DEFAULT_CACHE_SIZE):
+        """
+        Cache the Q-values of models loaded from now on in one shared QValueCache.
+
+        Args:
+            max_size: Largest number of cached observations
+        """
+        with self._lock:
+            self.cache = QValueCache(max_size)
+            self._models.clear()
+
+    def _load(self, path, mtime):
+        """Load and validate a checkpoint, behind an InferenceService if batching is enabled."""
+        policy = self.loader(path)
+        if self.validator is not None:
+            self.validator(policy)
+        policy.cache = self.cache
+        policy.version = (path, mtime)
+        if self.batching is not None:
+            service = InferenceService(policy.network, device=policy.device, **self.batching)
+            policy = BatchedPolicy(policy, service)
+            # Stop the service once the last game playing this version is gone
+            weakref.finalize(policy, service.close)
+        return policy
+
+    def get(self, path):
+        """
+        Get the current version of a checkpoint, loading it if it is new or was rewritten.
+
+        Args:
+            path: Path of the checkpoint
+
+        Returns:
+            The LoadedModel
+        """
+        path = os.path.abspath(path)
+        mtime = os.path.getmtime(path)
+
+        with self._lock:
+            model = self._models.get(path)
+            rejected = self._rejected.get(path)
+        if model is not None and (model.mtime == mtime or (rejected and rejected[0] == mtime)):
+            return model
+        return self.reload(path)
+
+    def reload(self, path):
+        """
+        Load the checkpoint's current version, validate it and swap it in for new games.
+        If the new version fails to load or validate, the loaded version stays in service.
+
+        Args:
+            path: Path of the checkpoint
+
+        Returns:
+            The LoadedModel now in service
+
+        Raises:
+            Exception: If no version of the checkpoint could be loaded
+        """
+        path = os.path.abspath(path)
+        with self._reload_lock:
+            mtime = os.path.getmtime(path)
+            with self._lock:
+                current = self._models.get(path)
+            if current is not None and current.mtime == mtime:
+                return current
+
+            print(f"Loading model from {path} into the model registry")
+            try:
+                model = LoadedModel(path, mtime, self._load(path, mtime))
+            except Exception as e:
+                with self._lock:
+                    self._rejected[path] = (mtime, str(e))
+                if current is None:
+                    raise
+                print(f"Keeping the loaded version of {path}: {e}")
+                return current
+
+            # Games that hold the previous version keep it alive until they finish
+            with self._lock:
+                self._models[path] = model
+                self._rejected.pop(path, None)
+            if current is not None and self.cache is not None:
+                # Games still on the previous version compute their Q-values again
+                self.cache.invalidate((path, current.mtime))
+            return model
+
+    def watch(self, interval=DEFAULT_WATCH_INTERVAL):
+        """
+        Start a background thread that reloads rewritten checkpoints.
+
+        Args:
+            interval: Seconds between two checks of the loaded checkpoints
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background watcher."""
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self, interval):
+        """Check the loaded checkpoints every interval seconds until stopped."""
+        while not self._stop_watching.wait(interval):
+            for path in self.loaded():
+                try:
+                    self.get(path)
+                except Exception as e:
+                    print(f"Could not check {path} for a new version: {e}")
+
+    def policy(self, path):
+        """
+        Get a handle on the current version of a checkpoint for one AI seat.
+
+        Args:
+            path: Path of the checkpoint
+
+        Returns:
+            A SeatPolicy
+        """
+        return SeatPolicy(self.get(path))
+
+    def loaded(self):
+        """
+        Get the versions currently held by the registry.
+
+        Returns:
+            Dictionary mapping each path to the mtime of its loaded version
+        """
+        with self._lock:
+            return {path: model.mtime for path, model in self._models.items()}
+
+    def stats(self):
+        """
+        Get the loaded versions and, with batching, their inference metrics.
+
+        Returns:
+            Dictionary mapping each path to a dictionary with its 'mtime', 'inference' stats and
+            the 'rejected' error of a newer version that failed to load (or None)
+        """
+        with self._lock:
+            models = list(self._models.values())
+            rejected = dict(self._rejected)
+        stats = {}
+        for model in models:
+            service = getattr(model.policy, 'service', None)
+            failure = rejected.get(model.path)
+            stats[model.path] = {'mtime': model.mtime, 'inference': service.stats() if service else None,
+                                 'rejected': failure[1] if failure else None}
+        return stats
+
+    def cache_stats(self):
+        """
+        Get the metrics of the Q-value cache.
+
+        Returns:
+            The QValueCache stats, or None if caching is disabled
+        """
+        return self.cache.stats() if self.cache is not None else None
+
+    def clear(self):
+        """Forget all loaded models and cached Q-values."""
+        with self._lock:
+            self._models.clear()
+            self._rejected.clear()
+            if self.cache is not None:
+                self.cache.clear()
+
+# The registry shared by all games of the process
+registry = ModelRegistry()
@@ -338,7 +338,7 @@ def new_game(socketio):
     scoreboard['last_starting_player'] = next_starting_player
     
     # Initialize AI agents
-    ai_agents = initialize_ai_agents(socketio, game, game_id)
+    ai_agents, _ = initialize_ai_agents(socketio, game, game_id)
     
     # Send progress updates
     socketio.emit('progress_update', {'step': 'game_preparation', 'message': 'Preparing game state...'})
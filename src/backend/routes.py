@@ -24,6 +24,7 @@ from src.backend.handlers.game_state_routes import (
     get_current_trick, get_last_trick, round_summary, get_ai_hands, get_game_state_route
 )
 from src.backend.handlers.session_handlers import check_session_route
+from src.backend.handlers.admin_routes import reload_model
 from src.backend.card_utils import cards_equal
 from src.backend.config import games, scoreboard
 
@@ -45,6 +46,11 @@ def register_routes(app, socketio):
         """Get information about the model being used."""
         return model_info()
 
+    @app.route('/admin/reload_model', methods=['POST'])
+    def reload_model_route():
+        """Swap a new version of the model in for new games."""
+        return reload_model(request.get_json(silent=True))
+
     @app.route('/new_game', methods=['POST'])
     def new_game_route():
         """Start a new game."""
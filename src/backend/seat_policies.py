@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Seat-policy experiments for the AI players of the Doppelkopf web application.
+
+An experiment has weighted arms, and each arm names the policy of every AI seat: 'random',
+'heuristic', 'rl:<checkpoint>' or 'anytime:<policy>'. An anytime seat refines the wrapped
+policy's card choices by search within the per-move think time. The experiment is resolved once
+at startup. Each new game is assigned to an arm at random by weight, and the assignment is
+stored with the game, so that outcomes can be compared per arm and per policy. Games of an 'rl' seat get a handle on the
+checkpoint version that is current when the game starts.
+"""
+
+import os
+import sys
+import json
+import random
+import threading
+import functools
+from collections import namedtuple
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.agents.heuristic_agent import select_heuristic_action
+from src.reinforcementlearning.agents.anytime_policy import AnytimePolicy, DEFAULT_TIME_BUDGET
+
+# An arm of an experiment: its name, its share of new games and the policy spec of each AI seat
+Arm = namedtuple('Arm', ['name', 'weight', 'seats'])
+
+def _static_policy(policy, argument, registry, **options):
+    """Resolve a policy that needs no argument and is shared by all games as is."""
+    if argument:
+        raise ValueError(f"Policy takes no argument: {argument}")
+    return lambda: policy
+
+def _model_policy(path, registry, **options):
+    """Resolve a checkpoint to a factory of per-game handles from the model registry."""
+    if not path:
+        raise ValueError("An 'rl' policy needs a checkpoint, as in 'rl:models/final_model.pt'")
+    return functools.partial(registry.policy, path)
+
+def _anytime_policy(spec, registry, think_time=DEFAULT_TIME_BUDGET, **options):
+    """Resolve a wrapped policy spec to a factory of per-game anytime searchers."""
+    if not spec:
+        raise ValueError("An 'anytime' policy wraps another, as in 'anytime:rl:models/final_model.pt'")
+    prior = resolve_policy(spec, registry, think_time=think_time, **options)
+    return lambda: AnytimePolicy(prior(), time_budget=think_time)
+
+# Policy type -> function(argument, registry, **options) that returns a factory of the policy for one game
+POLICY_TYPES = {
+    'random': functools.partial(_static_policy, select_random_action),
+    'heuristic': functools.partial(_static_policy, select_heuristic_action),
+    'rl': _model_policy,
+    'anytime': _anytime_policy
+}
+
+def resolve_policy(spec, registry, **options):
+    """
+    Resolve a policy spec such as 'random' or 'rl:models/final_model.pt'.
+
+    Args:
+        spec: The policy spec, '<type>' or '<type>:<argument>'
+        registry: The ModelRegistry that serves checkpoints
+        **options: Settings of the policy types, such as the anytime 'think_time' in seconds
+
+    Returns:
+        A function that returns the policy for one new game
+
+    Raises:
+        ValueError: If the policy type is unknown or the argument is invalid
+    """
+    policy_type, _, argument = spec.partition(':')
+    if policy_type not in POLICY_TYPES:
+        raise ValueError(f"Unknown policy type '{policy_type}' in '{spec}' (known: {', '.join(POLICY_TYPES)})")
+    return POLICY_TYPES[policy_type](argument, registry, **options)
+
+class SeatPolicyExperiment:
+    """Weighted arms of seat policies, resolved once and sampled for every new game."""
+
+    def __init__(self, arms, num_ai_seats, registry, rng=None, **options):
+        """
+        Resolve the experiment.
+
+        Args:
+            arms: List of Arm
+            num_ai_seats: Number of AI seats per game; every arm must name that many policies
+            registry: The ModelRegistry that serves checkpoints
+            rng: Random number generator for the assignment of games to arms
+            **options: Settings of the policy types, passed to resolve_policy
+
+        Raises:
+            ValueError: If the arms are invalid
+        """
+        if not arms:
+            raise ValueError("A seat-policy experiment needs at least one arm")
+        for arm in arms:
+            if len(arm.seats) != num_ai_seats:
+                raise ValueError(f"Arm '{arm.name}' names {len(arm.seats)} seat policies, "
+                                 f"but there are {num_ai_seats} AI seats")
+            if arm.weight < 0:
+                raise ValueError(f"Arm '{arm.name}' has a negative weight")
+        if sum(arm.weight for arm in arms) <= 0:
+            raise ValueError("The arm weights must not all be zero")
+
+        self.arms = list(arms)
+        self.num_ai_seats = num_ai_seats
+        self.rng = rng or random.Random()
+        # One factory per distinct spec, shared by all arms
+        self._factories = {spec: resolve_policy(spec, registry, **options) for arm in self.arms for spec in arm.seats}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, num_ai_seats, registry, **options):
+        """
+        Load an experiment from a JSON file of the form
+        {"arms": [{"name": "control", "weight": 1, "seats": ["rl:models/final_model.pt", "random", "random"]}]}.
+
+        Args:
+            path: Path of the JSON file
+            num_ai_seats: Number of AI seats per game
+            registry: The ModelRegistry that serves checkpoints
+            **options: Settings of the policy types, passed to resolve_policy
+
+        Returns:
+            The SeatPolicyExperiment
+        """
+        with open(path, 'r') as f:
+            config = json.load(f)
+        arms = [Arm(arm.get('name', f'arm{i}'), float(arm.get('weight', 1.0)), list(arm['seats']))
+                for i, arm in enumerate(config['arms'])]
+        return cls(arms, num_ai_seats, registry, **options)
+
+    @classmethod
+    def default(cls, model_path, num_ai_seats, registry, **options):
+        """
+        Create the single-arm experiment of a plain server: the first AI seat plays the model
+        and the others play randomly.
+
+        Args:
+            model_path: Path of the server's checkpoint
+            num_ai_seats: Number of AI seats per game
+            registry: The ModelRegistry that serves checkpoints
+            **options: Settings of the policy types, passed to resolve_policy
+
+        Returns:
+            The SeatPolicyExperiment
+        """
+        seats = ([f'rl:{model_path}'] + ['random'] * num_ai_seats)[:num_ai_seats]
+        return cls([Arm('default', 1.0, seats)], num_ai_seats, registry, **options)
+
+    def assign(self):
+        """
+        Assign a new game to an arm.
+
+        Returns:
+            The Arm
+        """
+        with self._lock:
+            return self.rng.choices(self.arms, weights=[arm.weight for arm in self.arms])[0]
+
+    def create_policy(self, spec):
+        """
+        Create the policy of one seat of a new game.
+
+        Args:
+            spec: A policy spec of one of the arms
+
+        Returns:
+            The policy
+        """
+        return self._factories[spec]()
+
+class ExperimentStats:
+    """Outcome statistics of finished games per arm and per seat policy."""
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self._arms = {}
+        self._policies = {}
+        self._lock = threading.Lock()
+
+    def record(self, game, assignment):
+        """
+        Record the outcome of a finished game.
+
+        Args:
+            game: The finished game state dictionary
+            assignment: The game's policy assignment, with its 'arm' and the policy spec of
+                each AI seat in 'seats' (player index -> spec)
+        """
+        points = game.get('player_game_points') or [0] * len(game['teams'])
+        with self._lock:
+            arm = self._arms.setdefault(assignment['arm'], {'games': 0, 'ai_seat_wins': 0, 'ai_seats': 0})
+            arm['games'] += 1
+            for player_idx, spec in assignment['seats'].items():
+                won = game['teams'][player_idx] == game['winner']
+                arm['ai_seats'] += 1
+                arm['ai_seat_wins'] += won
+                policy = self._policies.setdefault(spec, {'seats': 0, 'wins': 0, 'game_points': 0})
+                policy['seats'] += 1
+                policy['wins'] += won
+                policy['game_points'] += points[player_idx]
+
+    def summary(self):
+        """
+        Get the statistics.
+
+        Returns:
+            Dictionary with 'arms' (name -> games, AI seat wins and win rate) and 'policies'
+            (spec -> seats played, wins, win rate and mean game points)
+        """
+        with self._lock:
+            arms = {name: dict(stats, win_rate=stats['ai_seat_wins'] / max(stats['ai_seats'], 1))
+                    for name, stats in self._arms.items()}
+            policies = {spec: dict(stats, win_rate=stats['wins'] / stats['seats'],
+                                   mean_game_points=stats['game_points'] / stats['seats'])
+                        for spec, stats in self._policies.items()}
+        return {'arms': arms, 'policies': policies}
+
+# The outcome statistics of all games of the process
+experiment_stats = ExperimentStats()
@@ -1,97 +1,192 @@
 """
 Logger utility for the Doppelkopf AI training program.
+
+Records are handed to a queue and written to a rotating log file (and the console) by a
+background listener thread, so logging never blocks the training loop on file I/O. Forked
+worker processes log to their own file, named after the parent's with the process id appended. The
+logging functions take %-style arguments that are only formatted if the level is enabled;
+hot loops can check is_enabled_for once and skip the calls entirely.
 """
 
 import os
+import queue
+import atexit
 import logging
+import logging.handlers
 from datetime import datetime
 
 # Global logger instance
 _logger = None
 
-def setup_logger(log_dir: str) -> str:
+# Background listener that writes the queued records to the handlers
+_listener = None
+
+# Default size of a log file before it is rotated, and the number of rotated files kept
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+def setup_logger(log_dir: str, level: int = logging.INFO, console: bool = True,
+                 max_bytes: int = DEFAULT_MAX_BYTES, backup_count: int = DEFAULT_BACKUP_COUNT) -> str:
     """
     Set up the logger.
-    
+
     Args:
         log_dir: Directory to save log files
-        
+        level: Minimum level of the messages that are logged
+        console: Whether to also log to the console
+        max_bytes: Size at which the log file is rotated (0 disables rotation)
+        backup_count: Number of rotated log files to keep
+
     Returns:
         Path to the log file
     """
     global _logger
-    
+
     # Create the log directory if it doesn't exist
     os.makedirs(log_dir, exist_ok=True)
-    
+
     # Create a unique log file name based on the current time
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = os.path.join(log_dir, f"training_{timestamp}.log")
-    
+
     # Configure the logger
     _logger = logging.getLogger("doppelkopf_ai")
-    _logger.setLevel(logging.INFO)
-    
-    # Remove any existing handlers
+    _logger.setLevel(level)
+    _logger.propagate = False
+
+    # Stop the previous listener and remove any existing handlers
+    shutdown()
     for handler in _logger.handlers[:]:
         _logger.removeHandler(handler)
-    
-    # Create file handler
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.INFO)
-    
+
+    # Create the rotating file handler
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setLevel(level)
+
     # Create console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    
+    console_handler.setLevel(level)
+
     # Create formatter and add it to the handlers
     formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
-    
-    # Add the handlers to the logger
-    _logger.addHandler(file_handler)
-    _logger.addHandler(console_handler)
-    
-    info(f"Logger initialized. Logging to {log_file}")
+
+    # The handlers run on the listener thread; the logger only enqueues records
+    handlers = [file_handler, console_handler] if console else [file_handler]
+    _start_listener(handlers)
+
+    info("Logger initialized. Logging to %s", log_file)
     return log_file
 
-def info(message: str):
+def _start_listener(handlers):
+    """Attach a queue to the logger and start a listener thread writing to the handlers."""
+    global _listener
+
+    log_queue = queue.SimpleQueue()
+    _logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def _restart_listener_after_fork():
+    """
+    Give a forked child process its own queue, listener thread and log file.
+
+    Threads do not survive a fork, and two processes rotating the same file lose or interleave
+    records at rollover, so the child writes to a copy of the parent's log file suffixed with
+    its process id. The copy is only created when the child logs to it.
+    """
+    global _listener
+
+    if _listener is None:
+        return
+    handlers = [_child_handler(handler) for handler in _listener.handlers]
+    _listener = None
+    for handler in _logger.handlers[:]:
+        _logger.removeHandler(handler)
+    _start_listener(handlers)
+
+def _child_handler(handler: logging.Handler) -> logging.Handler:
+    """Replace an inherited rotating file handler with one writing to a file of the child's own."""
+    if not isinstance(handler, logging.handlers.RotatingFileHandler):
+        return handler
+    root, ext = os.path.splitext(handler.baseFilename)
+    child_handler = logging.handlers.RotatingFileHandler(f"{root}_pid{os.getpid()}{ext}", maxBytes=handler.maxBytes,
+                                                         backupCount=handler.backupCount, delay=True)
+    child_handler.setLevel(handler.level)
+    child_handler.setFormatter(handler.formatter)
+    return child_handler
+
+def shutdown():
+    """Write all queued records, stop the listener thread and close the log file."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _logger is not None:
+        for handler in _logger.handlers[:]:
+            if isinstance(handler, logging.handlers.QueueHandler):
+                _logger.removeHandler(handler)
+
+atexit.register(shutdown)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+def is_enabled_for(level: int) -> bool:
+    """
+    Check whether messages of a level are logged.
+
+    Args:
+        level: The logging level, e.g. logging.DEBUG
+
+    Returns:
+        True if messages of this level are logged
+    """
+    return _logger is not None and _logger.isEnabledFor(level)
+
+def info(message: str, *args):
     """
     Log an info message.
-    
+
     Args:
         message: The message to log
+        args: Arguments merged into the message with %-formatting, only if it is logged
     """
     if _logger:
-        _logger.info(message)
+        _logger.info(message, *args)
 
-def warning(message: str):
+def warning(message: str, *args):
     """
     Log a warning message.
-    
+
     Args:
         message: The message to log
+        args: Arguments merged into the message with %-formatting, only if it is logged
     """
     if _logger:
-        _logger.warning(message)
+        _logger.warning(message, *args)
 
-def error(message: str):
+def error(message: str, *args):
     """
     Log an error message.
-    
+
     Args:
         message: The message to log
+        args: Arguments merged into the message with %-formatting, only if it is logged
     """
     if _logger:
-        _logger.error(message)
+        _logger.error(message, *args)
 
-def debug(message: str):
+def debug(message: str, *args):
     """
     Log a debug message.
-    
+
     Args:
         message: The message to log
+        args: Arguments merged into the message with %-formatting, only if it is logged
     """
     if _logger:
-        _logger.debug(message)
+        _logger.debug(message, *args)
@@ -1,7 +1,7 @@
 /**
  * Card-related functions
  */
-import { gameState } from './game-core.js';
+import { gameState, isStaleState } from './game-core.js';
 import { eventBus } from './event-bus.js';
 
 /**
@@ -256,8 +256,8 @@ export function playCard(cardId) {
   .then(data => {
     console.log("Play card response:", data);
     
-    // Update game state with the response data
-    if (data.state) {
+    // Update game state with the response data, unless the AI players' moves have already arrived
+    if (data.state && !isStaleState(data.state)) {
       // Update the game state
       gameState.hand = data.state.hand || [];
       gameState.currentTrick = data.state.current_trick || [];
@@ -29,18 +29,35 @@ export const gameState = {
   playerVariants: {},
   hasHochzeit: false,
   canAnnounce: false,
-  cardGiver: null
+  cardGiver: null,
+  stateVersion: 0
 };
 
 // Store model path
 export let MODEL_PATH = 'the server';
 
+/**
+ * Check whether a state snapshot is older than one already applied, and remember its version otherwise.
+ * The AI players' moves arrive over the socket while the response to the player's action is on its way.
+ * @param {Object} data - Game state data from the server
+ * @returns {boolean} True if the snapshot must be dropped
+ */
+export function isStaleState(data) {
+  if (data.state_version === undefined) return false;
+  if (data.state_version < gameState.stateVersion) {
+    console.log(`Dropping stale game state ${data.state_version} (have ${gameState.stateVersion})`);
+    return true;
+  }
+  gameState.stateVersion = data.state_version;
+  return false;
+}
+
 /**
  * Update the game state with new data
  * @param {Object} data - New game state data
  */
 export function updateGameState(data) {
-  if (!data) return;
+  if (!data || isStaleState(data)) return;
   
   // Update game state properties
   gameState.game_id = data.game_id;
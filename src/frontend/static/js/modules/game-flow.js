@@ -1,7 +1,7 @@
 /**
  * Game flow functions
  */
-import { gameState, resetGameState } from './game-core.js';
+import { gameState, resetGameState, isStaleState } from './game-core.js';
 import { eventBus } from './event-bus.js';
 
 /**
@@ -162,8 +162,8 @@ export function setGameVariant(variant) {
   .then(data => {
     console.log("Set variant response:", data);
     
-    // Update game state with the response data
-    if (data.state) {
+    // Update game state with the response data, unless the AI players' moves have already arrived
+    if (data.state && !isStaleState(data.state)) {
       gameState.hand = data.state.hand || [];
       gameState.gameVariant = data.state.game_variant;
       gameState.legalActions = data.state.legal_actions || [];
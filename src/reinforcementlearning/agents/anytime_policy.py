@@ -0,0 +1,268 @@
+"""
+Anytime card play with a strict per-move time budget.
+
+AnytimePolicy wraps another policy, usually the model. It first asks that policy for its move,
+the prior, and then refines the card choice with perfect-information Monte Carlo (PIMC) sampling
+until the deadline. Each sample deals the unseen cards to the other players, consistent with the
+suits they are known to be void in. Every legal card is then played out to the end of the game
+with fast rule-based rollouts. The card with the best mean trick-point difference so far is
+returned. If no sample finished, the result is the prior's move.
+"""
+
+import time
+import random
+from typing import Any, Dict, List, Optional, Set
+
+from src.backend.game.doppelkopf import (
+    create_deck, card_to_idx, get_card_value, get_legal_actions, is_trump,
+    SUIT_CLUBS, RANK_QUEEN, TEAM_RE, TEAM_KONTRA, VARIANT_NORMAL
+)
+from src.reinforcementlearning.doppelkopf_game import as_game
+from src.reinforcementlearning.agents.heuristic_agent import beats, heuristic_card
+
+# Default time budget per move in seconds
+DEFAULT_TIME_BUDGET = 0.35
+
+# Attempts at dealing the unseen cards consistently with the known voids before ignoring them
+MAX_DEAL_ATTEMPTS = 20
+
+def _card_type(card: Dict, game_variant: int) -> Any:
+    """The type a card must follow: 'trump' or its suit."""
+    return 'trump' if is_trump(card, game_variant) else card['suit']
+
+def _face(card: Dict) -> int:
+    """The index of a card ignoring which of the two copies it is."""
+    return card_to_idx(card) // 2
+
+def _winning_position(trick: List[Dict], game_variant: int) -> int:
+    """The position of the card that wins a full trick."""
+    best = 0
+    for i in range(1, len(trick)):
+        if beats(trick[i], trick[best], trick[0], game_variant):
+            best = i
+    return best
+
+def _is_queen_of_clubs(card: Dict) -> bool:
+    """Whether a card is a Queen of Clubs, which puts its owner on the Re team in a normal game."""
+    return card['suit'] == SUIT_CLUBS and card['rank'] == RANK_QUEEN
+
+def public_information(state: Dict, player_idx: int) -> Dict:
+    """
+    Collect what a player knows about the other hands.
+
+    Replays the tricks of the game to find the unseen cards, the card types each player
+    failed to follow (and therefore does not hold), and who has played a Queen of Clubs.
+    If the replay does not end at the current player, only the unseen cards are used.
+
+    Args:
+        state: The game state dictionary
+        player_idx: Index of the player
+
+    Returns:
+        Dictionary with the 'unseen' cards, the 'voids' of each player and the set of
+        players who played a Queen of Clubs in 'club_queens'
+    """
+    num_players = state['num_players']
+    variant = state['game_variant']
+    voids: List[Set] = [set() for _ in range(num_players)]
+    club_queens = set()
+
+    def replay(trick, leader):
+        lead_type = _card_type(trick[0], variant)
+        for i, card in enumerate(trick):
+            player = (leader + i) % num_players
+            if _card_type(card, variant) != lead_type:
+                voids[player].add(lead_type)
+            if _is_queen_of_clubs(card):
+                club_queens.add(player)
+
+    # The player after the card giver leads the first trick; each trick's winner leads the next
+    leader = (state.get('card_giver', 0) + 1) % num_players
+    for trick in state['tricks']:
+        replay(trick, leader)
+        leader = (leader + _winning_position(trick, variant)) % num_players
+    current_trick = state['current_trick']
+    if current_trick:
+        replay(current_trick, leader)
+
+    if leader != (state['current_player'] - len(current_trick)) % num_players:
+        voids = [set() for _ in range(num_players)]
+        club_queens = set()
+
+    seen = {card_to_idx(card) for card in state['hands'][player_idx]}
+    seen.update(card_to_idx(card) for trick in state['tricks'] for card in trick)
+    seen.update(card_to_idx(card) for card in current_trick)
+    unseen = [card for card in create_deck() if card_to_idx(card) not in seen]
+    return {'unseen': unseen, 'voids': voids, 'club_queens': club_queens}
+
+class AnytimePolicy:
+    """Refines another policy's card choice by PIMC sampling until a per-move deadline."""
+
+    def __init__(self, prior, time_budget: float = DEFAULT_TIME_BUDGET, rollout=heuristic_card,
+                 rng: Optional[random.Random] = None, clock=time.perf_counter):
+        """
+        Initialize the policy.
+
+        Args:
+            prior: The policy whose move is refined, with select_action(game, player_idx) or callable
+            time_budget: Seconds per move, including the prior's own decision
+            rollout: Function(legal_cards, trick, game_variant, num_players) that plays the
+                rollouts for all seats
+            rng: Random number generator for the deals
+            clock: Function returning the current time in seconds
+        """
+        self.prior = prior
+        self.time_budget = time_budget
+        self.rollout = rollout
+        self.rng = rng or random.Random()
+        self.clock = clock
+        # Number of samples and elapsed milliseconds of the last search, for logging
+        self.last_search = None
+
+    def select_action(self, game, player_idx: int) -> Any:
+        """
+        Select an action for the given player within the time budget.
+
+        Args:
+            game: The game instance or state dictionary
+            player_idx: Index of the player
+
+        Returns:
+            The prior's action, with its card replaced by the best card found by the search
+        """
+        start = self.clock()
+        self.last_search = None
+        game = as_game(game)
+        action = self.prior.select_action(game, player_idx) if hasattr(self.prior, 'select_action') \
+            else self.prior(game, player_idx)
+
+        # Announcements and variants are left to the prior
+        as_tuple = isinstance(action, tuple)
+        if as_tuple and action[0] != 'card':
+            return action
+        prior_card = action[1] if as_tuple else action
+
+        legal_actions = game.get_legal_actions(player_idx)
+        candidates = list({_face(card): card for card in legal_actions}.values())
+        if len(candidates) < 2:
+            return action
+
+        values, samples = self.search(game.state, player_idx, candidates, start + self.time_budget)
+        self.last_search = {'samples': samples, 'elapsed_ms': (self.clock() - start) * 1000}
+        if values is None:
+            return action
+
+        # Ties keep the prior's card
+        prior_idx = next((i for i, card in enumerate(candidates)
+                          if prior_card is not None and _face(card) == _face(prior_card)), None)
+        best = max(range(len(candidates)), key=lambda i: (values[i], i == prior_idx))
+        card = candidates[best] if prior_idx is None or values[best] > values[prior_idx] else prior_card
+        return ('card', card) if as_tuple else card
+
+    def search(self, state: Dict, player_idx: int, candidates: List[Dict], deadline: float):
+        """
+        Evaluate candidate cards by sampling deals until the deadline.
+
+        Args:
+            state: The game state dictionary
+            player_idx: Index of the player
+            candidates: The cards to evaluate
+            deadline: Time (from the clock) at which to stop
+
+        Returns:
+            Tuple of (mean trick-point difference per candidate or None, number of samples)
+        """
+        info = public_information(state, player_idx)
+        totals = [0.0] * len(candidates)
+        samples = 0
+        while self.clock() < deadline:
+            hands = self._deal(state, player_idx, info)
+            teams = self._teams(state, player_idx, hands, info)
+            results = []
+            for card in candidates:
+                if self.clock() >= deadline:
+                    break
+                results.append(self._play_out(state, player_idx, hands, teams, card))
+            if len(results) < len(candidates):
+                break
+            totals = [total + result for total, result in zip(totals, results)]
+            samples += 1
+        if samples == 0:
+            return None, 0
+        return [total / samples for total in totals], samples
+
+    def _deal(self, state: Dict, player_idx: int, info: Dict) -> List[List[Dict]]:
+        """Deal the unseen cards to the other players, respecting known voids where possible."""
+        variant = state['game_variant']
+        sizes = {p: len(hand) for p, hand in enumerate(state['hands']) if p != player_idx}
+        voids = info['voids']
+
+        for _ in range(MAX_DEAL_ATTEMPTS):
+            cards = list(info['unseen'])
+            self.rng.shuffle(cards)
+            # Place the cards that fewest players can hold first
+            eligible = {id(card): [p for p in sizes if _card_type(card, variant) not in voids[p]] for card in cards}
+            cards.sort(key=lambda card: len(eligible[id(card)]))
+            hands = {p: [] for p in sizes}
+            for card in cards:
+                open_players = [p for p in eligible[id(card)] if len(hands[p]) < sizes[p]]
+                if not open_players:
+                    break
+                player = self.rng.choices(open_players, weights=[sizes[p] - len(hands[p]) for p in open_players])[0]
+                hands[player].append(card)
+            else:
+                break
+        else:
+            # The voids cannot be satisfied together; deal without them
+            cards = list(info['unseen'])
+            self.rng.shuffle(cards)
+            hands, offset = {}, 0
+            for p, size in sizes.items():
+                hands[p] = cards[offset:offset + size]
+                offset += size
+
+        return [list(state['hands'][p]) if p == player_idx else hands[p] for p in range(state['num_players'])]
+
+    def _teams(self, state: Dict, player_idx: int, hands: List[List[Dict]], info: Dict) -> List[int]:
+        """The teams of a sampled deal: in a normal game the Queens of Clubs decide, otherwise the game's teams."""
+        if state['game_variant'] != VARIANT_NORMAL:
+            return list(state['teams'])
+        teams = [TEAM_RE if p in info['club_queens'] or any(_is_queen_of_clubs(card) for card in hand) else TEAM_KONTRA
+                 for p, hand in enumerate(hands)]
+        teams[player_idx] = state['teams'][player_idx]
+        return teams
+
+    def _play_out(self, state: Dict, player_idx: int, hands: List[List[Dict]], teams: List[int],
+                  card: Dict) -> float:
+        """Play a card and the rest of the game with rollouts; return the player's team's point difference."""
+        num_players = state['num_players']
+        variant = state['game_variant']
+        hands = [list(hand) for hand in hands]
+        trick = list(state['current_trick'])
+        leader = (player_idx - len(trick)) % num_players
+        sim = {'variant_selection_phase': False, 'game_over': False, 'hands': hands,
+               'current_trick': trick, 'game_variant': variant, 'current_player': player_idx}
+
+        player = player_idx
+        points = 0.0
+        while True:
+            hand = hands[player]
+            hand.pop(next(i for i, c in enumerate(hand) if _face(c) == _face(card)))
+            trick.append(card)
+            if len(trick) == num_players:
+                winner = (leader + _winning_position(trick, variant)) % num_players
+                trick_points = sum(get_card_value(c) for c in trick)
+                points += trick_points if teams[winner] == teams[player_idx] else -trick_points
+                trick = []
+                sim['current_trick'] = trick
+                leader = player = winner
+            else:
+                player = (player + 1) % num_players
+            if not hands[player]:
+                return points
+            sim['current_player'] = player
+            card = self.rollout(get_legal_actions(sim, player), trick, variant, num_players)
+
+    def __call__(self, game, player_idx: int) -> Any:
+        """Allow the policy to be used like select_random_action."""
+        return self.select_action(game, player_idx)
@@ -0,0 +1,96 @@
+"""
+Rule-based agent for Doppelkopf.
+This module provides a simple baseline that plays like a cautious beginner: it leads with a
+plain Ace, takes a trick with its cheapest winning card, grabs the most points when it plays
+last, and otherwise throws its least valuable card. It only uses public information.
+"""
+
+from typing import Any, Dict, List
+
+from src.backend.game.doppelkopf import is_trump, get_card_value, get_card_order_value, RANK_ACE
+from src.reinforcementlearning.doppelkopf_game import as_game
+
+def beats(card: Dict, best: Dict, lead: Dict, game_variant: int) -> bool:
+    """
+    Check whether a card takes the trick from the currently winning card.
+
+    Args:
+        card: The card to play
+        best: The card currently winning the trick
+        lead: The first card of the trick
+        game_variant: The game variant
+
+    Returns:
+        True if the card would win the trick
+    """
+    card_trump = is_trump(card, game_variant)
+    best_trump = is_trump(best, game_variant)
+    if card_trump != best_trump:
+        return card_trump
+    if not card_trump and card['suit'] != lead['suit']:
+        return False
+    # Of two equal cards the first one played wins
+    return get_card_order_value(card, game_variant) > get_card_order_value(best, game_variant)
+
+def winning_card(trick: List[Dict], game_variant: int) -> Dict:
+    """
+    Get the card currently winning a trick.
+
+    Args:
+        trick: The cards played so far, in order
+        game_variant: The game variant
+
+    Returns:
+        The winning card
+    """
+    best = trick[0]
+    for card in trick[1:]:
+        if beats(card, best, trick[0], game_variant):
+            best = card
+    return best
+
+def heuristic_card(legal_actions: List[Dict], trick: List[Dict], game_variant: int, num_players: int = 4) -> Dict:
+    """
+    Choose a card by simple rules.
+
+    Args:
+        legal_actions: The legal cards (at least one)
+        trick: The cards played so far in the current trick
+        game_variant: The game variant
+        num_players: Number of players
+
+    Returns:
+        The selected card
+    """
+    def cheapest(cards):
+        return min(cards, key=lambda c: (get_card_value(c), get_card_order_value(c, game_variant)))
+
+    if not trick:
+        aces = [c for c in legal_actions if c['rank'] == RANK_ACE and not is_trump(c, game_variant)]
+        return aces[0] if aces else cheapest(legal_actions)
+
+    best = winning_card(trick, game_variant)
+    winners = [c for c in legal_actions if beats(c, best, trick[0], game_variant)]
+    if not winners:
+        return cheapest(legal_actions)
+    if len(trick) == num_players - 1:
+        # Nobody plays after us, so take the trick with as many points as possible
+        return max(winners, key=lambda c: (get_card_value(c), -get_card_order_value(c, game_variant)))
+    return min(winners, key=lambda c: (get_card_order_value(c, game_variant), get_card_value(c)))
+
+def select_heuristic_action(game, player_idx: int) -> Any:
+    """
+    Select a card by simple rules.
+
+    Args:
+        game: The game instance or state dictionary
+        player_idx: Index of the player
+
+    Returns:
+        The selected card, or None if there are no legal cards
+    """
+    game = as_game(game)
+    legal_actions = game.get_legal_actions(player_idx)
+    if not legal_actions:
+        return None
+    return heuristic_card(legal_actions, game.current_trick, game.game_variant, game.num_players)
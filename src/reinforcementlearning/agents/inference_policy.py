@@ -0,0 +1,171 @@
+"""
+Inference-only policy for serving a trained Doppelkopf model.
+Unlike RLAgent it holds a single network in eval mode and nothing needed for learning:
+no target network, optimizer or replay buffer. It keeps the select_action(game, player_idx)
+contract of RLAgent, so it can take an AI seat wherever an agent is expected.
+"""
+
+import random
+import threading
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Any, Dict, Hashable, Optional
+
+from src.backend.game.doppelkopf import card_to_idx, get_state_size, get_action_size
+from src.reinforcementlearning.doppelkopf_game import as_game
+from src.reinforcementlearning.agents.q_cache import QValueCache
+from src.reinforcementlearning.agents.rl_agent import (
+    VARIANTS, create_network, network_from_state_dict, legal_action_mask
+)
+
+class InferencePolicy:
+    """
+    Greedy (optionally epsilon-greedy) action selection with one network.
+
+    The observation and legal-action mask are written into buffers allocated once, and the
+    best legal action is found with a masked argmax over cards, announcements and variants.
+    """
+
+    def __init__(self, network: nn.Module, action_size: int = None, epsilon: float = 0.0, device=None,
+                 cache: Optional[QValueCache] = None, version: Hashable = None):
+        """
+        Initialize the policy.
+
+        Args:
+            network: The Q-network; it is switched to eval mode and its gradients are disabled
+            action_size: Number of card actions (default: the game's action size)
+            epsilon: Probability of a random legal action instead of the best one
+            device: Device to run the network on
+            cache: Cache to look up Q-values in before running the network
+            version: Version of the network in the cache keys
+        """
+        self.device = device or torch.device("cpu")
+        self.action_size = action_size or get_action_size()
+        self.epsilon = epsilon
+        self.cache = cache
+        self.version = version
+        self.network = network.to(self.device)
+        self.network.eval()
+        for param in self.network.parameters():
+            param.requires_grad_(False)
+
+        # Input buffers reused by every decision; the lock keeps concurrent callers apart
+        self._state = torch.zeros((1, get_state_size()), dtype=torch.float32)
+        self._mask = np.zeros(self.action_size + 2 + len(VARIANTS), dtype=bool)
+        self._mask_tensor = torch.from_numpy(self._mask)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_state_dict(cls, state_dict: Dict, epsilon: float = 0.0, device=None) -> 'InferencePolicy':
+        """
+        Create a policy from saved weights, recognizing the architecture.
+
+        Args:
+            state_dict: Weights saved by RLAgent.save
+            epsilon: Probability of a random legal action
+            device: Device to run the network on
+
+        Returns:
+            The policy
+        """
+        network_name, output_size = network_from_state_dict(state_dict)
+        network = create_network(network_name, get_state_size(), output_size)
+        network.load_state_dict({k: v.float() for k, v in state_dict.items()})
+        return cls(network, epsilon=epsilon, device=device)
+
+    @classmethod
+    def load(cls, path: str, epsilon: float = 0.0, device=None) -> 'InferencePolicy':
+        """
+        Load a policy from a model saved by RLAgent.save.
+
+        Args:
+            path: Path of the model
+            epsilon: Probability of a random legal action
+            device: Device to run the network on
+
+        Returns:
+            The policy
+        """
+        return cls.from_state_dict(torch.load(path, map_location='cpu'), epsilon=epsilon, device=device)
+
+    def select_action(self, game, player_idx: int) -> Any:
+        """
+        Select an action for the given player.
+
+        Args:
+            game: The game instance or state dictionary
+            player_idx: Index of the player
+
+        Returns:
+            ('card', card), ('announce', 're' or 'contra') or ('variant', name), or None if
+            there is nothing to choose
+        """
+        game = as_game(game)
+        with self._lock:
+            mask = legal_action_mask(game, player_idx, self.action_size, out=self._mask)
+            legal = np.flatnonzero(mask)
+            if len(legal) == 0:
+                return None
+
+            if len(legal) == 1:
+                # A forced move needs no forward pass
+                action_idx = int(legal[0])
+            elif self.epsilon > 0 and random.random() < self.epsilon:
+                action_idx = int(random.choice(legal))
+            else:
+                q_values = self._q_values(game.get_state_for_player(player_idx))
+                action_idx = int(q_values.masked_fill(~self._mask_tensor, float('-inf')).argmax())
+
+        return self.action_from_index(game, player_idx, action_idx)
+
+    def _q_values(self, observation) -> torch.Tensor:
+        """
+        Get the Q-values of an observation, from the cache if it holds them (called with the lock held).
+
+        Args:
+            observation: The observation
+
+        Returns:
+            Tensor with the Q-value of every action
+        """
+        observation = np.asarray(observation, dtype=np.float32)
+        if self.cache is not None:
+            key = self.cache.key(observation, self.version)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return torch.from_numpy(cached)
+
+        self._state[0] = torch.from_numpy(observation)
+        with torch.inference_mode():
+            q_values = self.network(self._state.to(self.device))[0].cpu()
+        if self.cache is not None:
+            self.cache.put(key, q_values.numpy())
+        return q_values
+
+    def action_from_index(self, game, player_idx: int, action_idx: int) -> Any:
+        """
+        Convert an index in the full action space to the action tuple of select_action.
+
+        Args:
+            game: The game instance or state dictionary
+            player_idx: Index of the player
+            action_idx: Index of the action
+
+        Returns:
+            The action tuple
+        """
+        game = as_game(game)
+        if action_idx >= self.action_size + 2:
+            return ('variant', VARIANTS[action_idx - self.action_size - 2])
+        if action_idx >= self.action_size:
+            return ('announce', 're' if action_idx == self.action_size else 'contra')
+        legal_actions = game.get_legal_actions(player_idx)
+        for card in legal_actions:
+            if card_to_idx(card) == action_idx:
+                return ('card', card)
+        return ('card', legal_actions[0])
+
+    def __call__(self, game, player_idx: int) -> Any:
+        """Allow the policy to be used like select_random_action."""
+        return self.select_action(game, player_idx)
@@ -0,0 +1,116 @@
+"""
+Bounded LRU cache of Q-values in front of a policy's forward pass.
+The same observations recur when serving and evaluating: the opening decisions of a deal
+in every seat rotation of a duplicate evaluation, replays and resent game states. Entries are
+keyed by the packed observation bytes and the model version, so a cache can be shared by
+several models and entries of a replaced model are never returned.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+from src.reinforcementlearning.training.packing import pack_observations
+
+# Default number of observations kept per cache
+DEFAULT_CACHE_SIZE = 4096
+
+class QValueCache:
+    """Least-recently-used map from (model version, packed observation) to Q-values."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Largest number of entries; the least recently used entry is evicted first
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(observation, version: Hashable = None) -> tuple:
+        """
+        Build the cache key of an observation.
+
+        Args:
+            observation: The observation (161 values)
+            version: Version of the model that computes the Q-values
+
+        Returns:
+            The key
+        """
+        return (version, pack_observations(observation).tobytes())
+
+    def get(self, key: tuple) -> Optional[np.ndarray]:
+        """
+        Look up the Q-values of a key and count the hit or miss.
+
+        Args:
+            key: Key from QValueCache.key
+
+        Returns:
+            The cached Q-values, or None
+        """
+        with self._lock:
+            q_values = self._entries.get(key)
+            if q_values is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return q_values
+
+    def put(self, key: tuple, q_values: np.ndarray):
+        """
+        Store the Q-values of a key.
+
+        Args:
+            key: Key from QValueCache.key
+            q_values: The Q-values; the cache keeps a copy, which callers must not modify
+        """
+        q_values = np.array(q_values, dtype=np.float32)
+        with self._lock:
+            self._entries[key] = q_values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, version: Hashable):
+        """
+        Drop all entries of a model version.
+
+        Args:
+            version: The version whose entries to drop
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == version]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache metrics.
+
+        Returns:
+            Dictionary with the number of 'entries', 'hits' and 'misses' and the 'hit_rate'
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -5,6 +5,7 @@ It supports making Re/Contra announcements and selecting game variants.
 """
 
 import os
+import copy
 import random
 import numpy as np
 import torch
@@ -12,35 +13,68 @@ import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
 from collections import deque, namedtuple
-from typing import Any, List, Tuple, Dict
+from typing import Any, List, Tuple, Dict, Optional
 
 # Import game functions
 from src.backend.game.doppelkopf import (
-    get_legal_actions, get_state_for_player, card_to_idx,
+    get_legal_actions, get_state_for_player, card_to_idx, get_state_size,
     TEAM_RE, TEAM_KONTRA
 )
+from src.reinforcementlearning.doppelkopf_game import as_game
+from src.reinforcementlearning.training.profiler import NULL_PROFILER
+from src.reinforcementlearning.training.augmentation import SuitAugmentation
+from src.reinforcementlearning.training.packing import (
+    PACKED_SIZE, PACKING_VERSION, pack_observations, unpack_observations, upgrade_packed_observations
+)
+from src.reinforcementlearning.training.returns import EpisodeAccumulator
 
-# Define a transition for the replay buffer
+# Define a transition for the replay buffer; discount is the factor applied to the
+# bootstrapped value of next_state (None means the buffer's one-step gamma)
 Transition = namedtuple('Transition', 
-                        ('state', 'action', 'next_state', 'reward'))
+                        ('state', 'action', 'next_state', 'reward', 'discount'),
+                        defaults=(None,))
 
 class ReplayBuffer:
     """A replay buffer to store and sample transitions."""
     
-    def __init__(self, capacity: int):
+    def __init__(self, capacity: int, gamma: float = 0.99):
         """
         Initialize the replay buffer.
         
         Args:
             capacity: Maximum number of transitions to store
+            gamma: Discount of transitions pushed without one
         """
         self.capacity = capacity
+        self.gamma = gamma
         self.buffer = deque(maxlen=capacity)
     
     def push(self, *args):
         """Add a transition to the buffer."""
         self.buffer.append(Transition(*args))
     
+    def push_batch(self, states, actions, next_states, has_next, rewards, discounts, device=None):
+        """
+        Add the transitions of a whole episode.
+        
+        Args:
+            states: Observations of shape (batch, state_size)
+            actions: Action indices
+            next_states: Observations to bootstrap from
+            has_next: Whether each transition bootstraps
+            rewards: Rewards (or returns) of the transitions
+            discounts: Discounts applied to the bootstrapped values
+            device: Device to store the tensors on
+        """
+        states = torch.as_tensor(states, dtype=torch.float32, device=device)
+        next_states = torch.as_tensor(next_states, dtype=torch.float32, device=device)
+        actions = torch.as_tensor(actions, dtype=torch.long, device=device)
+        rewards = torch.as_tensor(rewards, dtype=torch.float32, device=device)
+        for i in range(len(actions)):
+            self.buffer.append(Transition(
+                states[i], actions[i:i + 1], next_states[i] if has_next[i] else None,
+                rewards[i:i + 1], float(discounts[i])))
+    
     def sample(self, batch_size: int) -> List[Transition]:
         """
         Sample a batch of transitions.
@@ -53,10 +87,229 @@ class ReplayBuffer:
         """
         return random.sample(self.buffer, batch_size)
     
+    def sample_batch(self, batch_size: int) -> Tuple[torch.Tensor, ...]:
+        """
+        Sample a batch of transitions as batch tensors.
+        
+        Args:
+            batch_size: Number of transitions to sample
+            
+        Returns:
+            Tuple of (states, actions, rewards, non-final mask, next states of the non-final
+            transitions, discounts)
+        """
+        batch = Transition(*zip(*self.sample(batch_size)))
+        state_batch = torch.stack(batch.state)
+        action_batch = torch.cat(batch.action)
+        reward_batch = torch.cat(batch.reward)
+        discount_batch = torch.tensor(
+            [self.gamma if d is None else d for d in batch.discount], device=state_batch.device)
+        
+        # Create mask for non-terminal states
+        non_final_mask = torch.tensor(
+            tuple(map(lambda s: s is not None, batch.next_state)),
+            device=state_batch.device, dtype=torch.bool)
+        
+        # Lambda-returns never bootstrap, so a batch may have no next states at all
+        next_states = [s for s in batch.next_state if s is not None]
+        if next_states:
+            non_final_next_states = torch.stack(next_states)
+        else:
+            non_final_next_states = state_batch.new_zeros((0, state_batch.shape[1]))
+        
+        return state_batch, action_batch, reward_batch, non_final_mask, non_final_next_states, discount_batch
+    
+    def get_state(self) -> List[Transition]:
+        """Get the stored transitions for a checkpoint."""
+        # Stored transitions are never modified in place, so a shallow copy is enough
+        return list(self.buffer)
+    
+    def load_state(self, transitions: List[Transition], device):
+        """
+        Replace the stored transitions with those of a checkpoint.
+        
+        Args:
+            transitions: Transitions saved by get_state, or the state of a packed buffer
+            device: Device to move the transitions to
+        """
+        self.buffer.clear()
+        if isinstance(transitions, dict):
+            # Checkpoint of a packed buffer, oldest transition first
+            order = np.arange(len(transitions['actions']))
+            if len(order) and transitions['position'] < len(order):
+                order = np.roll(order, -transitions['position'])
+            version = transitions.get('packing_version', 1)
+            states = unpack_observations(upgrade_packed_observations(transitions['states'][order], version), device)
+            next_states = unpack_observations(
+                upgrade_packed_observations(transitions['next_states'][order], version), device)
+            discounts = transitions.get('discounts')
+            for i, j in enumerate(order):
+                self.buffer.append(Transition(
+                    states[i],
+                    torch.tensor([transitions['actions'][j]], device=device),
+                    next_states[i] if transitions['has_next'][j] else None,
+                    torch.tensor([transitions['rewards'][j]], device=device),
+                    float(discounts[j]) if discounts is not None else None
+                ))
+            return
+        
+        for transition in transitions:
+            self.buffer.append(Transition(*[
+                t.to(device) if isinstance(t, torch.Tensor) else t for t in transition
+            ]))
+    
     def __len__(self) -> int:
         """Get the current size of the buffer."""
         return len(self.buffer)
 
+class PackedReplayBuffer:
+    """
+    A replay buffer that stores observations bit-packed in preallocated arrays.
+    
+    Each transition takes about 60 bytes instead of about 1.3 KB; sampled batches are
+    unpacked to float32 in one vectorized operation.
+    """
+    
+    def __init__(self, capacity: int, device=None, gamma: float = 0.99):
+        """
+        Initialize the replay buffer.
+        
+        Args:
+            capacity: Maximum number of transitions to store
+            device: Device the sampled batch tensors are created on
+            gamma: Discount of transitions pushed without one
+        """
+        self.capacity = capacity
+        self.gamma = gamma
+        self.device = device or torch.device("cpu")
+        self.states = np.zeros((capacity, PACKED_SIZE), dtype=np.uint8)
+        self.next_states = np.zeros((capacity, PACKED_SIZE), dtype=np.uint8)
+        self.has_next = np.zeros(capacity, dtype=bool)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.discounts = np.zeros(capacity, dtype=np.float32)
+        self.position = 0
+        self.size = 0
+    
+    def push(self, state, action, next_state, reward, discount: float = None):
+        """
+        Add a transition to the buffer.
+        
+        Args:
+            state: The observation before the action
+            action: The action index
+            next_state: The observation after the action, or None at the end of the game
+            reward: The reward received
+            discount: Discount applied to the bootstrapped value (default: gamma)
+        """
+        i = self.position
+        self.states[i] = pack_observations(state)
+        self.has_next[i] = next_state is not None
+        if next_state is not None:
+            self.next_states[i] = pack_observations(next_state)
+        self.actions[i] = int(action)
+        self.rewards[i] = float(reward)
+        self.discounts[i] = self.gamma if discount is None else discount
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def push_batch(self, states, actions, next_states, has_next, rewards, discounts, device=None):
+        """
+        Add the transitions of a whole episode with one packed write per column.
+        
+        Args:
+            states: Observations of shape (batch, state_size)
+            actions: Action indices
+            next_states: Observations to bootstrap from
+            has_next: Whether each transition bootstraps
+            rewards: Rewards (or returns) of the transitions
+            discounts: Discounts applied to the bootstrapped values
+            device: Unused; batches are always created on this buffer's device
+        """
+        count = min(len(actions), self.capacity)
+        rows = (self.position + np.arange(count)) % self.capacity
+        self.states[rows] = pack_observations(np.asarray(states)[-count:])
+        self.next_states[rows] = pack_observations(np.asarray(next_states)[-count:])
+        self.has_next[rows] = np.asarray(has_next)[-count:]
+        self.actions[rows] = np.asarray(actions)[-count:]
+        self.rewards[rows] = np.asarray(rewards)[-count:]
+        self.discounts[rows] = np.asarray(discounts)[-count:]
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+    
+    def sample_batch(self, batch_size: int) -> Tuple[torch.Tensor, ...]:
+        """
+        Sample a batch of transitions as batch tensors.
+        
+        Args:
+            batch_size: Number of transitions to sample
+            
+        Returns:
+            Tuple of (states, actions, rewards, non-final mask, next states of the non-final
+            transitions, discounts)
+        """
+        indices = np.array(random.sample(range(self.size), batch_size))
+        has_next = self.has_next[indices]
+        
+        # Unpack states and next states together in one operation
+        packed = np.concatenate([self.states[indices], self.next_states[indices[has_next]]])
+        unpacked = unpack_observations(packed, self.device)
+        
+        return (
+            unpacked[:batch_size],
+            torch.as_tensor(self.actions[indices], device=self.device),
+            torch.as_tensor(self.rewards[indices], device=self.device),
+            torch.as_tensor(has_next, device=self.device),
+            unpacked[batch_size:],
+            torch.as_tensor(self.discounts[indices], device=self.device)
+        )
+    
+    def get_state(self) -> Dict:
+        """Get a copy of the stored transitions for a checkpoint."""
+        return {
+            'states': self.states[:self.size].copy(),
+            'next_states': self.next_states[:self.size].copy(),
+            'has_next': self.has_next[:self.size].copy(),
+            'actions': self.actions[:self.size].copy(),
+            'rewards': self.rewards[:self.size].copy(),
+            'discounts': self.discounts[:self.size].copy(),
+            'position': self.position,
+            'packing_version': PACKING_VERSION
+        }
+    
+    def load_state(self, buffer_state, device=None):
+        """
+        Replace the stored transitions with those of a checkpoint.
+        
+        Args:
+            buffer_state: State saved by get_state, or a list of transitions of an unpacked buffer
+            device: Unused; batches are always created on this buffer's device
+        """
+        self.position = 0
+        self.size = 0
+        if isinstance(buffer_state, dict):
+            size = min(len(buffer_state['actions']), self.capacity)
+            for name in ('has_next', 'actions', 'rewards'):
+                getattr(self, name)[:size] = buffer_state[name][:size]
+            # Checkpoints written before the packing version was stored hold float16 scores
+            version = buffer_state.get('packing_version', 1)
+            for name in ('states', 'next_states'):
+                getattr(self, name)[:size] = upgrade_packed_observations(buffer_state[name][:size], version)
+            # Checkpoints written before discounts were stored hold one-step transitions
+            self.discounts[:size] = buffer_state['discounts'][:size] if 'discounts' in buffer_state else self.gamma
+            self.size = size
+            self.position = buffer_state['position'] % self.capacity if size == self.capacity else size
+            return
+        
+        for transition in buffer_state:
+            next_state = transition.next_state.cpu().numpy() if transition.next_state is not None else None
+            self.push(transition.state.cpu().numpy(), transition.action.item(), next_state, transition.reward.item(),
+                      transition.discount)
+    
+    def __len__(self) -> int:
+        """Get the current size of the buffer."""
+        return self.size
+
 class DQN(nn.Module):
     """Deep Q-Network for Doppelkopf."""
     
@@ -89,6 +342,205 @@ class DQN(nn.Module):
         x = F.relu(self.fc2(x))
         return self.fc3(x)
 
+class CardEmbeddingDQN(nn.Module):
+    """
+    Deep Q-Network that embeds card sets instead of reading one-hot planes.
+    
+    The hand, the current trick and the played cards are each pooled from one shared
+    embedding of the 24 card kinds, so both copies of a card use the same weights.
+    The pooled sets and the context features (variant, team, player, scores,
+    announcements) go through a small MLP head.
+    """
+    
+    # Number of card kinds (suit and rank); both copies of a card share a kind
+    NUM_CARD_KINDS = 24
+    
+    # Number of card sets (hand, trick, played)
+    NUM_CARD_SETS = 3
+    
+    def __init__(self, input_size: int, output_size: int, embedding_size: int = 32, hidden_size: int = 128):
+        """
+        Initialize the network.
+        
+        Args:
+            input_size: Size of the dense input state (card planes followed by the context features)
+            output_size: Size of the output action space
+            embedding_size: Size of the card embedding
+            hidden_size: Size of the hidden layers
+        """
+        super(CardEmbeddingDQN, self).__init__()
+        
+        self.card_planes_size = self.NUM_CARD_SETS * 2 * self.NUM_CARD_KINDS
+        self.context_size = input_size - self.card_planes_size
+        
+        self.card_embedding = nn.EmbeddingBag(self.NUM_CARD_KINDS, embedding_size, mode='sum')
+        self.fc1 = nn.Linear(self.NUM_CARD_SETS * embedding_size + self.context_size, hidden_size)
+        self.fc2 = nn.Linear(hidden_size, hidden_size)
+        self.out = nn.Linear(hidden_size, output_size)
+    
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Forward pass on dense states, as stored in the replay buffer.
+        
+        Args:
+            x: Input tensor of shape (batch, input_size)
+            
+        Returns:
+            Output tensor
+        """
+        # Count the copies of each card kind per set; pooling is then one small matmul
+        # (shapes are taken from the tensor, so a traced copy of the network accepts any batch size)
+        counts = x[:, :self.card_planes_size].reshape(-1, self.NUM_CARD_SETS, self.NUM_CARD_KINDS, 2).sum(-1)
+        pooled = torch.matmul(counts, self.card_embedding.weight)
+        return self._head(pooled.flatten(1), x[:, self.card_planes_size:])
+    
+    def forward_compact(self, card_kinds: torch.Tensor, offsets: torch.Tensor, context: torch.Tensor) -> torch.Tensor:
+        """
+        Forward pass on card index lists, as produced by encode_compact_states.
+        
+        Args:
+            card_kinds: Card kinds of all sets of all states, concatenated
+            offsets: Start of each set in card_kinds, NUM_CARD_SETS per state
+            context: Context features of shape (batch, context_size)
+            
+        Returns:
+            Output tensor
+        """
+        pooled = self.card_embedding(card_kinds, offsets)
+        return self._head(pooled.reshape(len(context), -1), context)
+    
+    def _head(self, pooled: torch.Tensor, context: torch.Tensor) -> torch.Tensor:
+        """Apply the MLP head to the pooled card sets and the context features."""
+        x = F.relu(self.fc1(torch.cat([pooled, context], dim=1)))
+        x = F.relu(self.fc2(x))
+        return self.out(x)
+
+def encode_compact_states(compact_states: List[Dict], device=None) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Batch compact states for CardEmbeddingDQN.forward_compact.
+    
+    Args:
+        compact_states: States returned by get_compact_state_for_player
+        device: Device of the tensors
+        
+    Returns:
+        Tuple of (card kinds, offsets, context features)
+    """
+    card_kinds = []
+    offsets = []
+    for compact_state in compact_states:
+        for card_set in ('hand', 'trick', 'played'):
+            offsets.append(len(card_kinds))
+            card_kinds.extend(idx // 2 for idx in compact_state[card_set])
+    return (
+        torch.tensor(card_kinds, dtype=torch.long, device=device),
+        torch.tensor(offsets, dtype=torch.long, device=device),
+        torch.tensor([s['context'] for s in compact_states], dtype=torch.float32, device=device)
+    )
+
+# Available network architectures
+NETWORKS = {
+    'mlp': DQN,
+    'card_embedding': CardEmbeddingDQN
+}
+
+def create_network(network: str, input_size: int, output_size: int) -> nn.Module:
+    """
+    Create a Q-network by name.
+    
+    Args:
+        network: Name of the architecture ('mlp' or 'card_embedding')
+        input_size: Size of the input state
+        output_size: Size of the output action space
+        
+    Returns:
+        The network
+    """
+    if network not in NETWORKS:
+        raise ValueError(f"Unknown network '{network}', expected one of {sorted(NETWORKS)}")
+    return NETWORKS[network](input_size, output_size)
+
+def network_from_state_dict(state_dict: Dict) -> Tuple[str, int]:
+    """
+    Recognize the architecture of saved weights.
+    
+    Args:
+        state_dict: Weights saved by RLAgent.save
+        
+    Returns:
+        Tuple of (network name, output size)
+    """
+    if 'card_embedding.weight' in state_dict:
+        return 'card_embedding', state_dict['out.weight'].shape[0]
+    return 'mlp', state_dict['fc3.weight'].shape[0]
+
+# Game variants in the order of their actions, which follow the card and announcement actions
+VARIANTS = ['normal', 'hochzeit', 'queen_solo', 'jack_solo', 'fleshless']
+
+def can_announce(game, player_idx: int) -> bool:
+    """
+    Check whether the player's team may still make its announcement.
+    
+    Args:
+        game: The game instance or state dictionary
+        player_idx: Index of the player
+        
+    Returns:
+        True if an announcement is allowed
+    """
+    game = as_game(game)
+    allowed = hasattr(game, 'can_announce') and game.can_announce
+    if not allowed:
+        # If not explicitly tracked, we can announce until the fifth card is played
+        cards_played = len(game.current_trick)
+        for trick in game.tricks:
+            cards_played += len(trick)
+        allowed = cards_played < 5
+    
+    # Each team can only announce once
+    if allowed:
+        player_team = game.teams[player_idx]
+        if (player_team == TEAM_RE and getattr(game, 're_announced', False)) or \
+           (player_team == TEAM_KONTRA and getattr(game, 'contra_announced', False)):
+            allowed = False
+    
+    return allowed
+
+def legal_action_mask(game, player_idx: int, action_size: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Get the actions a player may choose from in the current situation.
+    
+    Args:
+        game: The game instance or state dictionary
+        player_idx: Index of the player
+        action_size: Number of card actions
+        out: Optional boolean array to fill instead of allocating a new one
+        
+    Returns:
+        Boolean array over the full action space (cards, announcements and variants)
+    """
+    game = as_game(game)
+    if out is None:
+        out = np.zeros(action_size + 2 + len(VARIANTS), dtype=bool)
+    else:
+        out[:] = False
+    
+    if getattr(game, 'variant_selection_phase', False):
+        out[action_size + 2:] = True
+        return out
+    
+    for card in game.get_legal_actions(player_idx):
+        out[card_to_idx(card)] = True
+    
+    if can_announce(game, player_idx):
+        player_team = game.teams[player_idx]
+        if player_team == TEAM_RE:
+            out[action_size] = True
+        elif player_team == TEAM_KONTRA:
+            out[action_size + 1] = True
+    
+    return out
+
 class RLAgent:
     """Reinforcement Learning agent using Deep Q-Learning."""
     
@@ -100,7 +552,12 @@ class RLAgent:
                  epsilon_decay: float = 0.995,
                  buffer_size: int = 10000,
                  batch_size: int = 64,
-                 target_update: int = 10):
+                 target_update: int = 10,
+                 augment: bool = False,
+                 packed_replay: bool = True,
+                 network: str = 'mlp',
+                 n_step: int = 1,
+                 td_lambda: Optional[float] = None):
         """
         Initialize the RL agent.
         
@@ -115,6 +572,11 @@ class RLAgent:
             buffer_size: Size of the replay buffer
             batch_size: Batch size for training
             target_update: How often to update the target network
+            augment: Whether to train on random suit-symmetric equivalents of sampled transitions
+            packed_replay: Whether to store replay observations bit-packed instead of as float32 tensors
+            network: Q-network architecture ('mlp' or 'card_embedding')
+            n_step: Number of rewards summed per transition between begin_episode and end_episode
+            td_lambda: Store lambda-returns instead of n-step returns between begin_episode and end_episode
         """
         # Base state and action sizes for cards
         self.state_size = state_size
@@ -132,63 +594,115 @@ class RLAgent:
         self.epsilon = epsilon_start
         self.epsilon_end = epsilon_end
         self.epsilon_decay = epsilon_decay
+        # Whether the last select_action call returned a random exploratory action
+        self.last_action_explored = False
         self.batch_size = batch_size
         self.target_update = target_update
         
         # Initialize device
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
-        # Initialize networks with expanded action space
-        self.policy_net = DQN(state_size, self.total_action_size).to(self.device)
-        self.target_net = DQN(state_size, self.total_action_size).to(self.device)
-        self.target_net.load_state_dict(self.policy_net.state_dict())
-        self.target_net.eval()
-        
-        # Initialize optimizer
-        self.optimizer = optim.Adam(self.policy_net.parameters(), lr=learning_rate)
+        # Initialize networks with expanded action space, and the optimizer
+        self.learning_rate = learning_rate
+        self._build_networks(network)
         
         # Initialize replay buffer
-        self.replay_buffer = ReplayBuffer(buffer_size)
+        if packed_replay and state_size == get_state_size():
+            self.replay_buffer = PackedReplayBuffer(buffer_size, self.device, gamma)
+        else:
+            self.replay_buffer = ReplayBuffer(buffer_size, gamma)
+        
+        # Decisions of the running episode, written to the replay buffer by end_episode
+        self.n_step = n_step
+        self.td_lambda = td_lambda
+        self.episode = None
         
         # Initialize step counter
         self.steps_done = 0
+        
+        # Phase profiler (disabled unless the trainer installs one)
+        self.profiler = NULL_PROFILER
+        
+        # Suit-permutation augmentation applied to sampled batches
+        self.augmentation = None
+        if augment:
+            self.augmentation = SuitAugmentation(
+                state_size, action_size, self.total_action_size, self.num_variant_actions, device=self.device)
+    
+    def _build_networks(self, network: str):
+        """
+        Create the policy and target networks and the optimizer.
+        
+        Args:
+            network: Q-network architecture ('mlp' or 'card_embedding')
+        """
+        self.network = network
+        self.policy_net = create_network(network, self.state_size, self.total_action_size).to(self.device)
+        self.target_net = create_network(network, self.state_size, self.total_action_size).to(self.device)
+        self.target_net.load_state_dict(self.policy_net.state_dict())
+        self.target_net.eval()
+        self.optimizer = optim.Adam(self.policy_net.parameters(), lr=self.learning_rate)
+    
+    def _q_values(self, game, player_idx: int) -> torch.Tensor:
+        """
+        Compute the Q-values of the player's current situation.
+        
+        The card-embedding network reads the compact state directly when the game provides it.
+        
+        Args:
+            game: The game instance
+            player_idx: Index of the player
+            
+        Returns:
+            Q-values of shape (1, total_action_size)
+        """
+        if self.network == 'card_embedding' and hasattr(game, 'get_compact_state_for_player'):
+            with self.profiler.phase('select_action.encode'):
+                inputs = encode_compact_states([game.get_compact_state_for_player(player_idx)], self.device)
+            with self.profiler.phase('select_action.forward'):
+                return self.policy_net.forward_compact(*inputs)
+        
+        with self.profiler.phase('select_action.encode'):
+            state = game.get_state_for_player(player_idx)
+            state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+        with self.profiler.phase('select_action.forward'):
+            return self.policy_net(state_tensor)
     
     def select_action(self, game: Dict, player_idx: int) -> Any:
         """
         Select an action using epsilon-greedy policy.
+        last_action_explored tells afterwards whether the action was a random one.
         
         Args:
-            game: The game state dictionary
+            game: The game instance or state dictionary
             player_idx: Index of the player
             
         Returns:
             The selected action (card, announcement, or game variant)
         """
+        game = as_game(game)
+        self.last_action_explored = False
+        
         # Check if we need to select a game variant (at the start of the game)
         if hasattr(game, 'variant_selection_phase') and game.variant_selection_phase:
             return self._select_variant_action(game, player_idx)
         
         # Check if we can make an announcement
-        can_announce = hasattr(game, 'can_announce') and game.can_announce
-        if not can_announce:
-            # If not explicitly tracked, we can announce until the fifth card is played
-            cards_played = len(game.current_trick)
-            for trick in game.tricks:
-                cards_played += len(trick)
-            can_announce = cards_played < 5
+        can_announce = self._can_announce(game, player_idx)
         
         # Get legal card actions
         legal_card_actions = game.get_legal_actions(player_idx)
         if not legal_card_actions and not can_announce:
             return None
         
-        # Get state representation
-        state = game.get_state_for_player(player_idx)
-        state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
+        # A forced card is played without running the network
+        if len(legal_card_actions) == 1 and not can_announce:
+            return ('card', legal_card_actions[0])
         
         # Epsilon-greedy action selection
         if random.random() < self.epsilon:
             # Random action selection
+            self.last_action_explored = True
             
             # Determine all possible actions
             all_possible_actions = []
@@ -213,7 +727,7 @@ class RLAgent:
         else:
             # Greedy action selection
             with torch.no_grad():
-                q_values = self.policy_net(state_tensor)
+                q_values = self._q_values(game, player_idx)
                 
                 # Collect all possible actions with their Q-values
                 action_q_values = []
@@ -239,6 +753,35 @@ class RLAgent:
                     return (action_type, action)
                 return None
     
+    def select_actions(self, states: np.ndarray, legal_masks: np.ndarray) -> np.ndarray:
+        """
+        Select epsilon-greedy actions for a batch of observations with one forward pass.
+        
+        Args:
+            states: Observations of shape (batch, state_size)
+            legal_masks: Boolean masks over the full action space, from legal_action_mask
+            
+        Returns:
+            The selected action index (in the full action space) for each observation
+        """
+        legal_masks = np.asarray(legal_masks, dtype=bool)
+        explore = np.array([random.random() < self.epsilon for _ in range(len(legal_masks))], dtype=bool)
+        actions = np.zeros(len(legal_masks), dtype=np.int64)
+        
+        for i in np.flatnonzero(explore):
+            actions[i] = random.choice(np.flatnonzero(legal_masks[i]))
+        
+        greedy = np.flatnonzero(~explore)
+        if len(greedy):
+            with torch.no_grad():
+                with self.profiler.phase('select_action.forward'):
+                    q_values = self.policy_net(torch.as_tensor(np.asarray(states)[greedy], dtype=torch.float32,
+                                                               device=self.device))
+                mask = torch.as_tensor(legal_masks[greedy], device=self.device)
+                actions[greedy] = q_values.masked_fill(~mask, float('-inf')).argmax(dim=1).cpu().numpy()
+        
+        return actions
+    
     def _select_variant_action(self, game: Dict, player_idx: int) -> Any:
         """
         Select a game variant action.
@@ -250,19 +793,16 @@ class RLAgent:
         Returns:
             The selected game variant
         """
-        # Get state representation
-        state = game.get_state_for_player(player_idx)
-        state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-        
         # Epsilon-greedy variant selection
         if random.random() < self.epsilon:
             # Random variant
+            self.last_action_explored = True
             variants = ['normal', 'hochzeit', 'queen_solo', 'jack_solo', 'fleshless']
             return ('variant', random.choice(variants))
         else:
             # Greedy variant selection
             with torch.no_grad():
-                q_values = self.policy_net(state_tensor)
+                q_values = self._q_values(game, player_idx)
                 
                 # Get Q-values for variant actions
                 variant_start_idx = self.action_size + self.num_announcement_actions
@@ -275,6 +815,69 @@ class RLAgent:
                 variant_idx = variant_q_values.argmax().item()
                 return ('variant', variants[variant_idx])
     
+    def forced_action(self, game, player_idx: int) -> Any:
+        """
+        Get the action of a decision that is no choice: a single legal card and no announcement.
+        
+        Args:
+            game: The game instance
+            player_idx: Index of the player
+            
+        Returns:
+            ('card', card) if the move is forced, None otherwise
+        """
+        if getattr(game, 'variant_selection_phase', False) or self._can_announce(game, player_idx):
+            return None
+        legal_card_actions = game.get_legal_actions(player_idx)
+        if len(legal_card_actions) != 1:
+            return None
+        return ('card', legal_card_actions[0])
+    
+    def _can_announce(self, game, player_idx: int) -> bool:
+        """
+        Check whether the player's team may still make its announcement.
+        
+        Args:
+            game: The game instance
+            player_idx: Index of the player
+            
+        Returns:
+            True if an announcement is allowed
+        """
+        return can_announce(game, player_idx)
+    
+    def legal_action_mask(self, game, player_idx: int) -> np.ndarray:
+        """
+        Get the actions the agent may choose from in the current situation.
+        
+        Args:
+            game: The game instance
+            player_idx: Index of the player
+            
+        Returns:
+            Boolean array over the full action space (cards, announcements and variants)
+        """
+        return legal_action_mask(game, player_idx, self.action_size)
+    
+    def action_index(self, action, action_type: str = 'card') -> int:
+        """
+        Convert an action to its index in the full action space.
+        
+        Args:
+            action: Card index, announcement ('re' or 'contra') or variant name
+            action_type: Type of action ('card', 'announce', or 'variant'); any other type
+                passes an index that is already in the full action space through
+            
+        Returns:
+            The action index
+        """
+        if action_type == 'announce':
+            return self.action_size if action == 're' else self.action_size + 1
+        if action_type == 'variant':
+            variants = ['normal', 'hochzeit', 'queen_solo', 'jack_solo', 'fleshless']
+            return self.action_size + self.num_announcement_actions + variants.index(action)
+        return action
+    
     def observe_action(self, state, action, next_state, reward, action_type='card'):
         """
         Observe an action and its result.
@@ -286,85 +889,145 @@ class RLAgent:
             reward: The reward received
             action_type: Type of action ('card', 'announce', or 'variant')
         """
-        # Convert to tensors
-        state_tensor = torch.FloatTensor(state).to(self.device)
-        
         # Adjust action index based on action type
-        if action_type == 'announce':
-            if action == 're':
-                action = self.action_size  # First announcement action
-            else:  # 'contra'
-                action = self.action_size + 1  # Second announcement action
-        elif action_type == 'variant':
-            variants = ['normal', 'hochzeit', 'queen_solo', 'jack_solo', 'fleshless']
-            variant_idx = variants.index(action)
-            action = self.action_size + self.num_announcement_actions + variant_idx
+        action = self.action_index(action, action_type)
         
-        action_tensor = torch.LongTensor([action]).to(self.device)
-        
-        if next_state is not None:
-            next_state_tensor = torch.FloatTensor(next_state).to(self.device)
+        if self.episode is not None:
+            # Collected until end_episode computes the returns
+            self.episode.add(state, action, next_state, reward)
+        elif isinstance(self.replay_buffer, PackedReplayBuffer):
+            # The packed buffer stores the raw observations directly
+            self.replay_buffer.push(state, action, next_state, reward)
         else:
-            next_state_tensor = None
+            # Convert to tensors
+            state_tensor = torch.FloatTensor(state).to(self.device)
+            action_tensor = torch.LongTensor([action]).to(self.device)
             
-        reward_tensor = torch.FloatTensor([reward]).to(self.device)
-        
-        # Store transition in replay buffer
-        self.replay_buffer.push(state_tensor, action_tensor, next_state_tensor, reward_tensor)
+            if next_state is not None:
+                next_state_tensor = torch.FloatTensor(next_state).to(self.device)
+            else:
+                next_state_tensor = None
+                
+            reward_tensor = torch.FloatTensor([reward]).to(self.device)
+            
+            # Store transition in replay buffer
+            self.replay_buffer.push(state_tensor, action_tensor, next_state_tensor, reward_tensor)
         
+        self.record_step()
+    
+    def record_step(self):
+        """Advance the step counter, sync the target network when due and decay epsilon."""
         # Increment step counter
         self.steps_done += 1
         
         # Update target network if needed
         if self.steps_done % self.target_update == 0:
-            self.target_net.load_state_dict(self.policy_net.state_dict())
+            with self.profiler.phase('observe.target_sync'):
+                self.target_net.load_state_dict(self.policy_net.state_dict())
         
         # Decay epsilon
         self.epsilon = max(self.epsilon_end, self.epsilon * self.epsilon_decay)
     
-    def train(self):
-        """Train the agent using a batch from the replay buffer."""
-        if len(self.replay_buffer) < self.batch_size:
-            return
-        
-        # Sample a batch from the replay buffer
-        transitions = self.replay_buffer.sample(self.batch_size)
-        batch = Transition(*zip(*transitions))
+    def begin_episode(self):
+        """
+        Start collecting the decisions of an episode.
         
-        # Create batch tensors
-        state_batch = torch.stack(batch.state)
-        action_batch = torch.cat(batch.action)
-        reward_batch = torch.cat(batch.reward)
+        Until end_episode, observed actions are not pushed one by one; end_episode
+        computes n-step or lambda returns for the whole episode and writes them at once.
+        """
+        self.episode = self.new_episode()
+    
+    def add_reward(self, reward: float):
+        """
+        Add a reward to the open episode's last decision, e.g. that of a forced move played
+        after it. Without an open episode the reward is dropped.
         
-        # Create mask for non-terminal states
-        non_final_mask = torch.tensor(
-            tuple(map(lambda s: s is not None, batch.next_state)),
-            device=self.device, dtype=torch.bool)
+        Args:
+            reward: The reward to add
+        """
+        if self.episode is not None:
+            self.episode.add_reward(reward)
+    
+    def new_episode(self) -> EpisodeAccumulator:
+        """
+        Create an accumulator for one episode with the agent's return settings.
         
-        non_final_next_states = torch.stack(
-            [s for s in batch.next_state if s is not None])
+        Returns:
+            An empty EpisodeAccumulator
+        """
+        return EpisodeAccumulator(self.gamma, self.n_step, self.td_lambda)
+    
+    def end_episode(self, final_reward: float = 0.0):
+        """
+        Write the collected episode into the replay buffer.
         
-        # Compute Q-values for the current states and actions
-        state_action_values = self.policy_net(state_batch).gather(1, action_batch.unsqueeze(1))
+        Args:
+            final_reward: End-of-game reward added to the last decision, which is terminal
+        """
+        if self.episode is None:
+            return
+        episode, self.episode = self.episode, None
+        self.write_episode(episode, final_reward)
+    
+    def write_episode(self, episode: EpisodeAccumulator, final_reward: float = 0.0):
+        """
+        Compute the returns of a finished episode and write it into the replay buffer.
         
-        # Compute V(s_{t+1}) for all next states
-        next_state_values = torch.zeros(self.batch_size, device=self.device)
-        next_state_values[non_final_mask] = self.target_net(non_final_next_states).max(1)[0].detach()
+        Args:
+            episode: Accumulator holding the episode's decisions
+            final_reward: End-of-game reward added to the last decision, which is terminal
+        """
+        with self.profiler.phase('observe.returns'):
+            batch = episode.finish(final_reward, self._state_values if self.td_lambda is not None else None)
+            if batch is not None:
+                self.replay_buffer.push_batch(**batch, device=self.device)
+    
+    def _state_values(self, states: np.ndarray) -> np.ndarray:
+        """Estimate the values (max Q) of a batch of observations with the target network."""
+        with torch.no_grad():
+            q_values = self.target_net(torch.as_tensor(states, device=self.device))
+        return q_values.max(1)[0].cpu().numpy()
+    
+    def train(self):
+        """Train the agent using a batch from the replay buffer."""
+        if len(self.replay_buffer) < self.batch_size:
+            return
         
-        # Compute the expected Q-values
-        expected_state_action_values = (next_state_values * self.gamma) + reward_batch
+        # Sample a batch from the replay buffer
+        with self.profiler.phase('learn.sample'):
+            state_batch, action_batch, reward_batch, non_final_mask, non_final_next_states, discount_batch = \
+                self.replay_buffer.sample_batch(self.batch_size)
         
-        # Compute the loss
-        loss = F.smooth_l1_loss(state_action_values, expected_state_action_values.unsqueeze(1))
+        if self.augmentation is not None:
+            with self.profiler.phase('learn.augment'):
+                state_batch, action_batch, non_final_next_states = self.augmentation.augment(
+                    state_batch, action_batch, non_final_next_states, non_final_mask)
         
-        # Optimize the model
-        self.optimizer.zero_grad()
-        loss.backward()
-        for param in self.policy_net.parameters():
-            param.grad.data.clamp_(-1, 1)
-        self.optimizer.step()
+        with self.profiler.phase('learn.backprop'):
+            # Compute Q-values for the current states and actions
+            state_action_values = self.policy_net(state_batch).gather(1, action_batch.unsqueeze(1))
+            
+            # Compute V(s_{t+1}) for all next states
+            next_state_values = torch.zeros(self.batch_size, device=self.device)
+            if len(non_final_next_states):
+                next_state_values[non_final_mask] = self.target_net(non_final_next_states).max(1)[0].detach()
+            
+            # Compute the expected Q-values; the discount is gamma for one-step transitions,
+            # gamma^n for n-step returns and 0 for terminal transitions and lambda-returns
+            expected_state_action_values = (next_state_values * discount_batch) + reward_batch
+            
+            # Compute the loss
+            loss = F.smooth_l1_loss(state_action_values, expected_state_action_values.unsqueeze(1))
+            
+            # Optimize the model
+            self.optimizer.zero_grad()
+            loss.backward()
+            for param in self.policy_net.parameters():
+                param.grad.data.clamp_(-1, 1)
+            self.optimizer.step()
+            loss_value = loss.item()
         
-        return loss.item()
+        return loss_value
     
     def save(self, path: str):
         """
@@ -375,14 +1038,58 @@ class RLAgent:
         """
         torch.save(self.policy_net.state_dict(), path)
     
+    def get_checkpoint_state(self) -> Dict:
+        """
+        Take a snapshot of everything needed to resume training.
+        
+        The tensors are copied, so the snapshot can be written to disk on another
+        thread while training keeps updating the live networks and optimizer.
+        
+        Returns:
+            A dictionary with the networks, optimizer, exploration state and replay buffer
+        """
+        return {
+            'network': self.network,
+            'policy_net': {k: v.detach().clone() for k, v in self.policy_net.state_dict().items()},
+            'target_net': {k: v.detach().clone() for k, v in self.target_net.state_dict().items()},
+            'optimizer': copy.deepcopy(self.optimizer.state_dict()),
+            'epsilon': self.epsilon,
+            'steps_done': self.steps_done,
+            'replay_buffer': self.replay_buffer.get_state()
+        }
+    
+    def load_checkpoint_state(self, checkpoint_state: Dict):
+        """
+        Restore the agent from a snapshot created by get_checkpoint_state.
+        
+        Args:
+            checkpoint_state: The snapshot to restore
+        """
+        network = checkpoint_state.get('network', 'mlp')
+        if network != self.network:
+            self._build_networks(network)
+        self.policy_net.load_state_dict(checkpoint_state['policy_net'])
+        self.target_net.load_state_dict(checkpoint_state['target_net'])
+        self.optimizer.load_state_dict(checkpoint_state['optimizer'])
+        self.epsilon = checkpoint_state['epsilon']
+        self.steps_done = checkpoint_state['steps_done']
+        
+        # Refill the replay buffer, moving the transitions to this agent's device
+        self.replay_buffer.load_state(checkpoint_state['replay_buffer'], self.device)
+    
     def load(self, path: str):
         """
         Load the agent's policy network.
+        The architecture is recognized from the saved weights and the networks are rebuilt if needed.
         
         Args:
             path: Path to load the model from
         """
         # Use map_location to ensure the model loads on the correct device
-        self.policy_net.load_state_dict(torch.load(path, map_location=self.device))
+        state_dict = torch.load(path, map_location=self.device)
+        network, _ = network_from_state_dict(state_dict)
+        if network != self.network:
+            self._build_networks(network)
+        self.policy_net.load_state_dict(state_dict)
         self.target_net.load_state_dict(self.policy_net.state_dict())
         print(f"Model loaded successfully to {self.device}")
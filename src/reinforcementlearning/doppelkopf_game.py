@@ -14,9 +14,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from src.backend.game.doppelkopf import (
     create_game_state, get_legal_actions, play_card, announce, set_variant,
+    determine_teams, cache_hochzeit_status,
     get_state_size as get_doppelkopf_state_size,
     get_action_size as get_doppelkopf_action_size,
-    get_state_for_player, action_to_card, card_to_idx, idx_to_card,
+    get_state_for_player, get_compact_state_for_player, action_to_card, card_to_idx, idx_to_card,
     TEAM_RE, TEAM_KONTRA, TEAM_UNKNOWN,
     VARIANT_NORMAL, VARIANT_HOCHZEIT, VARIANT_QUEEN_SOLO, VARIANT_JACK_SOLO, VARIANT_FLESHLESS, VARIANT_KING_SOLO
 )
@@ -32,9 +33,18 @@ class DoppelkopfGame:
         """Initialize a new Doppelkopf game."""
         self.reset()
     
-    def reset(self):
-        """Reset the game to its initial state."""
+    def reset(self, hands: Optional[List[List[Dict]]] = None):
+        """
+        Reset the game to its initial state.
+        
+        Args:
+            hands: Optional fixed deal (one list of cards per player) instead of a random one
+        """
         self.state = create_game_state()
+        if hands is not None:
+            self.state['hands'] = [[dict(card) for card in hand] for hand in hands]
+            determine_teams(self.state)
+            cache_hochzeit_status(self.state)
         self.num_players = self.state['num_players']
         self.hands = self.state['hands']
         self.tricks = self.state['tricks']
@@ -80,6 +90,15 @@ class DoppelkopfGame:
         """
         result = play_card(self.state, player_idx, card)
         
+        # The engine leaves a completed trick on the table; clear it the way the web
+        # server does, so the trick winner leads the next trick. trick_winner stays set
+        # on this object until the next card is played.
+        self.trick_winner = self.state['trick_winner']
+        if self.trick_winner is not None:
+            self.state['current_trick'] = []
+            self.state['current_player'] = self.trick_winner
+            self.state['trick_winner'] = None
+        
         # Update instance variables
         self.hands = self.state['hands']
         self.tricks = self.state['tricks']
@@ -87,7 +106,6 @@ class DoppelkopfGame:
         self.current_player = self.state['current_player']
         self.scores = self.state['scores']
         self.player_scores = self.state['player_scores']
-        self.trick_winner = self.state['trick_winner']
         self.game_over = self.state['game_over']
         self.can_announce = self.state['can_announce']
         
@@ -162,7 +180,19 @@ class DoppelkopfGame:
             A numpy array representing the state from the player's perspective
         """
         return get_state_for_player(self.state, player_idx)
-    
+
+    def get_compact_state_for_player(self, player_idx: int) -> Dict[str, List]:
+        """
+        Get the compact state representation (card index lists) for the given player.
+
+        Args:
+            player_idx: Index of the player
+
+        Returns:
+            A dictionary with the 'hand', 'trick' and 'played' card indices and the 'context' features
+        """
+        return get_compact_state_for_player(self.state, player_idx)
+
     def action_to_card(self, action: int, player_idx: int) -> Optional[Dict]:
         """
         Convert an action index to a card for the given player.
@@ -217,3 +247,58 @@ class DoppelkopfGame:
             The size of the action space
         """
         return get_doppelkopf_action_size()
+
+class GameStateView:
+    """
+    The DoppelkopfGame interface over an existing game state dictionary, such as the web server's.
+    Attributes are read from the dictionary on every access, so the view never copies or goes
+    stale; changes are made to the dictionary itself with the game functions.
+    """
+    
+    # State entries exposed as attributes, like the instance variables of DoppelkopfGame
+    FIELDS = frozenset([
+        'num_players', 'hands', 'tricks', 'current_trick', 'current_player', 'game_variant',
+        'scores', 'player_scores', 'teams', 'trick_winner', 'game_over', 'variant_selection_phase',
+        're_announced', 'contra_announced', 'can_announce', 'winner'
+    ])
+    
+    __slots__ = ('state',)
+    
+    def __init__(self, state: Dict):
+        """
+        Initialize the view.
+        
+        Args:
+            state: The game state dictionary
+        """
+        self.state = state
+    
+    def __getattr__(self, name: str) -> Any:
+        """Read a state entry as an attribute."""
+        if name in GameStateView.FIELDS:
+            return self.state.get(name)
+        raise AttributeError(f"'GameStateView' object has no attribute '{name}'")
+    
+    get_legal_actions = DoppelkopfGame.get_legal_actions
+    has_hochzeit = DoppelkopfGame.has_hochzeit
+    get_state_for_player = DoppelkopfGame.get_state_for_player
+    get_compact_state_for_player = DoppelkopfGame.get_compact_state_for_player
+    action_to_card = DoppelkopfGame.action_to_card
+    card_to_idx = DoppelkopfGame.card_to_idx
+    idx_to_card = DoppelkopfGame.idx_to_card
+    get_state_size = DoppelkopfGame.get_state_size
+    get_action_size = DoppelkopfGame.get_action_size
+
+def as_game(game) -> Any:
+    """
+    Get an object with the DoppelkopfGame interface for a game or a game state dictionary.
+    
+    Args:
+        game: A DoppelkopfGame (or view) or a game state dictionary
+        
+    Returns:
+        The game itself, or a GameStateView over the dictionary
+    """
+    if isinstance(game, dict):
+        return GameStateView(game)
+    return game
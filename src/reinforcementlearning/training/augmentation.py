@@ -0,0 +1,196 @@
+"""
+Suit-permutation data augmentation for Doppelkopf replay transitions.
+Card suits that play symmetric roles in a game variant can be relabelled without changing
+the game. Each sampled transition is mapped to a random symmetric equivalent (state planes,
+action index and next state) with precomputed index tables, so the cost is one gather.
+"""
+
+import itertools
+import torch
+from typing import List, Tuple
+
+from src.backend.game.doppelkopf import (
+    SUIT_CLUBS, SUIT_SPADES, SUIT_HEARTS, SUIT_DIAMONDS,
+    RANK_NINE, RANK_JACK, RANK_QUEEN, RANK_KING, RANK_TEN, RANK_ACE,
+    VARIANT_NORMAL, VARIANT_HOCHZEIT, VARIANT_QUEEN_SOLO, VARIANT_JACK_SOLO,
+    VARIANT_FLESHLESS, VARIANT_KING_SOLO, card_to_idx, create_card
+)
+
+# Layout of the state vector produced by get_state_for_player
+NUM_CARDS = 48
+NUM_CARD_PLANES = 3  # hand, current trick, played cards
+VARIANT_OFFSET = NUM_CARDS * NUM_CARD_PLANES
+NUM_VARIANTS = 6
+
+ALL_SUITS = (SUIT_CLUBS, SUIT_SPADES, SUIT_HEARTS, SUIT_DIAMONDS)
+ALL_RANKS = (RANK_NINE, RANK_JACK, RANK_QUEEN, RANK_KING, RANK_TEN, RANK_ACE)
+
+# Symmetries of each variant: the suits that may be permuted and the ranks the permutation applies to.
+# Cards of other ranks (trumps ordered by suit, such as the Queens and Jacks in a normal game) stay fixed.
+VARIANT_SYMMETRIES = {
+    # Diamonds and the Ten of Hearts are trump, so only the plain Clubs and Spades are interchangeable
+    VARIANT_NORMAL: ((SUIT_CLUBS, SUIT_SPADES), (RANK_NINE, RANK_KING, RANK_TEN, RANK_ACE)),
+    VARIANT_HOCHZEIT: ((SUIT_CLUBS, SUIT_SPADES), (RANK_NINE, RANK_KING, RANK_TEN, RANK_ACE)),
+    # In a solo every suit is plain apart from the trump rank
+    VARIANT_QUEEN_SOLO: (ALL_SUITS, (RANK_NINE, RANK_JACK, RANK_KING, RANK_TEN, RANK_ACE)),
+    VARIANT_JACK_SOLO: (ALL_SUITS, (RANK_NINE, RANK_QUEEN, RANK_KING, RANK_TEN, RANK_ACE)),
+    VARIANT_KING_SOLO: (ALL_SUITS, (RANK_NINE, RANK_JACK, RANK_QUEEN, RANK_TEN, RANK_ACE)),
+    # Diamonds and the Ten of Hearts are trump; Clubs and Spades are complete plain suits
+    VARIANT_FLESHLESS: ((SUIT_CLUBS, SUIT_SPADES), ALL_RANKS),
+}
+
+def card_permutations(suits: Tuple[int, ...], ranks: Tuple[int, ...]) -> List[List[int]]:
+    """
+    Build the card index permutations for relabelling suits.
+
+    Args:
+        suits: The suits that are permuted among each other
+        ranks: The ranks the relabelling applies to
+
+    Returns:
+        One list per suit permutation, mapping each card index to its new index
+    """
+    permutations = []
+    for perm in itertools.permutations(suits):
+        relabel = dict(zip(suits, perm))
+        mapping = list(range(NUM_CARDS))
+        for suit in suits:
+            for rank in ranks:
+                for is_second in (False, True):
+                    source = card_to_idx(create_card(suit, rank, is_second))
+                    mapping[source] = card_to_idx(create_card(relabel[suit], rank, is_second))
+        permutations.append(mapping)
+    return permutations
+
+class SuitAugmentation:
+    """
+    Maps batches of transitions to random symmetric equivalents.
+
+    For every variant the valid suit permutations are stored as rows of one inverse
+    index table. Additionally, the two copies of each card are swapped at random,
+    which is valid in every variant since copies are interchangeable.
+    """
+
+    def __init__(self, state_size: int, action_size: int, total_action_size: int,
+                 num_variant_actions: int = 5, swap_copies: bool = True, device=None):
+        """
+        Initialize the augmentation tables.
+
+        Args:
+            state_size: Size of the state representation
+            action_size: Number of card actions
+            total_action_size: Size of the full action space (cards, announcements and variants)
+            num_variant_actions: Number of variant actions at the end of the action space
+            swap_copies: Whether to also swap the two copies of each card
+            device: Device the index tables live on
+        """
+        assert action_size == NUM_CARDS, "Augmentation expects one action per card"
+        self.state_size = state_size
+        self.action_size = action_size
+        self.first_variant_action = total_action_size - num_variant_actions
+        self.swap_copies = swap_copies
+        self.device = device or torch.device("cpu")
+
+        # Row 0 is the identity; it is used for variant selections, where the variant is not yet known
+        forward_rows = [list(range(NUM_CARDS))]
+        offsets = []
+        counts = []
+        for variant in range(1, NUM_VARIANTS + 1):
+            suits, ranks = VARIANT_SYMMETRIES[variant]
+            perms = card_permutations(suits, ranks)
+            offsets.append(len(forward_rows))
+            counts.append(len(perms))
+            forward_rows.extend(perms)
+
+        forward = torch.tensor(forward_rows, dtype=torch.long)
+        inverse = torch.empty_like(forward)
+        inverse.scatter_(1, forward, torch.arange(NUM_CARDS).expand_as(forward).contiguous())
+
+        self.card_forward = forward.to(self.device)
+        self.card_inverse = inverse.to(self.device)
+        self.variant_offsets = torch.tensor(offsets, dtype=torch.long, device=self.device)
+        self.variant_counts = torch.tensor(counts, dtype=torch.long, device=self.device)
+
+        card_range = torch.arange(NUM_CARDS, device=self.device)
+        self._card_kind = card_range // 2
+        self._plane_offsets = (torch.arange(NUM_CARD_PLANES, device=self.device) * NUM_CARDS).repeat_interleave(NUM_CARDS)
+        self._tail = torch.arange(VARIANT_OFFSET, state_size, device=self.device)
+
+    def sample_rows(self, state_batch: torch.Tensor, action_batch: torch.Tensor) -> torch.Tensor:
+        """
+        Pick a random valid suit permutation for each transition.
+
+        Args:
+            state_batch: States of shape (batch, state_size)
+            action_batch: Action indices of shape (batch,)
+
+        Returns:
+            Row indices into the permutation tables
+        """
+        variants = state_batch[:, VARIANT_OFFSET:VARIANT_OFFSET + NUM_VARIANTS].argmax(dim=1)
+        counts = self.variant_counts[variants]
+        rows = self.variant_offsets[variants] + (torch.rand(len(variants), device=self.device) * counts).long()
+        # Variant selections are made before the variant applies, so only the identity is safe
+        is_variant_action = action_batch >= self.first_variant_action
+        return torch.where(is_variant_action, torch.zeros_like(rows), rows)
+
+    def augment(self, state_batch: torch.Tensor, action_batch: torch.Tensor,
+                next_state_batch: torch.Tensor, non_final_mask: torch.Tensor):
+        """
+        Map a batch of transitions to random symmetric equivalents.
+
+        Args:
+            state_batch: States of shape (batch, state_size)
+            action_batch: Action indices of shape (batch,)
+            next_state_batch: Next states of the non-final transitions
+            non_final_mask: Boolean mask of the transitions that have a next state
+
+        Returns:
+            Tuple of (states, actions, next states) with the same shapes as the inputs
+        """
+        batch_size = len(state_batch)
+        rows = self.sample_rows(state_batch, action_batch)
+        if self.swap_copies:
+            flips = torch.randint(0, 2, (batch_size, NUM_CARDS // 2), device=self.device)
+        else:
+            flips = torch.zeros((batch_size, NUM_CARDS // 2), dtype=torch.long, device=self.device)
+        return self.apply(state_batch, action_batch, next_state_batch, non_final_mask, rows, flips)
+
+    def apply(self, state_batch: torch.Tensor, action_batch: torch.Tensor, next_state_batch: torch.Tensor,
+              non_final_mask: torch.Tensor, rows: torch.Tensor, flips: torch.Tensor):
+        """
+        Map a batch of transitions with the given symmetries.
+
+        Args:
+            state_batch: States of shape (batch, state_size)
+            action_batch: Action indices of shape (batch,)
+            next_state_batch: Next states of the non-final transitions
+            non_final_mask: Boolean mask of the transitions that have a next state
+            rows: Row of the suit permutation table for each transition
+            flips: Copy swaps of shape (batch, 24), 1 where the two copies of a card kind are swapped
+
+        Returns:
+            Tuple of (states, actions, next states) with the same shapes as the inputs
+        """
+        batch_size = len(state_batch)
+
+        # Inverse card map: the new slot j takes the old slot sigma^-1(j ^ flip(j))
+        flipped = torch.arange(NUM_CARDS, device=self.device) ^ flips[:, self._card_kind]
+        card_inverse = self.card_inverse[rows].gather(1, flipped)
+
+        state_index = torch.cat([
+            card_inverse.repeat(1, NUM_CARD_PLANES) + self._plane_offsets,
+            self._tail.expand(batch_size, -1)
+        ], dim=1)
+
+        states = state_batch.gather(1, state_index)
+        next_states = next_state_batch.gather(1, state_index[non_final_mask])
+
+        # Card actions move with their card; announcements and variants are unchanged
+        is_card = action_batch < self.action_size
+        card_actions = action_batch.clamp(max=self.action_size - 1).unsqueeze(1)
+        moved = self.card_forward[rows].gather(1, card_actions).squeeze(1)
+        moved = moved ^ flips.gather(1, (moved // 2).unsqueeze(1)).squeeze(1)
+        actions = torch.where(is_card, moved, action_batch)
+
+        return states, actions, next_states
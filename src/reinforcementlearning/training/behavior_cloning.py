@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Behavior-cloning pretraining for the Doppelkopf policy network.
+Recorded games (from the trainer, or games labeled by a teacher policy such as a model or the
+heuristic player) are streamed from memory-mapped datasets into the DQN with a
+legal-action-masked cross-entropy loss. Decisions recorded as random exploration are skipped. The result
+is saved in the same state_dict format as RLAgent.save, so RLAgent.load can warm-start from it.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch.utils.data import Dataset, DataLoader, BatchSampler, SubsetRandomSampler
+from typing import Dict, List, Optional, Tuple
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+import src.backend.utils.logger as logger
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.agents.rl_agent import create_network, network_from_state_dict
+from src.reinforcementlearning.training.recorder import DatasetRecorder, DatasetReader
+from src.backend.game.doppelkopf import card_to_idx, get_state_size, get_action_size
+
+# Size of the full action space of RLAgent (cards, 2 announcements, 5 variants)
+TOTAL_ACTION_SIZE = get_action_size() + 2 + 5
+
+class BehaviorCloningDataset(Dataset):
+    """
+    Minibatches of recorded decisions from one or more datasets.
+
+    rows holds the global indices of the greedy decisions, the ones to imitate. Items are whole minibatches: the index passed to __getitem__ is a list of row
+    indices, so a DataLoader with a BatchSampler gathers each batch with one
+    vectorized read per shard. The memory maps are opened lazily in each worker.
+    """
+
+    def __init__(self, dataset_dirs: List[str]):
+        """
+        Initialize the dataset.
+
+        Args:
+            dataset_dirs: Directories of datasets written by DatasetRecorder
+        """
+        self.dataset_dirs = list(dataset_dirs)
+        readers = [DatasetReader(d) for d in self.dataset_dirs]
+        self.state_size = readers[0].state_size
+        self.num_actions = readers[0].num_actions
+        for reader in readers:
+            if reader.state_size != self.state_size or reader.num_actions != self.num_actions:
+                raise ValueError(f"Dataset {reader.dataset_dir} does not match {self.dataset_dirs[0]}")
+        self._starts = np.cumsum([0] + [len(r) for r in readers])
+        self.rows = np.concatenate([reader.greedy_rows() + start for reader, start in zip(readers, self._starts)])
+        self._readers = None
+
+    def __len__(self) -> int:
+        """Get the number of rows over all datasets."""
+        return int(self._starts[-1])
+
+    def __getitem__(self, indices) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Gather a minibatch.
+
+        Args:
+            indices: Global row indices
+
+        Returns:
+            Tuple of (observations, legal masks, actions)
+        """
+        if self._readers is None:
+            self._readers = [DatasetReader(d) for d in self.dataset_dirs]
+
+        indices = np.sort(np.asarray(indices, dtype=np.int64))
+        dataset_positions = np.searchsorted(self._starts, indices, side='right') - 1
+        parts = []
+        for pos in np.unique(dataset_positions):
+            local = indices[dataset_positions == pos] - self._starts[pos]
+            parts.append(self._readers[pos].get_batch(local))
+
+        return (
+            torch.from_numpy(np.concatenate([p['observations'] for p in parts])),
+            torch.from_numpy(np.concatenate([p['legal_masks'] for p in parts])),
+            torch.from_numpy(np.concatenate([p['actions'] for p in parts]).astype(np.int64))
+        )
+
+    def __getstate__(self):
+        """Do not send open memory maps to worker processes."""
+        state = self.__dict__.copy()
+        state['_readers'] = None
+        return state
+
+def masked_cross_entropy(logits: torch.Tensor, legal_masks: torch.Tensor, actions: torch.Tensor) -> torch.Tensor:
+    """
+    Cross-entropy over the legal actions only.
+
+    Args:
+        logits: Network outputs of shape (batch, num_actions)
+        legal_masks: Boolean masks of the legal actions
+        actions: Index of the chosen action
+
+    Returns:
+        The mean loss
+    """
+    return F.cross_entropy(logits.masked_fill(~legal_masks, float('-inf')), actions)
+
+def _make_loader(dataset: Dataset, indices: np.ndarray, batch_size: int, workers: int, shuffle: bool) -> DataLoader:
+    """Create a DataLoader that yields whole minibatches."""
+    if shuffle:
+        sampler = BatchSampler(SubsetRandomSampler(indices.tolist()), batch_size, drop_last=False)
+    else:
+        sampler = [indices[i:i + batch_size].tolist() for i in range(0, len(indices), batch_size)]
+    return DataLoader(dataset, sampler=sampler, batch_size=None, num_workers=workers,
+                      persistent_workers=workers > 0)
+
+def pretrain(dataset_dirs: List[str], output_path: str, epochs: int = 5, batch_size: int = 1024,
+             learning_rate: float = 0.001, workers: int = 2, val_fraction: float = 0.05,
+             init_path: Optional[str] = None, seed: int = 0, network: str = 'mlp') -> Dict:
+    """
+    Train the policy network to imitate the recorded decisions.
+
+    Args:
+        dataset_dirs: Directories of datasets written by DatasetRecorder
+        output_path: Path to save the trained state_dict to
+        epochs: Number of passes over the training rows
+        batch_size: Rows per minibatch
+        learning_rate: Learning rate for Adam
+        workers: Number of DataLoader worker processes
+        val_fraction: Fraction of rows held out for validation
+        init_path: Optional model to start from instead of random weights
+        seed: Seed for the split, the shuffles and the initial weights
+        network: Q-network architecture ('mlp' or 'card_embedding'); ignored when init_path is given
+
+    Returns:
+        A dictionary with the final training loss and validation accuracy
+    """
+    torch.manual_seed(seed)
+    dataset = BehaviorCloningDataset(dataset_dirs)
+    logger.info(f"Behavior cloning on {len(dataset.rows)} of {len(dataset)} decisions from {len(dataset_dirs)} "
+                f"dataset(s), skipping exploratory ones")
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(dataset.rows)
+    num_val = int(len(order) * val_fraction)
+    val_indices, train_indices = np.sort(order[:num_val]), order[num_val:]
+
+    init_state_dict = torch.load(init_path, map_location='cpu') if init_path else None
+    if init_state_dict is not None:
+        network, _ = network_from_state_dict(init_state_dict)
+    net = create_network(network, dataset.state_size, dataset.num_actions)
+    if init_state_dict is not None:
+        net.load_state_dict(init_state_dict)
+    optimizer = torch.optim.Adam(net.parameters(), lr=learning_rate)
+
+    train_loader = _make_loader(dataset, train_indices, batch_size, workers, shuffle=True)
+    val_loader = _make_loader(dataset, val_indices, batch_size, workers, shuffle=False) if num_val else None
+
+    result = {'train_loss': float('nan'), 'val_accuracy': float('nan')}
+    for epoch in range(1, epochs + 1):
+        start_time = time.time()
+        net.train()
+        total_loss, total_rows = 0.0, 0
+        for observations, legal_masks, actions in train_loader:
+            loss = masked_cross_entropy(net(observations), legal_masks, actions)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(actions)
+            total_rows += len(actions)
+        result['train_loss'] = total_loss / max(total_rows, 1)
+
+        if val_loader is not None:
+            result['val_accuracy'] = evaluate_accuracy(net, val_loader)
+
+        logger.info(f"Epoch {epoch}/{epochs} - Loss: {result['train_loss']:.4f}, "
+                    f"Validation accuracy: {result['val_accuracy']:.3f}, "
+                    f"Time: {time.time() - start_time:.1f}s")
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    torch.save(net.state_dict(), output_path)
+    logger.info(f"Saved pretrained model to {output_path}")
+    return result
+
+def evaluate_accuracy(net: torch.nn.Module, loader: DataLoader) -> float:
+    """
+    Measure how often the network picks the recorded action among the legal ones.
+
+    Args:
+        net: The network
+        loader: Loader of (observations, legal masks, actions) minibatches
+
+    Returns:
+        The fraction of matching decisions
+    """
+    net.eval()
+    correct, total = 0, 0
+    with torch.inference_mode():
+        for observations, legal_masks, actions in loader:
+            predictions = net(observations).masked_fill(~legal_masks, float('-inf')).argmax(dim=1)
+            correct += int((predictions == actions).sum())
+            total += len(actions)
+    return correct / max(total, 1)
+
+def label_games(dataset_dir: str, teacher, num_games: int, seed: int = 0, shard_size: int = 100000) -> int:
+    """
+    Record the card plays of a teacher policy playing all four seats.
+
+    The teacher can be any policy that returns a card, for example a FrozenPolicy
+    of a strong model or a heuristic or search-based player.
+
+    Args:
+        dataset_dir: Directory to write the dataset to
+        teacher: Callable or object with select_action(game, player_idx)
+        num_games: Number of games to play
+        seed: Seed for the deals
+        shard_size: Number of rows per shard
+
+    Returns:
+        The number of recorded decisions
+    """
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    recorder = DatasetRecorder(dataset_dir, get_state_size(), TOTAL_ACTION_SIZE, shard_size=shard_size,
+                               metadata={'source': 'label_games'})
+    game = DoppelkopfGame()
+    num_rows = 0
+
+    for _ in range(num_games):
+        game.reset()
+        for player_idx in range(game.num_players):
+            game.set_variant('normal', player_idx)
+
+        recorder.begin_episode()
+        while not game.game_over:
+            player_idx = game.current_player
+            legal_actions = game.get_legal_actions(player_idx)
+            observation = game.get_state_for_player(player_idx)
+            card = teacher.select_action(game, player_idx) if hasattr(teacher, 'select_action') else teacher(game, player_idx)
+
+            legal_mask = np.zeros(TOTAL_ACTION_SIZE, dtype=bool)
+            legal_mask[[card_to_idx(c) for c in legal_actions]] = True
+            recorder.record(observation, legal_mask, card_to_idx(card), 0.0)
+            game.play_card(player_idx, card)
+            num_rows += 1
+        recorder.end_episode()
+
+    recorder.close()
+    logger.info(f"Recorded {num_rows} teacher decisions from {num_games} games to {dataset_dir}")
+    return num_rows
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Pretrain the Doppelkopf policy network by behavior cloning')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    label_parser = subparsers.add_parser('label', help='Record the card plays of a teacher policy')
+    label_parser.add_argument('--teacher', type=str, required=True,
+                              help="'heuristic' or a model saved by RLAgent.save; it plays all four seats")
+    label_parser.add_argument('--games', type=int, default=10000,
+                              help='Number of games to record (default: 10000)')
+    label_parser.add_argument('--output', type=str, required=True,
+                              help='Dataset directory to write')
+    label_parser.add_argument('--seed', type=int, default=0,
+                              help='Seed for the deals (default: 0)')
+
+    train_parser = subparsers.add_parser('train', help='Train the policy network on recorded datasets')
+    train_parser.add_argument('--data', type=str, nargs='+', required=True,
+                              help='One or more dataset directories')
+    train_parser.add_argument('--output', type=str, default='models/pretrained.pt',
+                              help='Where to save the model (default: models/pretrained.pt)')
+    train_parser.add_argument('--epochs', type=int, default=5,
+                              help='Number of epochs (default: 5)')
+    train_parser.add_argument('--batch-size', type=int, default=1024,
+                              help='Minibatch size (default: 1024)')
+    train_parser.add_argument('--learning-rate', type=float, default=0.001,
+                              help='Learning rate (default: 0.001)')
+    train_parser.add_argument('--workers', type=int, default=2,
+                              help='Number of data loading workers (default: 2)')
+    train_parser.add_argument('--init', type=str, default=None,
+                              help='Model to start from instead of random weights')
+    train_parser.add_argument('--network', type=str, default='mlp', choices=['mlp', 'card_embedding'],
+                              help='Network architecture (default: mlp)')
+    return parser.parse_args()
+
+def main():
+    """Main function to run behavior cloning."""
+    args = parse_arguments()
+
+    os.makedirs('logs', exist_ok=True)
+    logger.setup_logger('logs')
+
+    if args.command == 'label':
+        if args.teacher == 'heuristic':
+            from src.reinforcementlearning.agents.heuristic_agent import select_heuristic_action
+            teacher = select_heuristic_action
+        else:
+            from src.reinforcementlearning.training.league import FrozenPolicy
+            state_dict = torch.load(args.teacher, map_location='cpu')
+            _, output_size = network_from_state_dict(state_dict)
+            teacher = FrozenPolicy(state_dict, get_state_size(), output_size, get_action_size())
+        label_games(args.output, teacher, args.games, args.seed)
+    else:
+        pretrain(args.data, args.output, args.epochs, args.batch_size, args.learning_rate,
+                 args.workers, init_path=args.init, network=args.network)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Resumable training checkpoints for the Doppelkopf RL agent.
+A checkpoint bundles the agent's networks, optimizer, exploration state and replay
+buffer together with the random number generator states and the training statistics.
+Checkpoints are written on a background thread so the training loop never waits for disk.
+"""
+
+import os
+import re
+import glob
+import pickle
+import random
+import threading
+import numpy as np
+import torch
+from typing import Dict, List, Optional
+
+import src.backend.utils.logger as logger
+
+# Version of the checkpoint bundle layout
+CHECKPOINT_FORMAT_VERSION = 1
+
+# File naming for checkpoints inside a checkpoint directory
+CHECKPOINT_PATTERN = "checkpoint_episode_{episode}.pt"
+LATEST_POINTER = "latest"
+
+_CHECKPOINT_RE = re.compile(r"checkpoint_episode_(\d+)\.pt$")
+
+def capture_rng_state() -> Dict:
+    """
+    Capture the state of all random number generators used during training.
+
+    Returns:
+        A dictionary with the Python, NumPy and PyTorch RNG states
+    """
+    rng_state = {
+        'python': random.getstate(),
+        'numpy': np.random.get_state(),
+        'torch': torch.get_rng_state()
+    }
+    if torch.cuda.is_available():
+        rng_state['torch_cuda'] = torch.cuda.get_rng_state_all()
+    return rng_state
+
+def restore_rng_state(rng_state: Dict):
+    """
+    Restore the random number generators from a captured state.
+
+    Args:
+        rng_state: The state returned by capture_rng_state
+    """
+    random.setstate(rng_state['python'])
+    np.random.set_state(rng_state['numpy'])
+    torch.set_rng_state(rng_state['torch'])
+    if 'torch_cuda' in rng_state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(rng_state['torch_cuda'])
+
+def build_checkpoint(rl_agent, episode: int, stats: Optional[Dict] = None) -> Dict:
+    """
+    Build a checkpoint bundle from the current training state.
+
+    Args:
+        rl_agent: The RL agent being trained
+        episode: The last completed episode
+        stats: Training statistics to carry over (e.g. episode rewards and wins)
+
+    Returns:
+        The checkpoint bundle
+    """
+    return {
+        'format_version': CHECKPOINT_FORMAT_VERSION,
+        'episode': episode,
+        'agent': rl_agent.get_checkpoint_state(),
+        'rng': capture_rng_state(),
+        'stats': {k: list(v) for k, v in (stats or {}).items()}
+    }
+
+def list_checkpoints(checkpoint_dir: str) -> List[str]:
+    """
+    List the checkpoints in a directory, oldest first.
+
+    Args:
+        checkpoint_dir: Directory containing checkpoints
+
+    Returns:
+        The checkpoint paths sorted by episode
+    """
+    checkpoints = []
+    for path in glob.glob(os.path.join(checkpoint_dir, "checkpoint_episode_*.pt")):
+        match = _CHECKPOINT_RE.search(path)
+        if match:
+            checkpoints.append((int(match.group(1)), path))
+    return [path for _, path in sorted(checkpoints)]
+
+def find_latest_checkpoint(checkpoint_dir: str) -> Optional[str]:
+    """
+    Find the most recent complete checkpoint in a directory.
+
+    Args:
+        checkpoint_dir: Directory containing checkpoints
+
+    Returns:
+        The path of the latest checkpoint, or None if there is none
+    """
+    pointer_path = os.path.join(checkpoint_dir, LATEST_POINTER)
+    if os.path.exists(pointer_path):
+        with open(pointer_path) as f:
+            path = os.path.join(checkpoint_dir, f.read().strip())
+        if os.path.exists(path):
+            return path
+
+    # Fall back to scanning the directory if the pointer is missing or stale
+    checkpoints = list_checkpoints(checkpoint_dir)
+    return checkpoints[-1] if checkpoints else None
+
+def resolve_checkpoint_path(resume: str, checkpoint_dir: str) -> Optional[str]:
+    """
+    Resolve the value of a --resume option to a checkpoint file.
+
+    Args:
+        resume: A checkpoint file, a checkpoint directory, or 'latest'
+        checkpoint_dir: Default checkpoint directory used for 'latest'
+
+    Returns:
+        The checkpoint path, or None if no checkpoint was found
+    """
+    if resume == 'latest':
+        return find_latest_checkpoint(checkpoint_dir)
+    if os.path.isdir(resume):
+        return find_latest_checkpoint(resume)
+    return resume if os.path.exists(resume) else None
+
+def load_checkpoint(path: str, rl_agent) -> Dict:
+    """
+    Load a checkpoint and restore the agent and RNG states from it.
+
+    Args:
+        path: Path of the checkpoint file
+        rl_agent: The RL agent to restore
+
+    Returns:
+        The checkpoint bundle (with 'episode' and 'stats')
+    """
+    # The bundle contains optimizer and RNG state, not just tensors
+    bundle = torch.load(path, map_location=rl_agent.device, weights_only=False)
+
+    if bundle.get('format_version') != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format in {path}: {bundle.get('format_version')}")
+
+    rl_agent.load_checkpoint_state(bundle['agent'])
+    restore_rng_state(bundle['rng'])
+
+    logger.info(f"Resumed from checkpoint {path} (episode {bundle['episode']})")
+    return bundle
+
+def load_policy_state_dict(path: str, map_location='cpu') -> Dict:
+    """
+    Load the policy network weights of a saved model or of a checkpoint bundle.
+
+    A model saved by RLAgent.save only holds tensors and loads with weights_only. A bundle
+    also pickles the optimizer and RNG states, so it is loaded in full once the restricted
+    load rejects it.
+
+    Args:
+        path: A model saved by RLAgent.save, or a checkpoint written by CheckpointWriter
+        map_location: Device to load the tensors to
+
+    Returns:
+        The state dict of the policy network
+    """
+    try:
+        return torch.load(path, map_location=map_location, weights_only=True)
+    except pickle.UnpicklingError:
+        bundle = torch.load(path, map_location=map_location, weights_only=False)
+
+    if bundle.get('format_version') != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format in {path}: {bundle.get('format_version')}")
+    return bundle['agent']['policy_net']
+
+def _atomic_write_text(path: str, text: str):
+    """Write a small text file atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+class CheckpointWriter:
+    """
+    Writes checkpoint bundles to disk on a background thread.
+
+    Only the newest pending bundle is kept: if the training loop produces a new
+    checkpoint while the previous one is still being written, the older pending
+    bundle is dropped instead of blocking the loop. Files are written to a
+    temporary name and renamed into place, and only the last keep_last
+    checkpoints are kept.
+    """
+
+    def __init__(self, checkpoint_dir: str, keep_last: int = 3):
+        """
+        Initialize the checkpoint writer.
+
+        Args:
+            checkpoint_dir: Directory to write checkpoints to
+            keep_last: Number of checkpoints to keep
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.keep_last = max(1, keep_last)
+        self.last_error = None
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, bundle: Dict):
+        """
+        Queue a checkpoint bundle for writing. Returns immediately.
+
+        Args:
+            bundle: The bundle created by build_checkpoint
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("CheckpointWriter is closed")
+            if self._pending is not None:
+                logger.warning(f"Dropping unwritten checkpoint for episode {self._pending['episode']}")
+            self._pending = bundle
+            self._condition.notify()
+
+    def close(self):
+        """Write any pending checkpoint and stop the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        """Writer thread main loop."""
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                bundle, self._pending = self._pending, None
+
+            try:
+                self._write(bundle)
+            except Exception as e:
+                self.last_error = e
+                logger.error(f"Failed to write checkpoint for episode {bundle['episode']}: {e}")
+
+    def _write(self, bundle: Dict):
+        """Write one bundle atomically and rotate old checkpoints."""
+        filename = CHECKPOINT_PATTERN.format(episode=bundle['episode'])
+        path = os.path.join(self.checkpoint_dir, filename)
+        tmp_path = f"{path}.tmp"
+
+        torch.save(bundle, tmp_path)
+        os.replace(tmp_path, path)
+        _atomic_write_text(os.path.join(self.checkpoint_dir, LATEST_POINTER), filename)
+
+        # Remove the oldest checkpoints beyond keep_last
+        for old_path in list_checkpoints(self.checkpoint_dir)[:-self.keep_last]:
+            os.remove(old_path)
+
+        logger.info(f"Saved checkpoint to {path}")
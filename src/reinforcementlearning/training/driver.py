@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Configurable training driver for the Doppelkopf RL agent.
+
+One entry point runs every training setup: a profile ('debug', 'smoke' or 'full') picks the
+number of episodes, how the games are run (a single environment, a vector of environments
+in this process, or environments in worker processes), the reward, the replay storage and
+the logging, and single settings can be overridden on the command line. The games are
+stepped at the agent's decisions only, so the actions of all environments are selected with
+one forward pass, and each environment's episode goes to the replay buffer when it ends.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+from typing import Any, Dict, Optional
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+import src.backend.utils.logger as logger
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+from src.reinforcementlearning.training.envs import SubprocVectorEnv, make_vector_env
+from src.reinforcementlearning.training.rewards import REWARD_FUNCTIONS
+
+# Settings shared by all profiles
+DEFAULT_CONFIG = {
+    'episodes': 10000,
+    'backend': 'vector',
+    'num_envs': 8,
+    'workers': 2,
+    'opponent': 'random',
+    'reward': 'shaped',
+    'learner': 'dqn',
+    'replay': 'packed',
+    'network': 'mlp',
+    'learning_rate': 0.001,
+    'gamma': 0.99,
+    'epsilon_start': 1.0,
+    'epsilon_end': 0.1,
+    'epsilon_decay': 0.995,
+    'buffer_size': 10000,
+    'batch_size': 64,
+    'n_step': 1,
+    'td_lambda': None,
+    'transitions_per_update': 1,
+    'fast_forward': True,
+    'init_model': None,
+    'model_dir': 'models/driver',
+    'save_interval': 1000,
+    'log_interval': 100,
+    'log_dir': 'logs',
+    'verbose': False,
+    'seed': None
+}
+
+# Named profiles; each overrides some of the defaults
+PROFILES = {
+    'debug': {'episodes': 5, 'backend': 'single', 'num_envs': 1, 'log_interval': 1, 'save_interval': 0,
+              'verbose': True},
+    'smoke': {'episodes': 200, 'backend': 'vector', 'num_envs': 8, 'log_interval': 50, 'save_interval': 0},
+    'full': {'episodes': 100000, 'backend': 'subproc', 'num_envs': 64, 'workers': 4, 'buffer_size': 100000,
+             'transitions_per_update': 4, 'log_interval': 1000, 'save_interval': 5000}
+}
+
+BACKENDS = ('single', 'vector', 'subproc')
+REPLAYS = ('packed', 'tensor')
+
+def build_config(profile: str = 'smoke', overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Combine the defaults, a profile and explicit overrides into one configuration.
+
+    Args:
+        profile: Name of the profile in PROFILES
+        overrides: Settings that replace the profile's values (None values are ignored)
+
+    Returns:
+        The configuration dictionary
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}")
+    config = dict(DEFAULT_CONFIG)
+    config.update(PROFILES[profile])
+    for key, value in (overrides or {}).items():
+        if key not in DEFAULT_CONFIG:
+            raise ValueError(f"Unknown setting: {key}")
+        if value is not None:
+            config[key] = value
+
+    if config['backend'] not in BACKENDS:
+        raise ValueError(f"Unknown backend: {config['backend']}")
+    if config['replay'] not in REPLAYS:
+        raise ValueError(f"Unknown replay storage: {config['replay']}")
+    if config['reward'] not in REWARD_FUNCTIONS:
+        raise ValueError(f"Unknown reward: {config['reward']}")
+    if config['learner'] not in LEARNERS:
+        raise ValueError(f"Unknown learner: {config['learner']}")
+    if config['backend'] == 'single':
+        config['num_envs'] = 1
+    return config
+
+class DQNLearner:
+    """
+    Trains the RLAgent from the driver's batched environment steps.
+
+    Keeps one episode accumulator per environment, so the n-step or lambda returns of every
+    game are computed when that game ends, and trains the agent every few transitions.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Create the agent.
+
+        Args:
+            config: The driver configuration
+        """
+        from src.reinforcementlearning.agents.rl_agent import RLAgent
+
+        self.agent = RLAgent(get_state_size(), get_action_size(),
+                             learning_rate=config['learning_rate'], gamma=config['gamma'],
+                             epsilon_start=config['epsilon_start'], epsilon_end=config['epsilon_end'],
+                             epsilon_decay=config['epsilon_decay'], buffer_size=config['buffer_size'],
+                             batch_size=config['batch_size'], packed_replay=config['replay'] == 'packed',
+                             network=config['network'], n_step=config['n_step'],
+                             td_lambda=config['td_lambda'])
+        if config['init_model']:
+            self.agent.load(config['init_model'])
+        self.transitions_per_update = max(1, config['transitions_per_update'])
+        self.episodes = [self.agent.new_episode() for _ in range(config['num_envs'])]
+        self.transitions = 0
+        self.trace = logger.is_enabled_for(logging.DEBUG)
+
+    def act(self, observations: np.ndarray, masks: np.ndarray) -> np.ndarray:
+        """
+        Select the actions of all environments.
+
+        Args:
+            observations: One observation per environment
+            masks: One legal-action mask per environment
+
+        Returns:
+            One action index per environment
+        """
+        return self.agent.select_actions(observations, masks)
+
+    def observe(self, env_idx: int, state, action: int, next_state, reward: float):
+        """
+        Record one decision of an environment and train when an update is due.
+
+        Args:
+            env_idx: Index of the environment
+            state: The observation before the action
+            action: The action index
+            next_state: The observation at the next decision (None if the game ended)
+            reward: The immediate reward
+        """
+        self.episodes[env_idx].add(state, action, next_state, reward)
+        self.agent.record_step()
+        self.transitions += 1
+        if self.trace:
+            logger.debug("Environment %d: action %d, reward %.2f%s", env_idx, action, reward,
+                         ", game over" if next_state is None else "")
+        if self.transitions % self.transitions_per_update == 0:
+            loss = self.agent.train()
+            if self.trace and loss is not None:
+                logger.debug("Update after %d transitions: loss %.4f, epsilon %.3f", self.transitions, loss,
+                             self.agent.epsilon)
+
+    def end_episode(self, env_idx: int, final_reward: float):
+        """
+        Write an environment's finished episode into the replay buffer.
+
+        Args:
+            env_idx: Index of the environment
+            final_reward: End-of-game reward added to the last decision
+        """
+        self.agent.write_episode(self.episodes[env_idx], final_reward)
+        if self.trace:
+            logger.debug("Environment %d: episode written to the replay buffer, final reward %.2f",
+                         env_idx, final_reward)
+
+    def save(self, path: str):
+        """
+        Save the agent's policy network.
+
+        Args:
+            path: Path of the model file
+        """
+        self.agent.save(path)
+
+# Learners by name; a learner is created from the configuration and provides act, observe,
+# end_episode and save, and exposes the trained RLAgent as agent
+LEARNERS = {
+    'dqn': DQNLearner
+}
+
+def make_env(config: Dict[str, Any]):
+    """
+    Create the environments selected by the configuration.
+
+    Args:
+        config: The driver configuration
+
+    Returns:
+        A VectorEnv or SubprocVectorEnv
+    """
+    if config['backend'] == 'subproc':
+        return SubprocVectorEnv(config['num_envs'], config['workers'], config['opponent'], config['reward'],
+                                config['fast_forward'], seed=config['seed'])
+    return make_vector_env(config['num_envs'], config['opponent'], config['reward'], config['fast_forward'])
+
+def run(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train with a configuration from build_config.
+
+    Args:
+        config: The driver configuration
+
+    Returns:
+        Dictionary with the number of 'episodes' and 'transitions', the 'win_rate' and
+        'avg_reward' over all episodes, the 'seconds' taken and the 'learner'
+    """
+    if config['seed'] is not None:
+        import random
+        import torch
+        random.seed(config['seed'])
+        np.random.seed(config['seed'])
+        torch.manual_seed(config['seed'])
+
+    learner = LEARNERS[config['learner']](config)
+    env = make_env(config)
+    num_episodes = config['episodes']
+    log_interval = config['log_interval']
+    save_interval = config['save_interval']
+    if save_interval:
+        os.makedirs(config['model_dir'], exist_ok=True)
+
+    logger.info("Training with %s backend, %d environments, %s reward, %s learner for %d episodes",
+                config['backend'], config['num_envs'], config['reward'], config['learner'], num_episodes)
+
+    episodes = 0
+    wins = 0
+    total_reward = 0.0
+    interval_wins = 0
+    interval_reward = 0.0
+    start_time = time.time()
+    interval_start = start_time
+
+    try:
+        observations, masks = env.reset()
+        while episodes < num_episodes:
+            actions = learner.act(observations, masks)
+            next_observations, next_masks, rewards, dones, infos = env.step(actions)
+
+            for i in range(len(actions)):
+                # A finished environment has already been reset, so its transition is terminal
+                next_state = None if dones[i] else next_observations[i]
+                learner.observe(i, observations[i], actions[i], next_state, rewards[i])
+                if not dones[i] or episodes >= num_episodes:
+                    continue
+
+                learner.end_episode(i, infos[i]['final_reward'])
+                episodes += 1
+                wins += infos[i]['win']
+                interval_wins += infos[i]['win']
+                total_reward += infos[i]['episode_reward']
+                interval_reward += infos[i]['episode_reward']
+
+                if log_interval and episodes % log_interval == 0:
+                    now = time.time()
+                    logger.info("Episode %d/%d - Avg reward: %.2f, Win rate: %.2f, Epsilon: %.3f, "
+                                "Episodes/s: %.1f", episodes, num_episodes, interval_reward / log_interval,
+                                interval_wins / log_interval, learner.agent.epsilon,
+                                log_interval / max(now - interval_start, 1e-9))
+                    interval_wins = 0
+                    interval_reward = 0.0
+                    interval_start = now
+
+                if save_interval and episodes % save_interval == 0:
+                    learner.save(os.path.join(config['model_dir'], f"model_episode_{episodes}.pt"))
+
+            observations, masks = next_observations, next_masks
+    finally:
+        env.close()
+
+    if save_interval:
+        learner.save(os.path.join(config['model_dir'], "final_model.pt"))
+
+    seconds = time.time() - start_time
+    logger.info("Training finished: %d episodes in %.1fs, win rate %.2f", episodes, seconds,
+                wins / max(episodes, 1))
+    return {
+        'episodes': episodes,
+        'transitions': learner.transitions,
+        'win_rate': wins / max(episodes, 1),
+        'avg_reward': total_reward / max(episodes, 1),
+        'seconds': seconds,
+        'learner': learner
+    }
+
+def run_profile(profile: str = 'smoke', **overrides) -> Dict[str, Any]:
+    """
+    Set up logging and train with a profile; the training scripts are thin wrappers around this.
+
+    Args:
+        profile: Name of the profile in PROFILES
+        **overrides: Settings that replace the profile's values
+
+    Returns:
+        The summary returned by run
+    """
+    config = build_config(profile, overrides)
+    os.makedirs(config['log_dir'], exist_ok=True)
+    logger.setup_logger(config['log_dir'], level=logging.DEBUG if config['verbose'] else logging.INFO)
+    return run(config)
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Train a Doppelkopf RL agent with a configurable driver')
+    parser.add_argument('--profile', type=str, default='smoke', choices=sorted(PROFILES),
+                        help='Training profile (default: smoke)')
+    parser.add_argument('--episodes', type=int, default=None,
+                        help="Number of episodes to train for (default: the profile's)")
+    parser.add_argument('--backend', type=str, default=None, choices=BACKENDS,
+                        help='Run the games in one environment, a vector of environments, or worker processes')
+    parser.add_argument('--num-envs', type=int, default=None,
+                        help='Number of environments stepped together')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes for the subproc backend')
+    parser.add_argument('--opponent', type=str, default=None,
+                        help="Opponent policy: 'random' or the path of a saved model")
+    parser.add_argument('--reward', type=str, default=None, choices=sorted(REWARD_FUNCTIONS),
+                        help='Per-decision reward')
+    parser.add_argument('--learner', type=str, default=None, choices=sorted(LEARNERS),
+                        help='Learning algorithm')
+    parser.add_argument('--replay', type=str, default=None, choices=REPLAYS,
+                        help='Store replay observations bit-packed or as float32 tensors')
+    parser.add_argument('--network', type=str, default=None, choices=['mlp', 'card_embedding'],
+                        help='Q-network architecture')
+    parser.add_argument('--n-step', type=int, default=None,
+                        help='Number of rewards summed per replay transition')
+    parser.add_argument('--td-lambda', type=float, default=None,
+                        help='Store lambda-returns with this lambda instead of n-step returns')
+    parser.add_argument('--transitions-per-update', type=int, default=None,
+                        help='Train the network once every N transitions')
+    parser.add_argument('--no-fast-forward', dest='fast_forward', action='store_false', default=None,
+                        help="Return the agent's forced moves as decisions instead of playing them directly")
+    parser.add_argument('--init-model', type=str, default=None,
+                        help='Start from a saved model')
+    parser.add_argument('--model-dir', type=str, default=None,
+                        help='Directory to save models')
+    parser.add_argument('--save-interval', type=int, default=None,
+                        help='Save the agent every N episodes (0 disables saving)')
+    parser.add_argument('--log-interval', type=int, default=None,
+                        help='Log a summary every N episodes')
+    parser.add_argument('--log-dir', type=str, default=None,
+                        help='Directory to write the log files to')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed')
+    parser.add_argument('--verbose', action='store_true', default=None,
+                        help='Log at debug level')
+    return parser.parse_args()
+
+def main():
+    """Main function to run the driver."""
+    args = parse_arguments()
+    overrides = {key: value for key, value in vars(args).items() if key != 'profile'}
+    run_profile(args.profile, **overrides)
+
+if __name__ == "__main__":
+    main()
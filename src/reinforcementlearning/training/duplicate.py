@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Duplicate-deal evaluation for Doppelkopf agents.
+Every deal of a fixed, seeded deal set is played four times with the evaluated agent
+rotated through all seats, so the luck of the cards cancels out. Deals are spread
+across a process pool and the results are reported with confidence intervals.
+"""
+
+import os
+import sys
+import random
+import argparse
+import numpy as np
+import torch
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.backend.game.doppelkopf import (
+    create_deck, get_state_size, get_action_size, VARIANT_NAMES, TEAM_RE
+)
+
+# z-value for 95% confidence intervals
+Z_95 = 1.96
+
+# Policies loaded once per worker process
+_worker_policies = {}
+
+def generate_deals(num_deals: int, seed: int = 0) -> List[List[List[Dict]]]:
+    """
+    Generate a reproducible set of deals.
+
+    Args:
+        num_deals: Number of deals
+        seed: Seed for the deal shuffles
+
+    Returns:
+        A list of deals, each a list of four hands
+    """
+    rng = random.Random(seed)
+    deals = []
+    for _ in range(num_deals):
+        deck = create_deck()
+        rng.shuffle(deck)
+        cards_per_player = len(deck) // 4
+        deals.append([deck[i * cards_per_player:(i + 1) * cards_per_player] for i in range(4)])
+    return deals
+
+def load_policy(spec: str, evaluated: bool):
+    """
+    Create a policy from a specification.
+
+    Args:
+        spec: 'random', 'heuristic' or the path of a model saved by RLAgent.save
+        evaluated: Whether this is the evaluated agent (which also picks variants and announces)
+
+    Returns:
+        A policy usable as an agent or opponent
+    """
+    if spec == 'random':
+        return select_random_action
+    if spec == 'heuristic':
+        from src.reinforcementlearning.agents.heuristic_agent import select_heuristic_action
+        return select_heuristic_action
+
+    if evaluated:
+        from src.reinforcementlearning.agents.rl_agent import RLAgent
+        rl_agent = RLAgent(get_state_size(), get_action_size(), epsilon_start=0.0, epsilon_end=0.0)
+        rl_agent.load(spec)
+        return rl_agent
+
+    from src.reinforcementlearning.training.league import FrozenPolicy
+    from src.reinforcementlearning.agents.q_cache import QValueCache
+    from src.reinforcementlearning.agents.rl_agent import network_from_state_dict
+    state_dict = torch.load(spec, map_location='cpu')
+    _, output_size = network_from_state_dict(state_dict)
+    # Every deal is played in all seat rotations, so the same observations recur
+    return FrozenPolicy(state_dict, get_state_size(), output_size, get_action_size(), cache=QValueCache())
+
+def _select(policy, game, player_idx: int):
+    """Ask a policy for an action (class-based or function-based)."""
+    if hasattr(policy, 'select_action'):
+        return policy.select_action(game, player_idx)
+    return policy(game, player_idx)
+
+def play_deal(deal: List[List[Dict]], seat_policies: List, seed: int, variant_seats=()) -> DoppelkopfGame:
+    """
+    Play one game of a deal with a policy in every seat.
+
+    Args:
+        deal: The four hands
+        seat_policies: The policy of each seat
+        seed: Seed for any randomness during the game
+        variant_seats: Seats whose policy chooses the game variant (the others play normal)
+
+    Returns:
+        The finished game
+    """
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+
+    game = DoppelkopfGame()
+    game.reset(hands=deal)
+
+    # Variant selection in seat order, starting after the card giver
+    game.variant_selection_phase = True
+    first_player = (game.state['card_giver'] + 1) % game.num_players
+    for offset in range(game.num_players):
+        player_idx = (first_player + offset) % game.num_players
+        variant = 'normal'
+        if player_idx in variant_seats:
+            action_result = _select(seat_policies[player_idx], game, player_idx)
+            if isinstance(action_result, tuple) and action_result[0] == 'variant':
+                variant = action_result[1]
+        game.set_variant(variant, player_idx)
+
+    while not game.game_over:
+        player_idx = game.current_player
+        action_result = _select(seat_policies[player_idx], game, player_idx)
+
+        if isinstance(action_result, tuple) and len(action_result) == 2:
+            action_type, action = action_result
+            if action_type == 'announce':
+                game.announce(player_idx, action)
+                continue
+            card = action if action_type == 'card' else None
+        else:
+            card = action_result
+
+        if card is None or not game.play_card(player_idx, card):
+            # Fall back to the first legal card so a broken policy cannot stall the game
+            game.play_card(player_idx, game.get_legal_actions(player_idx)[0])
+
+    return game
+
+def play_duplicate_game(deal: List[List[Dict]], agent, opponent, agent_seat: int, seed: int) -> Dict:
+    """
+    Play one game of a deal with the agent in the given seat.
+
+    Args:
+        deal: The four hands
+        agent: The evaluated policy
+        opponent: The policy for the other three seats
+        agent_seat: The seat of the evaluated agent
+        seed: Seed for any randomness during the game
+
+    Returns:
+        The result of the game from the agent's point of view
+    """
+    seat_policies = [agent if seat == agent_seat else opponent for seat in range(4)]
+    game = play_deal(deal, seat_policies, seed, variant_seats=(agent_seat,))
+
+    team_idx = 0 if game.teams[agent_seat] == TEAM_RE else 1
+    return {
+        'variant': VARIANT_NAMES[game.game_variant],
+        'win': game.winner == game.teams[agent_seat],
+        'game_points': game.state['player_game_points'][agent_seat],
+        'score_diff': game.scores[team_idx] - game.scores[1 - team_idx]
+    }
+
+def _init_worker(agent_spec: str, opponent_spec: str):
+    """Load the policies once per worker process."""
+    torch.set_num_threads(1)
+    _worker_policies['agent'] = load_policy(agent_spec, evaluated=True)
+    _worker_policies['opponent'] = load_policy(opponent_spec, evaluated=False)
+
+def _play_deals(indexed_deals: List[Tuple[int, List[List[Dict]]]], seed: int) -> List[Dict]:
+    """Play every rotation of a chunk of deals in a worker process."""
+    results = []
+    for deal_idx, deal in indexed_deals:
+        for agent_seat in range(4):
+            result = play_duplicate_game(
+                deal, _worker_policies['agent'], _worker_policies['opponent'],
+                agent_seat, seed * 1000003 + deal_idx * 4 + agent_seat
+            )
+            result['deal'] = deal_idx
+            results.append(result)
+    return results
+
+def _mean_ci(values) -> Tuple[float, float]:
+    """Mean and 95% confidence half-width of a sample."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2:
+        return float(values.mean()) if len(values) else 0.0, float('nan')
+    return float(values.mean()), float(Z_95 * values.std(ddof=1) / np.sqrt(len(values)))
+
+def summarize(results: List[Dict]) -> Dict:
+    """
+    Summarize duplicate results.
+
+    The overall confidence intervals are computed over per-deal averages, which is
+    where the duplicate format removes the card luck. Per-variant intervals are
+    computed over the individual games of that variant.
+
+    Args:
+        results: The per-game results
+
+    Returns:
+        A dictionary with the overall and per-variant statistics
+    """
+    def stats(games, by_deal):
+        if by_deal:
+            deals = {}
+            for r in games:
+                deals.setdefault(r['deal'], []).append(r)
+            games_per_unit = [np.mean([[r['win'], r['game_points'], r['score_diff']] for r in g], axis=0)
+                              for g in deals.values()]
+        else:
+            games_per_unit = [[r['win'], r['game_points'], r['score_diff']] for r in games]
+        units = np.asarray(games_per_unit, dtype=np.float64).reshape(-1, 3)
+        return {
+            'games': len(games),
+            'win_rate': _mean_ci(units[:, 0]),
+            'game_points': _mean_ci(units[:, 1]),
+            'score_diff': _mean_ci(units[:, 2])
+        }
+
+    by_variant = {}
+    for r in results:
+        by_variant.setdefault(r['variant'], []).append(r)
+
+    return {
+        'overall': stats(results, by_deal=True),
+        'by_variant': {variant: stats(games, by_deal=False) for variant, games in sorted(by_variant.items())}
+    }
+
+def evaluate_duplicate(agent_spec: str, opponent_spec: str = 'random', num_deals: int = 1000,
+                       seed: int = 0, workers: int = None) -> Dict:
+    """
+    Evaluate an agent on a fixed deal set in duplicate format.
+
+    Args:
+        agent_spec: 'random' or the path of a model saved by RLAgent.save
+        opponent_spec: 'random' or the path of a model for the other three seats
+        num_deals: Number of deals (each is played four times)
+        seed: Seed of the deal set; use the same seed to compare checkpoints
+        workers: Number of worker processes (default: number of CPUs)
+
+    Returns:
+        The summary produced by summarize
+    """
+    deals = list(enumerate(generate_deals(num_deals, seed)))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(deals)))
+    chunk_size = max(1, len(deals) // (workers * 4))
+    chunks = [deals[i:i + chunk_size] for i in range(0, len(deals), chunk_size)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(agent_spec, opponent_spec)) as executor:
+        for chunk_results in executor.map(_play_deals, chunks, [seed] * len(chunks)):
+            results.extend(chunk_results)
+
+    return summarize(results)
+
+def format_summary(summary: Dict) -> str:
+    """Format a summary as a table."""
+    lines = [f"{'Variant':<12} {'Games':>7} {'Win rate':>18} {'Game points':>18} {'Score diff':>20}"]
+
+    def row(name, stats):
+        win, win_ci = stats['win_rate']
+        points, points_ci = stats['game_points']
+        diff, diff_ci = stats['score_diff']
+        return (f"{name:<12} {stats['games']:>7} {win:>9.3f} ± {win_ci:<6.3f} "
+                f"{points:>9.3f} ± {points_ci:<6.3f} {diff:>10.2f} ± {diff_ci:<7.2f}")
+
+    for variant, stats in summary['by_variant'].items():
+        lines.append(row(variant, stats))
+    lines.append(row('OVERALL', summary['overall']))
+    return "\n".join(lines)
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Evaluate a Doppelkopf agent on duplicate deals')
+    parser.add_argument('--agent', type=str, required=True,
+                        help="Model to evaluate, or 'random'")
+    parser.add_argument('--opponent', type=str, default='random',
+                        help="Model for the other three seats, 'random' or 'heuristic' (default: random)")
+    parser.add_argument('--deals', type=int, default=1000,
+                        help='Number of deals; each is played in all four seats (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the deal set (default: 0)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes (default: number of CPUs)')
+    return parser.parse_args()
+
+def main():
+    """Main function to run the evaluation."""
+    args = parse_arguments()
+    summary = evaluate_duplicate(args.agent, args.opponent, args.deals, args.seed, args.workers)
+    print(format_summary(summary))
+
+if __name__ == "__main__":
+    main()
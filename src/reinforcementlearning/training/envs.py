@@ -0,0 +1,469 @@
+"""
+Step-based Doppelkopf environments for the training driver.
+
+A DoppelkopfEnv advances the game from one decision of the RL agent to the next: the
+opponents' cards are played inside step, so the learner only sees its own observations,
+legal-action masks and rewards. VectorEnv steps several environments in one call (the
+learner can then select all actions with one forward pass, and opponents with a batched
+select_actions, such as frozen snapshots, play the seats of all environments with one forward
+pass per policy), and SubprocVectorEnv runs the environments in worker processes. Actions are indices in the RL agent's full action space:
+48 cards, then the Re and Contra announcements, then the five game variants. At debug level
+every card, trick winner and reward is logged, as the trainer's episodes do.
+"""
+
+import os
+import sys
+import random
+import logging
+import multiprocessing
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+import src.backend.utils.logger as logger
+from src.backend.game.doppelkopf import TEAM_RE, TEAM_KONTRA, get_action_size, card_to_idx, card_to_string
+from src.reinforcementlearning.training.rewards import REWARD_FUNCTIONS, calculate_reward, end_game_reward
+
+# Variants in the order of their actions
+VARIANTS = ['normal', 'hochzeit', 'queen_solo', 'jack_solo', 'fleshless']
+
+# Index of the Re announcement; Contra follows, then the variants
+ANNOUNCE_OFFSET = get_action_size()
+VARIANT_OFFSET = ANNOUNCE_OFFSET + 2
+NUM_ACTIONS = VARIANT_OFFSET + len(VARIANTS)
+
+def select_policy_action(policy, game, player_idx: int):
+    """Ask an opponent policy for a card (class-based or function-based)."""
+    if hasattr(policy, 'select_action'):
+        return policy.select_action(game, player_idx)
+    return policy(game, player_idx)
+
+class DoppelkopfEnv:
+    """
+    One game seen from the RL agent's seat, advanced decision by decision.
+
+    Follows the trainer's episode: the agent picks the variant, the other players play
+    'normal', announcements are tracked per team without changing the game, and the
+    end-of-game reward is reported separately in the info of the last step. With fast_forward
+    the agent's forced moves (a single legal card and no announcement) are played inside step
+    and their rewards are added to the reward of the decision before them.
+    """
+
+    def __init__(self, opponents: List, reward_fn: Callable = calculate_reward, rl_player_idx: int = 0,
+                 fast_forward: bool = False):
+        """
+        Initialize the environment.
+
+        Args:
+            opponents: Policies of the other players, in seat order
+            reward_fn: Per-decision reward, called as reward_fn(game, player_idx, action_type, action)
+            rl_player_idx: Seat of the RL agent
+            fast_forward: Whether to play the agent's forced moves without returning them as decisions
+        """
+        from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+
+        self.game = DoppelkopfGame()
+        self.opponents = opponents
+        self.reward_fn = reward_fn
+        self.rl_player_idx = rl_player_idx
+        self.fast_forward = fast_forward
+        self.announced = False
+        self.episode_reward = 0.0
+        self._step_reward = 0.0
+        self.trace = False
+
+    def reset(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Deal a new game.
+
+        Returns:
+            Tuple of (observation, legal-action mask) of the agent's first decision
+        """
+        self.game.reset()
+        self.game.variant_selection_phase = True
+        self.announced = False
+        self.episode_reward = 0.0
+        # Checked once per game, so the moves cost nothing when debug logging is off
+        self.trace = logger.is_enabled_for(logging.DEBUG)
+        if self.trace:
+            logger.debug("New game - Player %d (RL agent) chooses the variant", self.rl_player_idx)
+        return self._observe()
+
+    def legal_action_mask(self) -> np.ndarray:
+        """
+        Get the actions the agent may choose from at its current decision.
+
+        Returns:
+            Boolean array over the full action space
+        """
+        game = self.game
+        mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+        if game.variant_selection_phase:
+            mask[VARIANT_OFFSET:] = True
+            return mask
+
+        for card in game.get_legal_actions(self.rl_player_idx):
+            mask[game.card_to_idx(card)] = True
+
+        if not self.announced and game.can_announce:
+            team = game.teams[self.rl_player_idx]
+            if team == TEAM_RE:
+                mask[ANNOUNCE_OFFSET] = True
+            elif team == TEAM_KONTRA:
+                mask[ANNOUNCE_OFFSET + 1] = True
+
+        return mask
+
+    def step(self, action: int) -> Tuple[np.ndarray, np.ndarray, float, bool, Dict]:
+        """
+        Apply the agent's action and play the opponents until the agent decides again.
+
+        Args:
+            action: Index of the action in the full action space
+
+        Returns:
+            Tuple of (observation, mask, reward, done, info). The observation is the agent's
+            next decision (the final position if done); on the last step info holds
+            'final_reward', 'win', 'score_diff' and 'episode_reward'
+        """
+        self.begin_step(action)
+        self.advance()
+        return self.end_step()
+
+    def begin_step(self, action: int):
+        """
+        Apply the agent's action; advance and end_step complete the step.
+
+        Args:
+            action: Index of the action in the full action space
+        """
+        game = self.game
+        player = self.rl_player_idx
+        action = int(action)
+
+        if action >= VARIANT_OFFSET:
+            variant = VARIANTS[action - VARIANT_OFFSET]
+            game.set_variant(variant, player)
+            self._step_reward = self.reward_fn(game, player, 'variant', variant)
+            for i in range(game.num_players):
+                if i != player:
+                    game.set_variant('normal', i)
+            if self.trace:
+                logger.debug("Player %d (RL agent) chooses %s, reward %.2f", player, variant, self._step_reward)
+        elif action >= ANNOUNCE_OFFSET:
+            announcement = 're' if action == ANNOUNCE_OFFSET else 'contra'
+            self.announced = True
+            self._step_reward = self.reward_fn(game, player, 'announce', announcement)
+            if self.trace:
+                logger.debug("Player %d (RL agent) announces %s, reward %.2f", player, announcement,
+                             self._step_reward)
+        else:
+            card = next(c for c in game.get_legal_actions(player) if game.card_to_idx(c) == action)
+            game.play_card(player, card)
+            self._step_reward = self.reward_fn(game, player, 'card')
+            if self.trace:
+                self._log_card(player, card, 'RL agent', self._step_reward)
+
+    def advance(self, batched: bool = False) -> Optional[int]:
+        """
+        Play the opponents' cards, and with fast_forward the agent's forced moves, until the
+        agent decides or the game is over.
+
+        Args:
+            batched: Whether to stop at an opponent with a batched select_actions instead of asking it
+
+        Returns:
+            The seat of the opponent to ask in a batch, or None if the step can end
+        """
+        game = self.game
+        while not game.game_over:
+            seat = game.current_player
+            if seat == self.rl_player_idx:
+                if not self.fast_forward or not self._play_forced_move():
+                    return None
+                continue
+            opponent = self.opponent(seat)
+            if batched and hasattr(opponent, 'select_actions'):
+                return seat
+            self.play_opponent_card(seat, select_policy_action(opponent, game, seat))
+        return None
+
+    def end_step(self) -> Tuple[np.ndarray, np.ndarray, float, bool, Dict]:
+        """
+        Finish a step once advance returned None.
+
+        Returns:
+            The result of step
+        """
+        game = self.game
+        reward = self._step_reward
+        self.episode_reward += reward
+
+        info = {}
+        if game.game_over:
+            final_reward, win, score_diff = end_game_reward(game, self.rl_player_idx)
+            self.episode_reward += final_reward
+            info = {'final_reward': final_reward, 'win': win, 'score_diff': score_diff,
+                    'episode_reward': self.episode_reward}
+            if self.trace:
+                logger.debug("Game over! RL agent %s with score difference %d. Final reward %.2f, "
+                             "episode reward %.2f", 'wins' if win else 'loses', score_diff, final_reward,
+                             self.episode_reward)
+
+        observation, mask = self._observe()
+        return observation, mask, reward, game.game_over, info
+
+    def opponent(self, seat: int):
+        """Get the policy of an opponent seat."""
+        return self.opponents[seat - 1 if seat > self.rl_player_idx else seat]
+
+    def play_opponent_card(self, seat: int, card):
+        """Play an opponent's card, or its first legal card if the policy chose none or an illegal one."""
+        if card is None or not self.game.play_card(seat, card):
+            card = self.game.get_legal_actions(seat)[0]
+            self.game.play_card(seat, card)
+        if self.trace:
+            self._log_card(seat, card, 'opponent')
+
+    def _play_forced_move(self) -> bool:
+        """Play the agent's move if it is forced and add its reward to the step; return whether it was."""
+        mask = self.legal_action_mask()
+        if mask.sum() != 1 or mask[ANNOUNCE_OFFSET:].any():
+            return False
+        card = self.game.get_legal_actions(self.rl_player_idx)[0]
+        self.game.play_card(self.rl_player_idx, card)
+        reward = self.reward_fn(self.game, self.rl_player_idx, 'card')
+        self._step_reward += reward
+        if self.trace:
+            self._log_card(self.rl_player_idx, card, 'RL agent, forced', reward)
+        return True
+
+    def _log_card(self, seat: int, card, role: str, reward: Optional[float] = None):
+        """Log a played card at debug level, with the trick's winner if it completed the trick."""
+        if reward is None:
+            logger.debug("Player %d (%s) plays %s", seat, role, card_to_string(card))
+        else:
+            logger.debug("Player %d (%s) plays %s, reward %.2f", seat, role, card_to_string(card), reward)
+        if self.game.trick_winner is not None:
+            logger.debug("Trick %d won by player %d", len(self.game.tricks), self.game.trick_winner)
+
+    def _observe(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the agent's observation and legal-action mask."""
+        observation = np.asarray(self.game.get_state_for_player(self.rl_player_idx), dtype=np.float32)
+        if self.game.game_over:
+            return observation, np.zeros(NUM_ACTIONS, dtype=bool)
+        return observation, self.legal_action_mask()
+
+class VectorEnv:
+    """
+    Several environments stepped together in one process.
+
+    A finished environment is reset right away: its entry in the returned observations is
+    then the first decision of the next game, and its info holds the finished game's result.
+    """
+
+    def __init__(self, envs: List[DoppelkopfEnv]):
+        """
+        Initialize the vector environment.
+
+        Args:
+            envs: The environments
+        """
+        self.envs = envs
+        self.num_envs = len(envs)
+
+    def reset(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Deal a new game in every environment.
+
+        Returns:
+            Tuple of (observations, masks) with one row per environment
+        """
+        observations, masks = zip(*(env.reset() for env in self.envs))
+        return np.stack(observations), np.stack(masks)
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """
+        Step every environment with its action.
+
+        Args:
+            actions: One action index per environment
+
+        Returns:
+            Tuple of (observations, masks, rewards, dones, infos) with one entry per environment
+        """
+        for env, action in zip(self.envs, actions):
+            env.begin_step(action)
+        waiting = [(env, env.advance(batched=True)) for env in self.envs]
+        waiting = [(env, seat) for env, seat in waiting if seat is not None]
+        while waiting:
+            self._play_batched_opponents(waiting)
+            waiting = [(env, env.advance(batched=True)) for env, _ in waiting]
+            waiting = [(env, seat) for env, seat in waiting if seat is not None]
+
+        observations, masks, rewards, dones, infos = [], [], [], [], []
+        for env in self.envs:
+            observation, mask, reward, done, info = env.end_step()
+            if done:
+                observation, mask = env.reset()
+            observations.append(observation)
+            masks.append(mask)
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+        return (np.stack(observations), np.stack(masks), np.asarray(rewards, dtype=np.float32),
+                np.asarray(dones, dtype=bool), infos)
+
+    @staticmethod
+    def _play_batched_opponents(waiting: List[Tuple[DoppelkopfEnv, int]]):
+        """Play the waiting opponent seats with one select_actions call per policy."""
+        by_policy = {}
+        for env, seat in waiting:
+            by_policy.setdefault(id(env.opponent(seat)), []).append((env, seat))
+        for seats in by_policy.values():
+            policy = seats[0][0].opponent(seats[0][1])
+            legal = [env.game.get_legal_actions(seat) for env, seat in seats]
+            states = np.stack([np.asarray(env.game.get_state_for_player(seat), dtype=np.float32)
+                               for env, seat in seats])
+            legal_masks = np.zeros((len(seats), ANNOUNCE_OFFSET), dtype=bool)
+            for row, cards in enumerate(legal):
+                legal_masks[row, [card_to_idx(card) for card in cards]] = True
+            for (env, seat), cards, card_idx in zip(seats, legal, policy.select_actions(states, legal_masks)):
+                card = next((card for card in cards if card_to_idx(card) == card_idx), None)
+                env.play_opponent_card(seat, card)
+
+    def close(self):
+        """Release the environments (nothing to do in-process)."""
+
+def make_vector_env(num_envs: int, opponent: str = 'random', reward: str = 'shaped',
+                    fast_forward: bool = False) -> VectorEnv:
+    """
+    Create an in-process vector environment.
+
+    Args:
+        num_envs: Number of environments
+        opponent: 'random' or the path of a model saved by RLAgent.save, used for every opponent
+        reward: Name of the per-decision reward in REWARD_FUNCTIONS
+        fast_forward: Whether the environments play the agent's forced moves themselves
+
+    Returns:
+        The vector environment
+    """
+    from src.reinforcementlearning.training.duplicate import load_policy
+
+    if reward not in REWARD_FUNCTIONS:
+        raise ValueError(f"Unknown reward: {reward}")
+    policy = load_policy(opponent, evaluated=False)
+    envs = []
+    for _ in range(num_envs):
+        env = DoppelkopfEnv([], REWARD_FUNCTIONS[reward], fast_forward=fast_forward)
+        env.opponents = [policy] * (env.game.num_players - 1)
+        envs.append(env)
+    return VectorEnv(envs)
+
+def _env_worker(conn, num_envs: int, opponent: str, reward: str, fast_forward: bool, seed: Optional[int]):
+    """Run a vector environment in a worker process and answer the commands sent over the pipe."""
+    import torch
+    torch.set_num_threads(1)
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    env = make_vector_env(num_envs, opponent, reward, fast_forward)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'step':
+                conn.send(env.step(data))
+            elif command == 'reset':
+                conn.send(env.reset())
+            elif command == 'close':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+class SubprocVectorEnv:
+    """
+    A vector environment whose games run in worker processes.
+
+    The environments are split evenly over the workers; every step sends each worker its
+    slice of the actions and gathers the results in environment order.
+    """
+
+    def __init__(self, num_envs: int, workers: int, opponent: str = 'random', reward: str = 'shaped',
+                 fast_forward: bool = False, seed: Optional[int] = None):
+        """
+        Start the worker processes.
+
+        Args:
+            num_envs: Total number of environments
+            workers: Number of worker processes
+            opponent: Opponent specification for make_vector_env
+            reward: Name of the per-decision reward in REWARD_FUNCTIONS
+            fast_forward: Whether the environments play the agent's forced moves themselves
+            seed: Base random seed (worker i uses seed + i)
+        """
+        if reward not in REWARD_FUNCTIONS:
+            raise ValueError(f"Unknown reward: {reward}")
+        workers = max(1, min(workers, num_envs))
+        self.num_envs = num_envs
+        self.slices = np.array_split(np.arange(num_envs), workers)
+        self.conns = []
+        self.processes = []
+
+        for i, envs in enumerate(self.slices):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_env_worker, args=(child, len(envs), opponent, reward, fast_forward,
+                                          None if seed is None else seed + i), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def reset(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Deal a new game in every environment.
+
+        Returns:
+            Tuple of (observations, masks) with one row per environment
+        """
+        for conn in self.conns:
+            conn.send(('reset', None))
+        observations, masks = zip(*(conn.recv() for conn in self.conns))
+        return np.concatenate(observations), np.concatenate(masks)
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """
+        Step every environment with its action.
+
+        Args:
+            actions: One action index per environment
+
+        Returns:
+            Tuple of (observations, masks, rewards, dones, infos) with one entry per environment
+        """
+        actions = np.asarray(actions)
+        for conn, envs in zip(self.conns, self.slices):
+            conn.send(('step', actions[envs]))
+        results = [conn.recv() for conn in self.conns]
+        observations, masks, rewards, dones, infos = zip(*results)
+        return (np.concatenate(observations), np.concatenate(masks), np.concatenate(rewards),
+                np.concatenate(dones), [info for chunk in infos for info in chunk])
+
+    def close(self):
+        """Stop the worker processes."""
+        for conn in self.conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        self.conns = []
+        self.processes = []
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Export a trained Doppelkopf model as a frozen TorchScript artifact for CPU serving.
+
+The artifact is written next to the checkpoint (final_model.pt -> final_model.ts.pt). With
+--quantize an int8 variant with dynamically quantized Linear layers is written as well
+(final_model.int8.ts.pt). Every artifact is checked against the eager model on a fixed set of
+observations before it is saved; the web server's model registry checks it again on load and
+prefers the int8 artifact, then the float32 one, then the eager checkpoint.
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Dict, Optional, Tuple
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+from src.reinforcementlearning.agents.rl_agent import create_network, network_from_state_dict, legal_action_mask
+
+# Largest difference in Q-values allowed between a float32 artifact and the eager model
+FLOAT_TOLERANCE = 1e-4
+
+# Smallest share of reference observations on which an int8 artifact must pick the eager model's action
+MIN_INT8_AGREEMENT = 0.95
+
+# Name of the metadata stored inside an artifact
+METADATA_FILE = 'metadata.json'
+
+def artifact_path(model_path: str, quantized: bool = False) -> str:
+    """
+    Get the path of a checkpoint's exported artifact.
+
+    Args:
+        model_path: Path of the checkpoint
+        quantized: Whether the artifact is the int8 variant
+
+    Returns:
+        The artifact path
+    """
+    base, _ = os.path.splitext(model_path)
+    return f"{base}.int8.ts.pt" if quantized else f"{base}.ts.pt"
+
+def load_eager_network(model_path: str) -> nn.Module:
+    """
+    Load a checkpoint into its eager network in eval mode.
+
+    Args:
+        model_path: Path of a model saved by RLAgent.save
+
+    Returns:
+        The network
+    """
+    state_dict = torch.load(model_path, map_location='cpu')
+    network_name, output_size = network_from_state_dict(state_dict)
+    network = create_network(network_name, get_state_size(), output_size)
+    network.load_state_dict({k: v.float() for k, v in state_dict.items()})
+    return network.eval()
+
+def reference_observations(num_observations: int = 256, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Collect a fixed set of observations and legal-action masks from seeded random games.
+
+    Args:
+        num_observations: Number of observations
+        seed: Random seed of the games (the global random state is restored afterwards)
+
+    Returns:
+        Tuple of (observations, masks)
+    """
+    from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+
+    saved_state = random.getstate()
+    random.seed(seed)
+    observations, masks = [], []
+    try:
+        game = DoppelkopfGame()
+        while len(observations) < num_observations:
+            game.reset()
+            for i in range(game.num_players):
+                game.set_variant('normal', i)
+            while not game.game_over and len(observations) < num_observations:
+                player = game.current_player
+                observations.append(np.asarray(game.get_state_for_player(player), dtype=np.float32))
+                masks.append(legal_action_mask(game, player, get_action_size()))
+                game.play_card(player, random.choice(game.get_legal_actions(player)))
+    finally:
+        random.setstate(saved_state)
+    return np.stack(observations), np.stack(masks)
+
+def compare_outputs(module, reference: nn.Module, observations: np.ndarray, masks: np.ndarray) -> Dict[str, float]:
+    """
+    Compare a module's Q-values with those of the eager reference network.
+
+    Args:
+        module: The exported (or any) network
+        reference: The eager network
+        observations: Observations to compare on
+        masks: Legal-action masks of the observations
+
+    Returns:
+        Dictionary with the 'max_error' of the Q-values and the 'agreement' of the masked argmax
+    """
+    inputs = torch.from_numpy(observations)
+    legal = torch.from_numpy(masks)
+    with torch.inference_mode():
+        q_module = module(inputs)
+        q_reference = reference(inputs)
+    actions = q_module.masked_fill(~legal, float('-inf')).argmax(dim=1)
+    expected = q_reference.masked_fill(~legal, float('-inf')).argmax(dim=1)
+    return {
+        'max_error': float((q_module - q_reference).abs().max()),
+        'agreement': float((actions == expected).float().mean())
+    }
+
+def validate_artifact(module, reference: nn.Module, quantized: bool,
+                      reference_set: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, float]:
+    """
+    Check an artifact against the eager network on the reference observations.
+
+    Float32 artifacts must reproduce the Q-values within FLOAT_TOLERANCE; int8 artifacts must
+    pick the same action on at least MIN_INT8_AGREEMENT of the observations.
+
+    Args:
+        module: The artifact
+        reference: The eager network
+        quantized: Whether the artifact is the int8 variant
+        reference_set: Observations and masks (default: reference_observations())
+
+    Returns:
+        The comparison from compare_outputs with 'passed' added
+    """
+    observations, masks = reference_set if reference_set is not None else reference_observations()
+    result = compare_outputs(module, reference, observations, masks)
+    if quantized:
+        result['passed'] = result['agreement'] >= MIN_INT8_AGREEMENT
+    else:
+        result['passed'] = result['max_error'] <= FLOAT_TOLERANCE
+    return result
+
+def build_artifact(network: nn.Module, quantized: bool = False):
+    """
+    Turn an eager network into a frozen TorchScript module.
+
+    Args:
+        network: The eager network in eval mode
+        quantized: Whether to quantize the Linear layers to int8 first
+
+    Returns:
+        The frozen module
+    """
+    if quantized:
+        network = torch.ao.quantization.quantize_dynamic(network, {nn.Linear}, dtype=torch.qint8)
+    try:
+        scripted = torch.jit.script(network)
+    except Exception:
+        # Networks that do not script are traced; their forward only depends on tensor shapes
+        scripted = torch.jit.trace(network, torch.zeros((1, get_state_size())))
+    return torch.jit.freeze(scripted.eval())
+
+def export_model(model_path: str, quantized: bool = False, output_path: Optional[str] = None,
+                 reference_set: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict:
+    """
+    Export a checkpoint as a validated TorchScript artifact.
+
+    Args:
+        model_path: Path of a model saved by RLAgent.save
+        quantized: Whether to export the int8 variant
+        output_path: Path of the artifact (default: artifact_path(model_path, quantized))
+        reference_set: Observations and masks to validate on (default: reference_observations())
+
+    Returns:
+        The artifact's metadata, including the validation result and its 'path'
+
+    Raises:
+        ValueError: If the artifact does not match the eager model
+    """
+    output_path = output_path or artifact_path(model_path, quantized)
+    reference = load_eager_network(model_path)
+    artifact = build_artifact(reference, quantized)
+
+    result = validate_artifact(artifact, reference, quantized, reference_set)
+    if not result['passed']:
+        raise ValueError(f"Exported artifact does not match the model: {result}")
+
+    metadata = dict(result, source=os.path.basename(model_path), quantized=quantized)
+    torch.jit.save(artifact, output_path, _extra_files={METADATA_FILE: json.dumps(metadata)})
+    metadata['path'] = output_path
+    return metadata
+
+def load_artifact(path: str) -> Tuple[torch.jit.ScriptModule, Dict]:
+    """
+    Load an exported artifact.
+
+    Args:
+        path: Path of the artifact
+
+    Returns:
+        Tuple of (module, metadata)
+    """
+    extra_files = {METADATA_FILE: ''}
+    module = torch.jit.load(path, map_location='cpu', _extra_files=extra_files)
+    return module, json.loads(extra_files[METADATA_FILE] or '{}')
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Export a trained model as a frozen TorchScript artifact')
+    parser.add_argument('--model', type=str, default='models/final_model.pt',
+                        help='Path of the model to export (default: models/final_model.pt)')
+    parser.add_argument('--quantize', action='store_true',
+                        help='Also export an int8 variant with dynamically quantized Linear layers')
+    return parser.parse_args()
+
+def main():
+    """Main function to export a model."""
+    args = parse_arguments()
+    reference_set = reference_observations()
+    for quantized in ([False, True] if args.quantize else [False]):
+        metadata = export_model(args.model, quantized, reference_set=reference_set)
+        print(f"Exported {metadata['path']} (max Q error {metadata['max_error']:.2e}, "
+              f"action agreement {metadata['agreement']:.1%}, {os.path.getsize(metadata['path'])} bytes)")
+
+if __name__ == "__main__":
+    main()
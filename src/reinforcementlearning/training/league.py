@@ -0,0 +1,326 @@
+"""
+Self-play league for training the Doppelkopf RL agent.
+The league periodically freezes copies of the agent's policy network into an opponent pool
+and fills the opponent seats with policies sampled from that pool for each episode.
+"""
+
+import os
+import json
+import random
+import numpy as np
+import torch
+from typing import Dict, List, Optional
+
+import src.backend.utils.logger as logger
+from src.reinforcementlearning.agents.rl_agent import create_network, network_from_state_dict
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.agents.q_cache import QValueCache
+from src.reinforcementlearning.doppelkopf_game import as_game
+from src.backend.game.doppelkopf import card_to_idx
+
+# Name of the pool index file inside the pool directory
+POOL_INDEX = "pool.json"
+
+class FrozenPolicy:
+    """
+    An inference-only copy of a policy network.
+    Frozen policies only play cards greedily; they never explore, announce or learn.
+    """
+
+    def __init__(self, state_dict: Dict, state_size: int, output_size: int, action_size: int, device=None,
+                 cache: Optional[QValueCache] = None):
+        """
+        Initialize the frozen policy.
+
+        Args:
+            state_dict: Weights of the policy network
+            state_size: Size of the state representation
+            output_size: Size of the network output (cards, announcements and variants)
+            action_size: Number of card actions
+            device: Device to run the network on
+            cache: Cache for the Q-values of the observations passed to select_action(s)
+        """
+        self.device = device or torch.device("cpu")
+        self.action_size = action_size
+        self.cache = cache
+        network, _ = network_from_state_dict(state_dict)
+        self.net = create_network(network, state_size, output_size).to(self.device)
+        self.net.load_state_dict({k: v.float() for k, v in state_dict.items()})
+        self.net.eval()
+        for param in self.net.parameters():
+            param.requires_grad_(False)
+
+    def _q_values(self, states: np.ndarray) -> np.ndarray:
+        """Get the Q-values of a batch of observations, from the cache where possible, with one forward pass."""
+        keys = [self.cache.key(state) for state in states] if self.cache is not None else None
+        cached = [self.cache.get(key) for key in keys] if keys is not None else [None] * len(states)
+        missing = [i for i, q_values in enumerate(cached) if q_values is None]
+        if missing:
+            with torch.inference_mode():
+                computed = self.net(torch.from_numpy(states[missing]).to(self.device)).cpu().numpy()
+            for i, q_values in zip(missing, computed):
+                cached[i] = q_values
+                if keys is not None:
+                    self.cache.put(keys[i], q_values)
+        return np.stack(cached)
+
+    def select_actions(self, states: np.ndarray, legal_masks: np.ndarray) -> np.ndarray:
+        """
+        Select greedy card actions for a batch of observations with one forward pass.
+
+        Args:
+            states: Array of shape (batch, state_size)
+            legal_masks: Boolean array of shape (batch, action_size) marking legal cards
+
+        Returns:
+            The selected card index for each observation
+        """
+        q_values = self._q_values(np.asarray(states, dtype=np.float32))
+        return np.where(legal_masks, q_values[:, :self.action_size], -np.inf).argmax(axis=1)
+
+    def select_action(self, game, player_idx: int):
+        """
+        Select a card for the given player.
+
+        Args:
+            game: The game instance or state dictionary
+            player_idx: Index of the player
+
+        Returns:
+            The selected card, or None if there are no legal cards
+        """
+        game = as_game(game)
+        legal_actions = game.get_legal_actions(player_idx)
+        if not legal_actions:
+            return None
+
+        legal_mask = np.zeros(self.action_size, dtype=bool)
+        for card in legal_actions:
+            legal_mask[card_to_idx(card)] = True
+
+        state = np.asarray(game.get_state_for_player(player_idx), dtype=np.float32)
+        card_idx = int(self.select_actions(state[None, :], legal_mask[None, :])[0])
+        for card in legal_actions:
+            if card_to_idx(card) == card_idx:
+                return card
+        return legal_actions[0]
+
+    def __call__(self, game, player_idx: int):
+        """Allow the policy to be used like select_random_action."""
+        return self.select_action(game, player_idx)
+
+class League:
+    """
+    A pool of frozen snapshots of the training agent.
+
+    Snapshots are stored on disk in float16 and loaded lazily. Opponents are sampled
+    per episode, weighted towards recent snapshots and snapshots the agent still
+    struggles against.
+    """
+
+    def __init__(self, rl_agent, pool_dir: str, snapshot_interval: int = 1000,
+                 max_size: int = 20, recency_decay: float = 0.9, random_prob: float = 0.1):
+        """
+        Initialize the league.
+
+        Args:
+            rl_agent: The RL agent being trained
+            pool_dir: Directory to store the snapshot pool in
+            snapshot_interval: Freeze a new snapshot every N episodes
+            max_size: Maximum number of snapshots in the pool (oldest are removed)
+            recency_decay: Sampling weight factor per snapshot of age
+            random_prob: Probability that a seat gets a random opponent instead of a snapshot
+        """
+        self.rl_agent = rl_agent
+        self.pool_dir = pool_dir
+        self.snapshot_interval = snapshot_interval
+        self.max_size = max_size
+        self.recency_decay = recency_decay
+        self.random_prob = random_prob
+
+        # Pool entries: {'name', 'episode', 'games', 'agent_wins'}, oldest first
+        self.pool = []
+        self._loaded = {}
+        self._current_episode = None
+        self._seat_policies = []
+        self._seat_names = []
+        self._results_since_save = 0
+        self.num_seats = 3
+
+        os.makedirs(pool_dir, exist_ok=True)
+        index_path = os.path.join(pool_dir, POOL_INDEX)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.pool = json.load(f)
+            logger.info(f"Loaded league pool with {len(self.pool)} snapshots from {pool_dir}")
+
+    def seats(self, num_seats: int = 3) -> List['LeagueOpponent']:
+        """
+        Create opponent seats for the trainer's opponents list.
+
+        Args:
+            num_seats: Number of opponent seats
+
+        Returns:
+            A list of opponents that play the policies the league assigns to them
+        """
+        self.num_seats = num_seats
+        return [LeagueOpponent(self, seat) for seat in range(num_seats)]
+
+    def snapshot(self, episode: int):
+        """
+        Freeze the agent's current policy network into the pool.
+
+        Args:
+            episode: The episode the snapshot is taken at
+        """
+        name = f"snapshot_episode_{episode}.pt"
+        state_dict = {k: v.detach().to('cpu', torch.float16) for k, v in self.rl_agent.policy_net.state_dict().items()}
+        torch.save(state_dict, os.path.join(self.pool_dir, name))
+        self.pool.append({'name': name, 'episode': episode, 'games': 0, 'agent_wins': 0})
+
+        # Drop the oldest snapshots beyond the pool size
+        while len(self.pool) > self.max_size:
+            old = self.pool.pop(0)
+            self._loaded.pop(old['name'], None)
+            old_path = os.path.join(self.pool_dir, old['name'])
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+        self._save_index()
+        logger.info(f"League snapshot at episode {episode} ({len(self.pool)} in pool)")
+
+    def sample_weights(self) -> np.ndarray:
+        """
+        Get the sampling probability of each snapshot in the pool.
+
+        Returns:
+            The probabilities, oldest snapshot first
+        """
+        ages = np.arange(len(self.pool) - 1, -1, -1)
+        recency = self.recency_decay ** ages
+        # Opponents the agent rarely beats are sampled more often (with a prior of one win in two games)
+        win_rates = np.array([(e['agent_wins'] + 1) / (e['games'] + 2) for e in self.pool])
+        weights = recency * (1.0 - win_rates + 0.05)
+        return weights / weights.sum()
+
+    def begin_episode(self, episode: int):
+        """
+        Prepare the league for a new episode: take a snapshot if due and assign seats.
+
+        Called by every seat, but only acts once per episode.
+
+        Args:
+            episode: The episode about to be played
+        """
+        if episode == self._current_episode:
+            return
+        self._current_episode = episode
+
+        if not self.pool or episode % self.snapshot_interval == 0:
+            self.snapshot(episode)
+
+        weights = self.sample_weights()
+        self._seat_policies = []
+        self._seat_names = []
+        for _ in range(self.num_seats):
+            if random.random() < self.random_prob:
+                self._seat_policies.append(select_random_action)
+                self._seat_names.append(None)
+            else:
+                entry = self.pool[np.random.choice(len(self.pool), p=weights)]
+                self._seat_policies.append(self._load(entry['name']))
+                self._seat_names.append(entry['name'])
+
+    def end_episode(self, win: bool):
+        """
+        Record the result of an episode against the snapshots that played in it.
+
+        Args:
+            win: Whether the agent's team won
+        """
+        if self._current_episode is None:
+            return
+        for name in set(n for n in self._seat_names if n is not None):
+            for entry in self.pool:
+                if entry['name'] == name:
+                    entry['games'] += 1
+                    entry['agent_wins'] += int(win)
+        self._seat_names = []
+        self._current_episode = None
+
+        # Persist results from time to time so a restart keeps the strength estimates
+        self._results_since_save += 1
+        if self._results_since_save >= 100:
+            self._save_index()
+
+    def flush(self):
+        """Write the results recorded since the last save to the pool index."""
+        if self._results_since_save:
+            self._save_index()
+
+    def policy_for_seat(self, seat: int):
+        """Get the policy assigned to an opponent seat for the current episode."""
+        if not self._seat_policies:
+            return select_random_action
+        return self._seat_policies[seat]
+
+    def _load(self, name: str) -> FrozenPolicy:
+        """Load a snapshot from disk, keeping it in memory for later episodes."""
+        if name not in self._loaded:
+            state_dict = torch.load(os.path.join(self.pool_dir, name), map_location='cpu')
+            self._loaded[name] = FrozenPolicy(
+                state_dict,
+                self.rl_agent.state_size,
+                self.rl_agent.total_action_size,
+                self.rl_agent.action_size
+            )
+        return self._loaded[name]
+
+    def _save_index(self):
+        """Write the pool index atomically."""
+        self._results_since_save = 0
+        index_path = os.path.join(self.pool_dir, POOL_INDEX)
+        with open(f"{index_path}.tmp", 'w') as f:
+            json.dump(self.pool, f, indent=2)
+        os.replace(f"{index_path}.tmp", index_path)
+
+class LeagueOpponent:
+    """
+    One opponent seat backed by the league.
+    Works anywhere an opponent callable or an object with select_action is expected.
+    """
+
+    def __init__(self, league: League, seat: int):
+        """
+        Initialize the opponent seat.
+
+        Args:
+            league: The league that assigns policies to this seat
+            seat: Index of the seat among the opponent seats
+        """
+        self.league = league
+        self.seat = seat
+
+    def begin_episode(self, episode: int):
+        """Called by the trainer before each episode."""
+        self.league.begin_episode(episode)
+
+    def end_episode(self, win: bool):
+        """Called by the trainer after each episode."""
+        self.league.end_episode(win)
+
+    def close(self):
+        """Called by the trainer at the end of training."""
+        self.league.flush()
+
+    def select_action(self, game, player_idx: int):
+        """Select a card using the policy assigned to this seat."""
+        policy = self.league.policy_for_seat(self.seat)
+        if hasattr(policy, 'select_action'):
+            return policy.select_action(game, player_idx)
+        return policy(game, player_idx)
+
+    def __call__(self, game, player_idx: int):
+        """Allow the seat to be used like select_random_action."""
+        return self.select_action(game, player_idx)
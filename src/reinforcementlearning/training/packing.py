@@ -0,0 +1,99 @@
+"""
+Compact storage format for Doppelkopf observations.
+Of the 161 values returned by get_state_for_player, 159 are 0/1 flags (card planes, variant,
+team, current player and announcements) and 2 are scores divided by 240. A packed observation
+stores the flags as bits and the scores as int16 points in 24 bytes instead of 644, so packing
+is lossless, and whole batches are unpacked to float32 in one vectorized operation.
+"""
+
+import numpy as np
+import torch
+from typing import Union
+
+from src.backend.game.doppelkopf import get_state_size
+
+# Size of an unpacked observation
+STATE_SIZE = get_state_size()
+
+# Positions of the scores (RE and KONTRA points / 240) in the observation
+SCORE_INDICES = np.array([157, 158])
+SCORE_SCALE = 240.0
+
+# Positions of the 0/1 features, packed as bits
+BINARY_INDICES = np.setdiff1d(np.arange(STATE_SIZE), SCORE_INDICES)
+
+NUM_BIT_BYTES = (len(BINARY_INDICES) + 7) // 8
+NUM_SCORE_BYTES = 2 * len(SCORE_INDICES)
+
+# Bytes per packed observation
+PACKED_SIZE = NUM_BIT_BYTES + NUM_SCORE_BYTES
+
+# Layout of the packed bytes: version 1 stored the scores as float16, version 2 as int16 points
+PACKING_VERSION = 2
+
+# The 8 bits of every byte value as float32, most significant first
+_BYTE_TO_BITS = torch.from_numpy(np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float32))
+
+
+def pack_observations(observations) -> np.ndarray:
+    """
+    Pack observations.
+
+    Args:
+        observations: Array-like of shape (batch, STATE_SIZE) or (STATE_SIZE,)
+
+    Returns:
+        uint8 array of shape (batch, PACKED_SIZE) or (PACKED_SIZE,)
+    """
+    observations = np.asarray(observations, dtype=np.float32)
+    single = observations.ndim == 1
+    observations = np.atleast_2d(observations)
+
+    bits = np.packbits(observations[:, BINARY_INDICES] > 0.5, axis=1)
+    # Scores are whole points (bonuses can take them below 0 or above 240), exact in int16
+    points = np.rint(observations[:, SCORE_INDICES] * SCORE_SCALE)
+    points = np.ascontiguousarray(points, dtype=np.int16).view(np.uint8)
+    packed = np.concatenate([bits, points], axis=1)
+    return packed[0] if single else packed
+
+def upgrade_packed_observations(packed: np.ndarray, version: int) -> np.ndarray:
+    """
+    Convert observations packed with an older layout to the current one.
+
+    Args:
+        packed: uint8 array of shape (batch, PACKED_SIZE)
+        version: PACKING_VERSION the observations were packed with
+
+    Returns:
+        The observations in the current layout (the input itself if it is current)
+    """
+    if version >= PACKING_VERSION:
+        return packed
+    packed = np.array(packed, dtype=np.uint8)
+    scores = np.ascontiguousarray(packed[:, NUM_BIT_BYTES:]).view(np.float16).astype(np.float32)
+    packed[:, NUM_BIT_BYTES:] = np.ascontiguousarray(np.rint(scores * SCORE_SCALE), dtype=np.int16).view(np.uint8)
+    return packed
+
+def unpack_observations(packed: Union[np.ndarray, torch.Tensor], device=None) -> torch.Tensor:
+    """
+    Unpack a batch of packed observations to float32.
+
+    Args:
+        packed: uint8 array or tensor of shape (batch, PACKED_SIZE)
+        device: Device of the result (default: the device of a tensor input, else CPU)
+
+    Returns:
+        float32 tensor of shape (batch, STATE_SIZE)
+    """
+    packed = torch.as_tensor(packed)
+    if device is not None:
+        packed = packed.to(device)
+
+    # One table lookup turns every byte into its 8 bits
+    bits = _BYTE_TO_BITS.to(packed.device)[packed[:, :NUM_BIT_BYTES].long()]
+    bits = bits.reshape(len(packed), -1)[:, :len(BINARY_INDICES)]
+    scores = packed[:, NUM_BIT_BYTES:].contiguous().view(torch.int16).float() / SCORE_SCALE
+
+    # The scores sit between the flags; splice them in instead of scattering
+    split = int(SCORE_INDICES[0])
+    return torch.cat([bits[:, :split], scores, bits[:, split:]], dim=1)
@@ -0,0 +1,197 @@
+"""
+Phase profiler for the Doppelkopf training loop.
+Measures how much wall time each phase of training takes (engine stepping, state encoding,
+action selection, replay sampling, backprop, logging) and reports it every N episodes.
+A disabled profiler (NULL_PROFILER) does nothing, so instrumented code stays cheap.
+"""
+
+import io
+import time
+import cProfile
+import pstats
+from typing import Dict, Optional, Tuple
+
+import src.backend.utils.logger as logger
+
+class _PhaseTimer:
+    """Reusable context manager that accumulates the time spent in one phase."""
+
+    __slots__ = ('total', 'calls', '_start')
+
+    def __init__(self):
+        self.total = 0.0
+        self.calls = 0
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.total += time.perf_counter() - self._start
+        self.calls += 1
+        return False
+
+class _NullTimer:
+    """Context manager that does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class NullProfiler:
+    """A profiler that records nothing. Used when profiling is disabled."""
+
+    enabled = False
+
+    def phase(self, name: str):
+        """Return a context manager that does nothing."""
+        return _NULL_TIMER
+
+    def count(self, name: str, n: int = 1):
+        """Ignore a counter increment."""
+
+    def begin_episode(self, episode: int):
+        """Ignore the start of an episode."""
+
+    def end_episode(self, episode: int):
+        """Ignore the end of an episode."""
+
+    def close(self):
+        """Nothing to clean up."""
+
+# Shared disabled profiler
+NULL_PROFILER = NullProfiler()
+
+class PhaseProfiler:
+    """
+    Accumulates per-phase timings and counters and logs a table every report_interval episodes.
+
+    Phases use dotted names for nesting: the time of 'learn.backprop' is also part of 'learn'.
+    Optionally runs cProfile for a range of episodes and dumps the stats to a file.
+    """
+
+    enabled = True
+
+    def __init__(self, report_interval: int = 100, cprofile_episodes: Optional[Tuple[int, int]] = None,
+                 cprofile_path: str = "training.prof"):
+        """
+        Initialize the profiler.
+
+        Args:
+            report_interval: Log a report every N episodes
+            cprofile_episodes: Inclusive (first, last) episode range to run cProfile for
+            cprofile_path: File to dump the cProfile stats to
+        """
+        self.report_interval = report_interval
+        self.cprofile_episodes = cprofile_episodes
+        self.cprofile_path = cprofile_path
+
+        self._timers: Dict[str, _PhaseTimer] = {}
+        self._counters: Dict[str, int] = {}
+        self._window_start = time.perf_counter()
+        self._episodes_in_window = 0
+        self._cprofile = None
+
+    def phase(self, name: str) -> _PhaseTimer:
+        """
+        Get the timer context manager for a phase.
+
+        Args:
+            name: Name of the phase
+
+        Returns:
+            A context manager that adds its duration to the phase
+        """
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _PhaseTimer()
+        return timer
+
+    def count(self, name: str, n: int = 1):
+        """
+        Increment a counter (e.g. transitions or decisions).
+
+        Args:
+            name: Name of the counter
+            n: Amount to add
+        """
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def begin_episode(self, episode: int):
+        """
+        Mark the start of an episode; starts cProfile when entering the profiled range.
+
+        Args:
+            episode: The episode number
+        """
+        if self.cprofile_episodes and self._cprofile is None and episode == self.cprofile_episodes[0]:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def end_episode(self, episode: int):
+        """
+        Mark the end of an episode; logs a report every report_interval episodes.
+
+        Args:
+            episode: The episode number
+        """
+        self._episodes_in_window += 1
+        self.count('episodes')
+
+        if self._cprofile is not None and episode >= self.cprofile_episodes[1]:
+            self._dump_cprofile()
+
+        if self._episodes_in_window >= self.report_interval:
+            logger.info(f"Training profile (episodes {episode - self._episodes_in_window + 1}-{episode}):\n"
+                        + self.report())
+            self.reset()
+
+    def report(self) -> str:
+        """
+        Format the current window as a table.
+
+        Returns:
+            The table with time share, calls per second and counter rates
+        """
+        elapsed = max(time.perf_counter() - self._window_start, 1e-9)
+        lines = [f"{'Phase':<28} {'Time (s)':>10} {'Share':>8} {'Calls':>10} {'Calls/s':>10} {'ms/call':>9}"]
+        for name in sorted(self._timers):
+            timer = self._timers[name]
+            indent = "  " * name.count('.')
+            ms_per_call = 1000.0 * timer.total / timer.calls if timer.calls else 0.0
+            lines.append(f"{indent + name:<28} {timer.total:>10.3f} {100.0 * timer.total / elapsed:>7.1f}% "
+                         f"{timer.calls:>10} {timer.calls / elapsed:>10.1f} {ms_per_call:>9.3f}")
+        lines.append(f"{'wall time':<28} {elapsed:>10.3f}")
+        for name in sorted(self._counters):
+            lines.append(f"{name + '/s':<28} {self._counters[name] / elapsed:>10.1f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        """Start a new reporting window."""
+        self._timers.clear()
+        self._counters.clear()
+        self._episodes_in_window = 0
+        self._window_start = time.perf_counter()
+
+    def close(self):
+        """Dump cProfile stats if profiling is still running."""
+        if self._cprofile is not None:
+            self._dump_cprofile()
+
+    def _dump_cprofile(self):
+        """Stop cProfile, write the stats file and log the top functions."""
+        self._cprofile.disable()
+        self._cprofile.dump_stats(self.cprofile_path)
+
+        stream = io.StringIO()
+        pstats.Stats(self._cprofile, stream=stream).sort_stats('cumulative').print_stats(20)
+        logger.info(f"cProfile stats written to {self.cprofile_path}\n{stream.getvalue()}")
+        self._cprofile = None
+        self.cprofile_episodes = None
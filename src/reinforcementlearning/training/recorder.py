@@ -0,0 +1,378 @@
+"""
+Offline dataset recorder for Doppelkopf experience.
+Play loops stream (observation, legal mask, action, reward, done, episode id, greedy) rows
+into fixed-size memory-mapped .npy shards described by a small JSON index. The greedy flag
+marks decisions that were not random exploration, so imitation learning can leave those out.
+The reader random-accesses or streams the shards without loading them into RAM.
+"""
+
+import os
+import json
+import numpy as np
+from typing import Dict, Iterator, List, Optional
+
+import src.backend.utils.logger as logger
+from src.reinforcementlearning.training.packing import (
+    STATE_SIZE, PACKED_SIZE, PACKING_VERSION, pack_observations, unpack_observations, upgrade_packed_observations
+)
+
+# Version of the dataset layout; version 1 datasets have no greedy column
+DATASET_FORMAT_VERSION = 2
+SUPPORTED_FORMAT_VERSIONS = (1, 2)
+
+# Name of the index file inside the dataset directory
+DATASET_INDEX = "index.json"
+
+# File name pattern of one column of one shard
+SHARD_PATTERN = "shard_{shard:05d}_{column}.npy"
+
+def dataset_columns(state_size: int, num_actions: int, packed: bool = False,
+                    format_version: int = DATASET_FORMAT_VERSION) -> Dict[str, tuple]:
+    """
+    Get the columns of a dataset.
+
+    Args:
+        state_size: Size of the observations
+        num_actions: Size of the legal action masks
+        packed: Whether observations are stored bit-packed
+        format_version: Layout version of the dataset
+
+    Returns:
+        Mapping of column name to (dtype, per-row shape)
+    """
+    columns = {
+        'observations': ('uint8', (PACKED_SIZE,)) if packed else ('float32', (state_size,)),
+        'legal_masks': ('bool', (num_actions,)),
+        'actions': ('int16', ()),
+        'rewards': ('float32', ()),
+        'dones': ('bool', ()),
+        'episodes': ('int64', ()),
+    }
+    if format_version >= 2:
+        columns['greedy'] = ('bool', ())
+    return columns
+
+class DatasetRecorder:
+    """
+    Writes experience rows into memory-mapped shards.
+
+    Rows of an episode are collected with record() and written when the episode ends,
+    so end_episode() can still attach the final reward to the last decision.
+    """
+
+    def __init__(self, dataset_dir: str, state_size: int, num_actions: int, shard_size: int = 100000,
+                 metadata: Optional[Dict] = None, packed: Optional[bool] = None):
+        """
+        Initialize the recorder, appending to the dataset if it already exists.
+
+        Args:
+            dataset_dir: Directory to write the shards and index to
+            state_size: Size of the observations
+            num_actions: Size of the legal action masks
+            shard_size: Number of rows per shard
+            metadata: Extra information stored in the index (e.g. the source of the games)
+            packed: Whether to store observations bit-packed (default: when they have the game's state layout)
+        """
+        self.dataset_dir = dataset_dir
+        os.makedirs(dataset_dir, exist_ok=True)
+
+        index_path = os.path.join(dataset_dir, DATASET_INDEX)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.index = json.load(f)
+            if self.index['state_size'] != state_size or self.index['num_actions'] != num_actions:
+                raise ValueError(f"Dataset {dataset_dir} has a different observation or action size")
+            if self.index.get('packed_observations') and self.index.get('packing_version', 1) != PACKING_VERSION:
+                raise ValueError(f"Dataset {dataset_dir} stores observations in an older packed layout")
+            logger.info(f"Appending to dataset {dataset_dir} with {self.index['num_rows']} rows")
+        else:
+            if packed is None:
+                packed = state_size == STATE_SIZE
+            self.index = {
+                'format_version': DATASET_FORMAT_VERSION,
+                'state_size': state_size,
+                'num_actions': num_actions,
+                'packed_observations': packed,
+                'packing_version': PACKING_VERSION,
+                'shard_size': shard_size,
+                'num_rows': 0,
+                'num_episodes': 0,
+                'metadata': metadata or {},
+                'shards': []
+            }
+
+        self.packed = self.index.get('packed_observations', False)
+        self.columns = dataset_columns(state_size, num_actions, self.packed, self.index['format_version'])
+        self.shard_size = self.index['shard_size']
+        self._arrays = None
+        self._pending = []
+
+    def begin_episode(self) -> int:
+        """
+        Start a new episode, discarding rows of an episode that was not ended.
+
+        Returns:
+            The id of the new episode
+        """
+        self._pending = []
+        return self.index['num_episodes']
+
+    def record(self, observation, legal_mask, action: int, reward: float, greedy: bool = True):
+        """
+        Record one decision of the current episode.
+
+        Args:
+            observation: The observation the decision was made on
+            legal_mask: Boolean mask of the legal actions
+            action: Index of the chosen action
+            reward: The immediate reward
+            greedy: False if the action was random exploration rather than the policy's choice
+        """
+        self._pending.append((observation, legal_mask, action, reward, greedy))
+
+    def add_reward(self, reward: float):
+        """
+        Add a reward to the episode's last recorded decision, e.g. that of a forced move.
+
+        Args:
+            reward: The reward to add
+        """
+        if self._pending:
+            observation, legal_mask, action, last_reward, greedy = self._pending[-1]
+            self._pending[-1] = (observation, legal_mask, action, last_reward + reward, greedy)
+
+    def end_episode(self, final_reward: float = 0.0):
+        """
+        Write the rows of the current episode; the last row is marked done.
+
+        Args:
+            final_reward: End-of-game reward added to the last row
+        """
+        if not self._pending:
+            return
+
+        episode_id = self.index['num_episodes']
+        last = len(self._pending) - 1
+        for i, (observation, legal_mask, action, reward, greedy) in enumerate(self._pending):
+            done = i == last
+            self._write_row(observation, legal_mask, action, reward + (final_reward if done else 0.0), done,
+                            episode_id, greedy)
+
+        self._pending = []
+        self.index['num_episodes'] += 1
+
+    def close(self):
+        """Flush the open shard and write the index."""
+        self._flush()
+        self._arrays = None
+
+    def _write_row(self, observation, legal_mask, action, reward, done, episode_id, greedy):
+        """Write one row into the open shard, starting a new shard when it is full."""
+        if self._arrays is None or self._current_shard()['count'] >= self.shard_size:
+            self._open_shard()
+
+        shard = self._current_shard()
+        row = shard['count']
+        self._arrays['observations'][row] = pack_observations(observation) if self.packed else observation
+        self._arrays['legal_masks'][row] = legal_mask
+        self._arrays['actions'][row] = action
+        self._arrays['rewards'][row] = reward
+        self._arrays['dones'][row] = done
+        self._arrays['episodes'][row] = episode_id
+        if 'greedy' in self._arrays:
+            self._arrays['greedy'][row] = greedy
+        shard['count'] += 1
+        self.index['num_rows'] += 1
+
+    def _current_shard(self) -> Dict:
+        """Index entry of the shard being written."""
+        return self.index['shards'][-1]
+
+    def _open_shard(self):
+        """Flush the current shard and create the memory maps of a new one."""
+        self._flush()
+
+        # Continue a partially filled shard when appending to an existing dataset
+        if self.index['shards'] and self._arrays is None and self._current_shard()['count'] < self.shard_size:
+            mode = 'r+'
+        else:
+            shard_idx = len(self.index['shards'])
+            self.index['shards'].append({'shard': shard_idx, 'count': 0})
+            mode = 'w+'
+
+        shard_idx = self._current_shard()['shard']
+        self._arrays = {}
+        for column, (dtype, shape) in self.columns.items():
+            path = os.path.join(self.dataset_dir, SHARD_PATTERN.format(shard=shard_idx, column=column))
+            if mode == 'w+':
+                self._arrays[column] = np.lib.format.open_memmap(
+                    path, mode='w+', dtype=dtype, shape=(self.shard_size,) + shape)
+            else:
+                self._arrays[column] = np.load(path, mmap_mode='r+')
+
+    def _flush(self):
+        """Flush the open shard to disk and write the index atomically."""
+        if self._arrays is not None:
+            for array in self._arrays.values():
+                array.flush()
+        index_path = os.path.join(self.dataset_dir, DATASET_INDEX)
+        with open(f"{index_path}.tmp", 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(f"{index_path}.tmp", index_path)
+
+class DatasetReader:
+    """
+    Read-only access to a recorded dataset.
+
+    Shards are opened as read-only memory maps on first use, so only the rows
+    that are accessed are paged in. Packed observations are unpacked to float32
+    per batch.
+    """
+
+    def __init__(self, dataset_dir: str):
+        """
+        Open a dataset.
+
+        Args:
+            dataset_dir: Directory containing the shards and index
+        """
+        self.dataset_dir = dataset_dir
+        with open(os.path.join(dataset_dir, DATASET_INDEX)) as f:
+            self.index = json.load(f)
+        if self.index.get('format_version') not in SUPPORTED_FORMAT_VERSIONS:
+            raise ValueError(f"Unsupported dataset format version {self.index.get('format_version')}")
+
+        self.state_size = self.index['state_size']
+        self.num_actions = self.index['num_actions']
+        self.packed = self.index.get('packed_observations', False)
+        # Datasets written before the packing version was recorded store the scores as float16
+        self.packing_version = self.index.get('packing_version', 1)
+        self.columns = dataset_columns(self.state_size, self.num_actions, self.packed, self.index['format_version'])
+        self.shards = [s for s in self.index['shards'] if s['count'] > 0]
+        self._starts = np.cumsum([0] + [s['count'] for s in self.shards])
+        self._open = {}
+
+    def __len__(self) -> int:
+        """Get the number of rows."""
+        return int(self._starts[-1])
+
+    @property
+    def num_episodes(self) -> int:
+        """Get the number of recorded episodes."""
+        return self.index['num_episodes']
+
+    def shard_arrays(self, shard_pos: int) -> Dict[str, np.ndarray]:
+        """
+        Get the memory-mapped columns of a shard, trimmed to its rows.
+        Observations are returned as stored (packed if the dataset is packed).
+
+        Args:
+            shard_pos: Position of the shard in the dataset
+
+        Returns:
+            Mapping of column name to array
+        """
+        if shard_pos not in self._open:
+            shard = self.shards[shard_pos]
+            self._open[shard_pos] = {
+                column: np.load(os.path.join(self.dataset_dir, SHARD_PATTERN.format(shard=shard['shard'], column=column)),
+                                mmap_mode='r')[:shard['count']]
+                for column in self.columns
+            }
+        return self._open[shard_pos]
+
+    def get_batch(self, indices) -> Dict[str, np.ndarray]:
+        """
+        Gather rows by global index.
+
+        Args:
+            indices: Row indices
+
+        Returns:
+            Mapping of column name to an in-memory array of the requested rows
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError("Dataset row index out of range")
+        shard_positions = np.searchsorted(self._starts, indices, side='right') - 1
+
+        batch = {column: np.empty((len(indices),) + shape, dtype=dtype)
+                 for column, (dtype, shape) in self.columns.items()}
+        for shard_pos in np.unique(shard_positions):
+            selected = np.nonzero(shard_positions == shard_pos)[0]
+            local = indices[selected] - self._starts[shard_pos]
+            arrays = self.shard_arrays(int(shard_pos))
+            for column in self.columns:
+                batch[column][selected] = arrays[column][local]
+        return self._unpack(batch)
+
+    def _unpack(self, batch: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Convert packed observations of a batch to float32; rows of version 1 datasets count as greedy."""
+        if self.packed:
+            observations = upgrade_packed_observations(batch['observations'], self.packing_version)
+            batch['observations'] = unpack_observations(observations).numpy()
+        if 'greedy' not in batch:
+            batch['greedy'] = np.ones(len(batch['actions']), dtype=bool)
+        return batch
+
+    def greedy_rows(self) -> np.ndarray:
+        """
+        Find the rows whose action was the policy's choice rather than random exploration.
+
+        Returns:
+            Global row indices, in order
+        """
+        if 'greedy' not in self.columns:
+            return np.arange(len(self))
+        return np.concatenate([np.flatnonzero(self.shard_arrays(pos)['greedy']) + self._starts[pos]
+                               for pos in range(len(self.shards))] or [np.zeros(0, dtype=np.int64)])
+
+    def __getitem__(self, idx: int) -> Dict:
+        """Get one row as a dictionary."""
+        row = self.get_batch([idx])
+        return {column: values[0] for column, values in row.items()}
+
+    def iter_batches(self, batch_size: int, shuffle: bool = False, seed: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Stream the dataset in batches.
+
+        Without shuffling, shards are read sequentially; with shuffling, every epoch
+        visits the rows in a random order.
+
+        Args:
+            batch_size: Number of rows per batch
+            shuffle: Whether to visit the rows in random order
+            seed: Seed for the shuffle
+
+        Yields:
+            Mapping of column name to array
+        """
+        if shuffle:
+            order = np.random.default_rng(seed).permutation(len(self))
+            for start in range(0, len(order), batch_size):
+                # Sorting the indices within a batch keeps the memory-mapped reads local
+                yield self.get_batch(np.sort(order[start:start + batch_size]))
+            return
+
+        for shard_pos in range(len(self.shards)):
+            arrays = self.shard_arrays(shard_pos)
+            count = len(arrays['actions'])
+            for start in range(0, count, batch_size):
+                yield self._unpack({column: np.asarray(values[start:start + batch_size]) for column, values in arrays.items()})
+
+    def episode_rows(self, episode_id: int) -> List[int]:
+        """
+        Find the rows of an episode.
+
+        Args:
+            episode_id: The episode id
+
+        Returns:
+            Global row indices of the episode, in order
+        """
+        rows = []
+        for shard_pos in range(len(self.shards)):
+            episodes = self.shard_arrays(shard_pos)['episodes']
+            local = np.nonzero(episodes == episode_id)[0]
+            rows.extend((local + self._starts[shard_pos]).tolist())
+        return rows
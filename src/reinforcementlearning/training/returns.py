@@ -0,0 +1,181 @@
+"""
+Episode-level return computation for Doppelkopf training.
+Instead of pushing every decision with its one-step reward, an episode is collected first
+and turned into n-step or lambda-return transitions with one vectorized pass at the end of
+the game, including the end-of-game reward. The transitions are then written into the replay
+buffer in one batch.
+"""
+
+import numpy as np
+from typing import Callable, Dict, Optional
+
+def discount_matrix(length: int, discount: float, horizon: Optional[int] = None) -> np.ndarray:
+    """
+    Build the matrix M with M[t, k] = discount^(k - t) for t <= k < t + horizon, else 0.
+    Multiplying it with a reward vector gives the discounted (truncated) sums of all steps at once.
+
+    Args:
+        length: Number of steps in the episode
+        discount: Per-step discount factor
+        horizon: Number of rewards summed per step (default: until the end of the episode)
+
+    Returns:
+        Array of shape (length, length)
+    """
+    offsets = np.arange(length)[None, :] - np.arange(length)[:, None]
+    mask = offsets >= 0
+    if horizon is not None:
+        mask &= offsets < horizon
+    return np.where(mask, np.power(float(discount), np.maximum(offsets, 0)), 0.0)
+
+def n_step_returns(rewards: np.ndarray, gamma: float, n_step: int):
+    """
+    Compute n-step returns of an episode that ends after the last reward.
+
+    Args:
+        rewards: Rewards of the episode's steps
+        gamma: Discount factor
+        n_step: Number of rewards summed before bootstrapping
+
+    Returns:
+        Tuple of (returns, index of the bootstrap step, whether the step bootstraps, bootstrap discounts)
+    """
+    length = len(rewards)
+    steps = np.arange(length)
+    returns = discount_matrix(length, gamma, n_step) @ np.asarray(rewards, dtype=np.float64)
+    has_next = steps + n_step < length
+    bootstrap = np.minimum(steps + n_step, length) - 1
+    discounts = np.where(has_next, gamma ** n_step, 0.0)
+    return returns, bootstrap, has_next, discounts
+
+def lambda_returns(rewards: np.ndarray, next_values: np.ndarray, gamma: float, lam: float) -> np.ndarray:
+    """
+    Compute lambda-returns of an episode that ends after the last reward.
+
+    Uses G_t = r_t + gamma * ((1 - lam) * V(s_t+1) + lam * G_t+1), unrolled into one
+    matrix product. The value after the last step is taken to be 0.
+
+    Args:
+        rewards: Rewards of the episode's steps
+        next_values: Value estimates of the state after each step
+        gamma: Discount factor
+        lam: Lambda (0 gives one-step targets, 1 gives Monte Carlo returns)
+
+    Returns:
+        The lambda-returns
+    """
+    next_values = np.asarray(next_values, dtype=np.float64).copy()
+    next_values[-1] = 0.0
+    targets = np.asarray(rewards, dtype=np.float64) + gamma * (1.0 - lam) * next_values
+    return discount_matrix(len(rewards), gamma * lam) @ targets
+
+class EpisodeAccumulator:
+    """
+    Collects the RL agent's decisions of one episode and turns them into replay transitions.
+
+    With n-step returns every transition stores the discounted sum of the next n rewards and
+    bootstraps from the state n decisions later with discount gamma^n. With lambda-returns the
+    full return is computed from value estimates taken at the end of the episode and the
+    transition does not bootstrap. The last decision is terminal in both cases.
+    """
+
+    def __init__(self, gamma: float, n_step: int = 1, lam: Optional[float] = None):
+        """
+        Initialize the accumulator.
+
+        Args:
+            gamma: Discount factor
+            n_step: Number of rewards summed before bootstrapping
+            lam: Lambda for lambda-returns (default: use n-step returns)
+        """
+        if n_step < 1:
+            raise ValueError("n_step must be at least 1")
+        if lam is not None and not 0.0 <= lam <= 1.0:
+            raise ValueError("lambda must be between 0 and 1")
+        self.gamma = gamma
+        self.n_step = n_step
+        self.lam = lam
+        self.reset()
+
+    def reset(self):
+        """Discard the collected decisions."""
+        self.states = []
+        self.actions = []
+        self.next_states = []
+        self.rewards = []
+
+    def add(self, state, action: int, next_state, reward: float):
+        """
+        Add one decision.
+
+        Args:
+            state: The observation before the action
+            action: The action index
+            next_state: The observation after the action (may be None for the last decision)
+            reward: The immediate reward
+        """
+        self.states.append(np.asarray(state, dtype=np.float32))
+        self.actions.append(int(action))
+        self.next_states.append(None if next_state is None else np.asarray(next_state, dtype=np.float32))
+        self.rewards.append(float(reward))
+
+    def add_reward(self, reward: float) -> bool:
+        """
+        Add a reward to the last decision, e.g. that of a forced move played after it.
+
+        Args:
+            reward: The reward to add
+
+        Returns:
+            True if there was a decision to add it to
+        """
+        if not self.rewards:
+            return False
+        self.rewards[-1] += float(reward)
+        return True
+
+    def __len__(self) -> int:
+        """Get the number of collected decisions."""
+        return len(self.actions)
+
+    def finish(self, final_reward: float = 0.0,
+               value_fn: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Compute the transitions of the episode and reset the accumulator.
+
+        Args:
+            final_reward: End-of-game reward added to the last decision
+            value_fn: Maps a batch of observations to state values; required for lambda-returns
+
+        Returns:
+            Dictionary of 'states', 'actions', 'next_states', 'has_next', 'rewards' and 'discounts'
+            arrays (rewards hold the returns), or None if the episode had no decisions
+        """
+        if not self.actions:
+            return None
+
+        states = np.stack(self.states)
+        next_states = np.stack([s if s is not None else np.zeros_like(states[0]) for s in self.next_states])
+        rewards = np.asarray(self.rewards, dtype=np.float64)
+        rewards[-1] += final_reward
+
+        if self.lam is None:
+            returns, bootstrap, has_next, discounts = n_step_returns(rewards, self.gamma, self.n_step)
+            next_states = next_states[bootstrap]
+        else:
+            if value_fn is None:
+                raise ValueError("lambda-returns need a value function")
+            returns = lambda_returns(rewards, value_fn(next_states), self.gamma, self.lam)
+            has_next = np.zeros(len(rewards), dtype=bool)
+            discounts = np.zeros(len(rewards))
+
+        batch = {
+            'states': states,
+            'actions': np.asarray(self.actions, dtype=np.int64),
+            'next_states': next_states,
+            'has_next': has_next,
+            'rewards': returns.astype(np.float32),
+            'discounts': discounts.astype(np.float32)
+        }
+        self.reset()
+        return batch
@@ -0,0 +1,124 @@
+"""
+Reward functions for Doppelkopf training.
+Every training loop computes its per-decision and end-of-game rewards here, so changes
+to the reward shaping apply to all of them.
+"""
+
+from typing import Callable, Dict, Tuple
+
+from src.backend.game.doppelkopf import TEAM_RE, TEAM_KONTRA
+
+def calculate_reward(game, player_idx: int, action_type: str = 'card', announcement: str = None) -> float:
+    """
+    Calculate the reward for the given player.
+    
+    Args:
+        game: The game instance
+        player_idx: Index of the player
+        action_type: Type of action ('card', 'announce', or 'variant')
+        announcement: The announcement made ('re' or 'contra')
+        
+    Returns:
+        The reward value
+    """
+    # Basic reward structure
+    reward = 0
+    
+    # Get the player's team
+    player_team = game.teams[player_idx]
+    team_idx = 0 if player_team == TEAM_RE else 1
+    
+    # Reward for winning a trick (only applies to card actions)
+    if action_type == 'card' and game.trick_winner == player_idx:
+        # Simple reward for winning a trick
+        reward += 1.0
+    
+    # Reward for making announcements
+    if action_type == 'announce':
+        # Small immediate reward for making an announcement
+        reward += 1.0
+        
+        # Additional reward based on the player's team
+        if (announcement == 're' and player_team == TEAM_RE) or \
+           (announcement == 'contra' and player_team == TEAM_KONTRA):
+            # Correct team announcement
+            reward += 1.0
+            
+        # Reward based on current score advantage
+        if game.scores[team_idx] > game.scores[1 - team_idx]:
+            # If player's team is ahead, announcing is good
+            reward += 1.0
+    
+    # Reward for selecting game variants
+    if action_type == 'variant':
+        # Small immediate reward for selecting a variant
+        reward += 0.5
+        
+        # We could add more sophisticated rewards based on the hand and variant
+        # For example, reward for selecting hochzeit when having both Queens of Clubs
+        if announcement == 'hochzeit' and hasattr(game, 'has_hochzeit') and game.has_hochzeit(player_idx):
+            reward += 2.0
+        
+        # Reward for selecting solo variants when appropriate
+        if announcement in ['queen_solo', 'jack_solo'] and player_idx == 0:
+            # Simple reward for selecting a solo variant
+            reward += 1.0
+    
+    # Continuous reward based on score difference
+    if hasattr(game, 'scores') and len(game.scores) == 2:
+        # Get the score difference between the player's team and the opponent team
+        score_diff = game.scores[team_idx] - game.scores[1 - team_idx]
+        
+        # Give a small continuous reward based on the score difference
+        # This encourages the agent to maximize the score difference throughout the game
+        reward += score_diff / 50.0  # Scale down to avoid overshadowing other rewards
+    
+    return reward
+
+def sparse_reward(game, player_idx: int, action_type: str = 'card', announcement: str = None) -> float:
+    """
+    No per-decision reward; only the end-of-game reward counts.
+    
+    Args:
+        game: The game instance
+        player_idx: Index of the player
+        action_type: Type of action ('card', 'announce', or 'variant')
+        announcement: The announcement made ('re' or 'contra')
+        
+    Returns:
+        Always 0
+    """
+    return 0.0
+
+def end_game_reward(game, player_idx: int) -> Tuple[float, bool, int]:
+    """
+    Calculate the end-of-game reward for the given player.
+    
+    The reward is the score difference of the player's team divided by 10, plus a
+    bonus of 5 for a win or a penalty of 5 for a loss.
+    
+    Args:
+        game: The finished game instance
+        player_idx: Index of the player
+        
+    Returns:
+        Tuple of (reward, whether the player's team won, score difference)
+    """
+    player_team = game.teams[player_idx]
+    win = game.winner == player_team
+    team_idx = 0 if player_team == TEAM_RE else 1
+    score_diff = game.scores[team_idx] - game.scores[1 - team_idx]
+    
+    # Score difference encourages maximizing points, not just winning
+    score_reward = score_diff / 10.0
+    
+    # Still give a bonus for winning, but make it smaller compared to score difference
+    win_bonus = 5 if win else -5
+    
+    return score_reward + win_bonus, win, score_diff
+
+# Per-decision reward functions selectable by name
+REWARD_FUNCTIONS: Dict[str, Callable] = {
+    'shaped': calculate_reward,
+    'sparse': sparse_reward
+}
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Parallel hyperparameter sweeps for the Doppelkopf RL agent.
+A grid or random search space is expanded into trials that train in isolated worker
+processes, each limited to a few CPU threads. Trials are evaluated periodically on a
+fixed duplicate deal set; trials that fall clearly behind the others are stopped early.
+The results of all trials are collected into one table.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import random
+import logging
+import argparse
+import itertools
+import multiprocessing
+import numpy as np
+import torch
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+import src.backend.utils.logger as logger
+
+# RLAgent arguments that can be swept
+SWEEPABLE_PARAMS = (
+    'learning_rate', 'gamma', 'epsilon_start', 'epsilon_end', 'epsilon_decay', 'buffer_size',
+    'batch_size', 'target_update', 'n_step', 'td_lambda', 'network', 'augment'
+)
+
+# Distributions for random search
+DISTRIBUTIONS = ('uniform', 'loguniform', 'int')
+
+# Name of the results table inside the sweep directory
+RESULTS_FILE = "results.csv"
+
+# Shared intermediate results of all trials, set in each worker process
+_worker_progress = None
+
+def _parse_value(text: str) -> Any:
+    """Convert a command-line value to an int, float, bool, None or string."""
+    lowered = text.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    if lowered == 'none':
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+def parse_param(text: str) -> Tuple[str, Any]:
+    """
+    Parse a search-space entry given on the command line.
+
+    Args:
+        text: 'name=v1,v2,...' for a list of values, or 'name=DIST:low:high' with DIST
+              one of uniform, loguniform or int for random search
+
+    Returns:
+        Tuple of (parameter name, list of values or {DIST: [low, high]})
+    """
+    name, sep, spec = text.partition('=')
+    if not sep or not spec:
+        raise ValueError(f"Expected NAME=VALUES, got '{text}'")
+    if name not in SWEEPABLE_PARAMS:
+        raise ValueError(f"Unknown parameter '{name}', expected one of {', '.join(SWEEPABLE_PARAMS)}")
+
+    dist, _, bounds = spec.partition(':')
+    if dist in DISTRIBUTIONS and bounds:
+        low, _, high = bounds.partition(':')
+        return name, {dist: [float(low), float(high)]}
+    return name, [_parse_value(v) for v in spec.split(',')]
+
+def grid_trials(space: Dict[str, Any]) -> List[Dict]:
+    """
+    Expand a search space into the full grid.
+
+    Args:
+        space: Mapping of parameter name to a list of values
+
+    Returns:
+        One parameter dictionary per grid point
+    """
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"Parameter '{name}' has a distribution; use random search (--samples)")
+    names = sorted(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+def random_trials(space: Dict[str, Any], num_samples: int, seed: int = 0) -> List[Dict]:
+    """
+    Draw random points from a search space.
+
+    Args:
+        space: Mapping of parameter name to a list of values or a {DIST: [low, high]} distribution
+        num_samples: Number of points
+        seed: Seed for the draws
+
+    Returns:
+        One parameter dictionary per point
+    """
+    rng = random.Random(seed)
+
+    def draw(spec):
+        if isinstance(spec, list):
+            return rng.choice(spec)
+        (dist, (low, high)), = spec.items()
+        if dist == 'uniform':
+            return rng.uniform(low, high)
+        if dist == 'loguniform':
+            return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        if dist == 'int':
+            return rng.randint(int(low), int(high))
+        raise ValueError(f"Unknown distribution '{dist}'")
+
+    return [{name: draw(space[name]) for name in sorted(space)} for _ in range(num_samples)]
+
+def should_stop(progress, trial_id: int, episode: int, win_rate: float,
+                min_win_rate: Optional[float] = None, median_min_trials: int = 3) -> bool:
+    """
+    Decide whether a trial is clearly worse than the others (median stopping rule).
+
+    A trial stops when its evaluation falls below min_win_rate, or below the median of the
+    other trials' evaluations at the same episode once at least median_min_trials have reported.
+
+    Args:
+        progress: Shared mapping of (episode, trial id) to win rate
+        trial_id: Id of the trial
+        episode: Episode of the evaluation
+        win_rate: Win rate of the evaluation
+        min_win_rate: Absolute floor (default: none)
+        median_min_trials: Reports needed from other trials before the median rule applies (0 disables it)
+
+    Returns:
+        True if the trial should stop
+    """
+    if min_win_rate is not None and win_rate < min_win_rate:
+        return True
+    if median_min_trials <= 0:
+        return False
+    others = [value for (step, other), value in progress.items() if step == episode and other != trial_id]
+    return len(others) >= median_min_trials and win_rate < float(np.median(others))
+
+def _init_worker(threads: int, progress):
+    """Limit the CPU threads of a worker process and connect it to the shared progress."""
+    global _worker_progress
+    torch.set_num_threads(threads)
+    _worker_progress = progress
+
+def _evaluate(rl_agent, deals: List, seed: int) -> Dict:
+    """Greedy duplicate evaluation of an agent against random opponents."""
+    from src.reinforcementlearning.agents.random_agent import select_random_action
+    from src.reinforcementlearning.training.duplicate import play_duplicate_game
+
+    original_epsilon = rl_agent.epsilon
+    rl_agent.epsilon = 0.0
+    results = [play_duplicate_game(deal, rl_agent, select_random_action, seat, seed + deal_idx * 4 + seat)
+               for deal_idx, deal in enumerate(deals) for seat in range(4)]
+    rl_agent.epsilon = original_epsilon
+    return {
+        'win_rate': float(np.mean([r['win'] for r in results])),
+        'score_diff': float(np.mean([r['score_diff'] for r in results]))
+    }
+
+def run_trial(trial: Dict) -> Dict:
+    """
+    Train and evaluate one configuration (runs in a worker process).
+
+    Args:
+        trial: Dictionary with the trial id, parameters, run directory, episode budget,
+               evaluation settings, seed and early-stopping settings
+
+    Returns:
+        A row of the results table
+    """
+    from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+    from src.reinforcementlearning.agents.rl_agent import RLAgent
+    from src.reinforcementlearning.agents.random_agent import select_random_action
+    from src.reinforcementlearning.training.duplicate import generate_deals
+    from src.reinforcementlearning.training.trainer import play_episode
+
+    start_time = time.time()
+    trial_id = trial['trial_id']
+    os.makedirs(trial['run_dir'], exist_ok=True)
+    logger.setup_logger(os.path.join(trial['run_dir'], 'logs'), level=logging.WARNING, console=False)
+
+    seed = trial['seed'] + trial_id
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+    game = DoppelkopfGame()
+    rl_agent = RLAgent(game.get_state_size(), game.get_action_size(), **trial['params'])
+    opponents = [select_random_action] * (game.num_players - 1)
+    deals = generate_deals(trial['eval_deals'], trial['seed'])
+
+    rewards = []
+    history = []
+    stopped = False
+    episode = 0
+    for episode in range(1, trial['episodes'] + 1):
+        game.reset()
+        reward, _ = play_episode(game, rl_agent, opponents)
+        rewards.append(reward)
+
+        if episode % trial['eval_interval'] == 0 or episode == trial['episodes']:
+            evaluation = _evaluate(rl_agent, deals, trial['seed'])
+            history.append({'episode': episode, **evaluation})
+            if _worker_progress is not None:
+                _worker_progress[(episode, trial_id)] = evaluation['win_rate']
+            if episode < trial['episodes'] and should_stop(
+                    _worker_progress if _worker_progress is not None else {}, trial_id, episode, evaluation['win_rate'],
+                    trial['min_win_rate'], trial['median_min_trials']):
+                stopped = True
+                break
+
+    rl_agent.save(os.path.join(trial['run_dir'], 'final_model.pt'))
+    with open(os.path.join(trial['run_dir'], 'history.json'), 'w') as f:
+        json.dump({'params': trial['params'], 'history': history}, f, indent=2)
+
+    return {
+        'trial': trial_id,
+        **{name: trial['params'].get(name, '') for name in trial['param_names']},
+        'episodes': episode,
+        'stopped_early': stopped,
+        'win_rate': history[-1]['win_rate'] if history else float('nan'),
+        'score_diff': history[-1]['score_diff'] if history else float('nan'),
+        'train_reward': float(np.mean(rewards[-100:])) if rewards else float('nan'),
+        'seconds': round(time.time() - start_time, 1)
+    }
+
+def run_sweep(trials: List[Dict], sweep_dir: str, episodes: int, eval_interval: int = 500,
+              eval_deals: int = 50, workers: Optional[int] = None, threads: int = 1, seed: int = 0,
+              min_win_rate: Optional[float] = None, median_min_trials: int = 3) -> List[Dict]:
+    """
+    Train all trials on a process pool and collect their results.
+
+    Args:
+        trials: Parameter dictionaries, e.g. from grid_trials or random_trials
+        sweep_dir: Directory for the per-trial runs and the results table
+        episodes: Training episodes per trial
+        eval_interval: Evaluate every N episodes
+        eval_deals: Number of duplicate deals per evaluation (each is played in all four seats)
+        workers: Number of trials run at once (default: number of CPUs divided by threads)
+        threads: torch CPU threads per trial
+        seed: Seed of the evaluation deals and base seed of the trials
+        min_win_rate: Stop trials whose evaluation falls below this win rate
+        median_min_trials: Stop trials below the median once this many others have reported (0 disables it)
+
+    Returns:
+        The rows of the results table, best win rate first
+    """
+    os.makedirs(sweep_dir, exist_ok=True)
+    workers = workers or max(1, (os.cpu_count() or 1) // threads)
+    param_names = sorted({name for params in trials for name in params})
+    jobs = [{
+        'trial_id': trial_id,
+        'params': params,
+        'param_names': param_names,
+        'run_dir': os.path.join(sweep_dir, f"trial_{trial_id:03d}"),
+        'episodes': episodes,
+        'eval_interval': eval_interval,
+        'eval_deals': eval_deals,
+        'seed': seed,
+        'min_win_rate': min_win_rate,
+        'median_min_trials': median_min_trials
+    } for trial_id, params in enumerate(trials)]
+
+    logger.info(f"Running {len(jobs)} trials on {workers} workers with {threads} thread(s) each")
+    rows = []
+    with multiprocessing.Manager() as manager:
+        progress = manager.dict()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(threads, progress)) as executor:
+            futures = [executor.submit(run_trial, job) for job in jobs]
+            for future in as_completed(futures):
+                row = future.result()
+                rows.append(row)
+                logger.info(f"Trial {row['trial']} finished after {row['episodes']} episodes - "
+                            f"Win Rate: {row['win_rate']:.3f}{' (stopped early)' if row['stopped_early'] else ''}")
+                write_results(rows, os.path.join(sweep_dir, RESULTS_FILE))
+
+    rows.sort(key=lambda r: -r['win_rate'])
+    write_results(rows, os.path.join(sweep_dir, RESULTS_FILE))
+    return rows
+
+def write_results(rows: List[Dict], path: str):
+    """Write the results table as CSV."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def format_results(rows: List[Dict]) -> str:
+    """Format the results as a table."""
+    columns = list(rows[0].keys())
+    cells = [[f"{r[c]:.4g}" if isinstance(r[c], float) else str(r[c]) for c in columns] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines.extend("  ".join(v.rjust(w) for v, w in zip(row, widths)) for row in cells)
+    return "\n".join(lines)
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Run a parallel hyperparameter sweep for the Doppelkopf RL agent')
+    parser.add_argument('--param', action='append', default=[],
+                        help="Search-space entry NAME=v1,v2 or NAME=uniform|loguniform|int:LOW:HIGH (repeatable)")
+    parser.add_argument('--space', type=str, default=None,
+                        help='JSON file mapping parameter names to value lists or {"loguniform": [low, high]}')
+    parser.add_argument('--samples', type=int, default=None,
+                        help='Random search with this many trials instead of the full grid')
+    parser.add_argument('--episodes', type=int, default=5000,
+                        help='Training episodes per trial (default: 5000)')
+    parser.add_argument('--eval-interval', type=int, default=500,
+                        help='Evaluate every N episodes (default: 500)')
+    parser.add_argument('--eval-deals', type=int, default=50,
+                        help='Duplicate deals per evaluation (default: 50)')
+    parser.add_argument('--sweep-dir', type=str, default='models/sweep',
+                        help='Directory for the trial runs and results (default: models/sweep)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Trials run at once (default: number of CPUs / threads)')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='torch CPU threads per trial (default: 1)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the search, the trials and the evaluation deals (default: 0)')
+    parser.add_argument('--min-win-rate', type=float, default=None,
+                        help='Stop trials whose evaluation win rate falls below this value')
+    parser.add_argument('--median-min-trials', type=int, default=3,
+                        help='Stop trials below the median once this many others reported at the same episode; '
+                             '0 disables it (default: 3)')
+    return parser.parse_args()
+
+def main():
+    """Main function to run the sweep."""
+    args = parse_arguments()
+
+    os.makedirs('logs', exist_ok=True)
+    logger.setup_logger('logs')
+
+    space = {}
+    if args.space:
+        with open(args.space) as f:
+            space.update(json.load(f))
+    space.update(parse_param(text) for text in args.param)
+    if not space:
+        raise SystemExit("Empty search space; use --param or --space")
+    unknown = set(space) - set(SWEEPABLE_PARAMS)
+    if unknown:
+        raise SystemExit(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+    trials = random_trials(space, args.samples, args.seed) if args.samples else grid_trials(space)
+    rows = run_sweep(trials, args.sweep_dir, args.episodes, args.eval_interval, args.eval_deals,
+                     args.workers, args.threads, args.seed, args.min_win_rate, args.median_min_trials)
+    print(format_results(rows))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Round-robin checkpoint tournament for Doppelkopf agents.
+Saved models are loaded as inference-only policies and every pair plays a match on seeded
+duplicate deals: each deal is replayed with the two players in all six seatings of two seats
+each, so the cards cancel out. Matches run on a process pool, and Elo ratings are updated
+as results arrive and kept in a small SQLite database. Rerunning the tournament only plays
+the matches of checkpoints that were added since. The resumable checkpoints the trainer writes
+to the checkpoints/ subdirectory take part as well.
+"""
+
+import os
+import re
+import sys
+import glob
+import sqlite3
+import argparse
+import itertools
+import torch
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+
+import src.backend.utils.logger as logger
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.training.duplicate import generate_deals, play_deal
+from src.reinforcementlearning.training.checkpoint import load_policy_state_dict
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+
+# Name of the random reference player
+RANDOM_PLAYER = 'random'
+
+# Rating of a player before its first match
+INITIAL_RATING = 1000.0
+
+# Seats of player A in the six seatings of a duplicate deal; player B takes the other two
+SEATINGS = list(itertools.combinations(range(4), 2))
+
+# Database file inside the checkpoint directory
+DEFAULT_DB_NAME = "tournament.sqlite"
+
+# Subdirectory of the resumable training checkpoints, as written by the trainer
+RESUMABLE_SUBDIR = "checkpoints"
+
+# Policies loaded once per worker process, keyed by path
+_worker_policies = {}
+
+def discover_checkpoints(checkpoint_dir: str, pattern: str = "*.pt",
+                         include_resumable: bool = True) -> List[Tuple[str, str]]:
+    """
+    Find the saved models of a directory.
+
+    Args:
+        checkpoint_dir: Directory containing models saved by RLAgent.save
+        pattern: Glob pattern of the model files
+        include_resumable: Whether to add the resumable checkpoints in its checkpoints/ subdirectory
+
+    Returns:
+        List of (player name, path), ordered by the episode numbers in the names; resumable
+        checkpoints follow the models and are named after their path relative to checkpoint_dir
+    """
+    def natural_key(path):
+        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', os.path.basename(path))]
+
+    paths = sorted(glob.glob(os.path.join(checkpoint_dir, pattern)), key=natural_key)
+    if include_resumable:
+        paths += sorted(glob.glob(os.path.join(checkpoint_dir, RESUMABLE_SUBDIR, pattern)), key=natural_key)
+    return [(os.path.splitext(os.path.relpath(path, checkpoint_dir))[0].replace(os.sep, '/'), path)
+            for path in paths]
+
+def load_frozen_policy(path: str):
+    """
+    Load a model as an inference-only policy.
+
+    Args:
+        path: A model saved by RLAgent.save, or a resumable training checkpoint
+
+    Returns:
+        A FrozenPolicy
+    """
+    from src.reinforcementlearning.training.league import FrozenPolicy
+    from src.reinforcementlearning.agents.q_cache import QValueCache
+    from src.reinforcementlearning.agents.rl_agent import network_from_state_dict
+
+    state_dict = load_policy_state_dict(path)
+    _, output_size = network_from_state_dict(state_dict)
+    # Matches replay each deal with the seats rotated; cache the repeated decisions
+    return FrozenPolicy(state_dict, get_state_size(), output_size, get_action_size(), cache=QValueCache())
+
+def expected_score(rating_a: float, rating_b: float) -> float:
+    """
+    Get the expected Elo score of player A against player B.
+
+    Args:
+        rating_a: Rating of player A
+        rating_b: Rating of player B
+
+    Returns:
+        The expected score between 0 and 1
+    """
+    return 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
+
+class RatingStore:
+    """
+    SQLite database of the tournament's players, matches and ratings.
+
+    Only the main process writes to it; workers return match results.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open or create the database.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS players (
+                    name TEXT PRIMARY KEY,
+                    path TEXT,
+                    rating REAL NOT NULL,
+                    games INTEGER NOT NULL DEFAULT 0,
+                    added TEXT NOT NULL
+                )""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS matches (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_a TEXT NOT NULL,
+                    player_b TEXT NOT NULL,
+                    seed INTEGER NOT NULL,
+                    deals INTEGER NOT NULL,
+                    wins INTEGER NOT NULL,
+                    draws INTEGER NOT NULL,
+                    losses INTEGER NOT NULL,
+                    point_diff REAL NOT NULL,
+                    played TEXT NOT NULL,
+                    UNIQUE (player_a, player_b, seed, deals)
+                )""")
+
+    def add_player(self, name: str, path: Optional[str]) -> bool:
+        """
+        Register a player if it is new.
+
+        Args:
+            name: Player name
+            path: Model path (None for the random player)
+
+        Returns:
+            True if the player was added
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO players (name, path, rating, added) VALUES (?, ?, ?, ?)",
+                (name, path, INITIAL_RATING, datetime.now().isoformat(timespec='seconds')))
+        return cursor.rowcount > 0
+
+    def has_match(self, player_a: str, player_b: str, seed: int, deals: int) -> bool:
+        """Check whether two players already played a match on this deal set."""
+        row = self.conn.execute(
+            "SELECT 1 FROM matches WHERE seed = ? AND deals = ? AND "
+            "((player_a = ? AND player_b = ?) OR (player_a = ? AND player_b = ?))",
+            (seed, deals, player_a, player_b, player_b, player_a)).fetchone()
+        return row is not None
+
+    def rating(self, name: str) -> float:
+        """Get the current rating of a player."""
+        return self.conn.execute("SELECT rating FROM players WHERE name = ?", (name,)).fetchone()['rating']
+
+    def record_match(self, result: Dict, k_factor: float) -> Tuple[float, float]:
+        """
+        Store a match result and update both players' Elo ratings.
+
+        Every deal counts as one game: the rating change is k_factor times the difference
+        between the deals won (draws count half) and the expected number.
+
+        Args:
+            result: Match result returned by play_match
+            k_factor: Elo K-factor per deal
+
+        Returns:
+            The new ratings of player A and player B
+        """
+        player_a, player_b = result['player_a'], result['player_b']
+        rating_a, rating_b = self.rating(player_a), self.rating(player_b)
+        score = result['wins'] + 0.5 * result['draws']
+        delta = k_factor * (score - result['deals'] * expected_score(rating_a, rating_b))
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO matches (player_a, player_b, seed, deals, wins, draws, losses, point_diff, played) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (player_a, player_b, result['seed'], result['deals'], result['wins'], result['draws'],
+                 result['losses'], result['point_diff'], datetime.now().isoformat(timespec='seconds')))
+            for name, change in ((player_a, delta), (player_b, -delta)):
+                self.conn.execute("UPDATE players SET rating = rating + ?, games = games + ? WHERE name = ?",
+                                  (change, result['deals'], name))
+        return rating_a + delta, rating_b - delta
+
+    def ratings(self) -> List[Dict]:
+        """Get all players, best rating first."""
+        rows = self.conn.execute("SELECT name, path, rating, games FROM players ORDER BY rating DESC").fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        """Close the database."""
+        self.conn.close()
+
+def _policy(spec: str):
+    """Get the policy of a player, loading it once per worker process."""
+    if spec == RANDOM_PLAYER:
+        return select_random_action
+    if spec not in _worker_policies:
+        _worker_policies[spec] = load_frozen_policy(spec)
+    return _worker_policies[spec]
+
+def _init_worker():
+    """Use one thread per worker process."""
+    torch.set_num_threads(1)
+
+def play_match(job: Dict) -> Dict:
+    """
+    Play a duplicate match between two players (runs in a worker process).
+
+    Every deal is played in all six seatings; the deal goes to the player whose seats
+    collected more game points over the six games.
+
+    Args:
+        job: Dictionary with the player names and specs ('random' or a model path), seed and number of deals
+
+    Returns:
+        The match result with deals won, drawn and lost by player A and A's mean point difference per deal
+    """
+    policy_a, policy_b = _policy(job['spec_a']), _policy(job['spec_b'])
+    wins = draws = losses = 0
+    total_diff = 0.0
+    for deal_idx, deal in enumerate(generate_deals(job['deals'], job['seed'])):
+        deal_diff = 0
+        for seating_idx, seats_a in enumerate(SEATINGS):
+            seat_policies = [policy_a if seat in seats_a else policy_b for seat in range(4)]
+            game = play_deal(deal, seat_policies, job['seed'] * 1000003 + deal_idx * len(SEATINGS) + seating_idx)
+            points = game.state['player_game_points']
+            deal_diff += sum(points[seat] if seat in seats_a else -points[seat] for seat in range(4))
+        total_diff += deal_diff
+        if deal_diff > 0:
+            wins += 1
+        elif deal_diff < 0:
+            losses += 1
+        else:
+            draws += 1
+
+    return {
+        'player_a': job['player_a'],
+        'player_b': job['player_b'],
+        'seed': job['seed'],
+        'deals': job['deals'],
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'point_diff': total_diff / max(job['deals'], 1)
+    }
+
+def schedule_matches(store: RatingStore, players: List[Tuple[str, str]], deals: int, seed: int) -> List[Dict]:
+    """
+    Get the round-robin matches that have not been played yet.
+
+    Args:
+        store: The rating database
+        players: List of (player name, spec)
+        deals: Deals per match
+        seed: Seed of the deal set
+
+    Returns:
+        Jobs for play_match
+    """
+    return [{
+        'player_a': name_a, 'spec_a': spec_a, 'player_b': name_b, 'spec_b': spec_b,
+        'seed': seed, 'deals': deals
+    } for (name_a, spec_a), (name_b, spec_b) in itertools.combinations(players, 2)
+        if not store.has_match(name_a, name_b, seed, deals)]
+
+def run_tournament(checkpoint_dir: str, db_path: Optional[str] = None, deals: int = 50, seed: int = 0,
+                   workers: Optional[int] = None, include_random: bool = True, k_factor: float = 4.0,
+                   pattern: str = "*.pt", include_resumable: bool = True) -> List[Dict]:
+    """
+    Add new checkpoints to the tournament and play their missing matches.
+
+    Args:
+        checkpoint_dir: Directory containing models saved by RLAgent.save
+        db_path: Path of the rating database (default: tournament.sqlite in checkpoint_dir)
+        deals: Deals per match (each is played in six seatings)
+        seed: Seed of the deal set
+        workers: Number of worker processes (default: number of CPUs)
+        include_random: Whether the random player takes part as a reference
+        k_factor: Elo K-factor per deal
+        pattern: Glob pattern of the model files
+        include_resumable: Whether the resumable checkpoints in checkpoints/ take part
+
+    Returns:
+        The ratings, best first
+    """
+    store = RatingStore(db_path or os.path.join(checkpoint_dir, DEFAULT_DB_NAME))
+    try:
+        players = [(RANDOM_PLAYER, RANDOM_PLAYER)] if include_random else []
+        players += discover_checkpoints(checkpoint_dir, pattern, include_resumable)
+        for name, spec in players:
+            if store.add_player(name, None if spec == RANDOM_PLAYER else spec):
+                logger.info(f"Added {name} to the tournament")
+
+        jobs = schedule_matches(store, players, deals, seed)
+        logger.info(f"Playing {len(jobs)} new matches of {deals} deals between {len(players)} players")
+        if jobs:
+            workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                # Elo updates depend on their order, so the results are recorded in schedule order
+                # however the matches finish; the ratings are then reproducible for a deal set
+                for result in executor.map(play_match, jobs):
+                    rating_a, rating_b = store.record_match(result, k_factor)
+                    logger.info(f"{result['player_a']} vs {result['player_b']}: "
+                                f"{result['wins']}-{result['draws']}-{result['losses']} "
+                                f"-> {rating_a:.0f} / {rating_b:.0f}")
+        return store.ratings()
+    finally:
+        store.close()
+
+def promote_best(ratings: List[Dict], target_path: str, min_games: int = 0) -> Optional[Dict]:
+    """
+    Copy the best-rated model to a target path (e.g. the model the web server loads).
+
+    The policy network is written to a temporary name first and then renamed, so a reader
+    never sees a partially written model; of a resumable checkpoint only the network is kept.
+    Models whose file was removed since they were rated (e.g. rotated checkpoints) are skipped.
+
+    Args:
+        ratings: Ratings returned by run_tournament
+        target_path: Path to write the model to
+        min_games: Minimum number of games a model needs to be promoted
+
+    Returns:
+        The promoted player, or None if no model qualifies
+    """
+    candidates = [r for r in ratings if r['path'] and r['games'] >= min_games and os.path.exists(r['path'])]
+    if not candidates:
+        return None
+    best = max(candidates, key=lambda r: r['rating'])
+    target_dir = os.path.dirname(target_path)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+    torch.save(load_policy_state_dict(best['path']), f"{target_path}.tmp")
+    os.replace(f"{target_path}.tmp", target_path)
+    return best
+
+def format_ratings(ratings: List[Dict]) -> str:
+    """Format the ratings as a table."""
+    lines = [f"{'Rank':>4}  {'Player':<32} {'Rating':>8} {'Games':>7}"]
+    for rank, r in enumerate(ratings, 1):
+        lines.append(f"{rank:>4}  {r['name']:<32} {r['rating']:>8.1f} {r['games']:>7}")
+    return "\n".join(lines)
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Rate saved Doppelkopf models in a round-robin tournament')
+    parser.add_argument('--checkpoint-dir', type=str, required=True,
+                        help='Directory with the saved models, e.g. models/training')
+    parser.add_argument('--db', type=str, default=None,
+                        help=f'Rating database (default: <checkpoint-dir>/{DEFAULT_DB_NAME})')
+    parser.add_argument('--pattern', type=str, default='*.pt',
+                        help='Glob pattern of the model files (default: *.pt)')
+    parser.add_argument('--deals', type=int, default=50,
+                        help='Deals per match; each is played in six seatings (default: 50)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the deal set (default: 0)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--k-factor', type=float, default=4.0,
+                        help='Elo K-factor per deal (default: 4)')
+    parser.add_argument('--no-resumable', action='store_true',
+                        help=f'Do not rate the resumable checkpoints in <checkpoint-dir>/{RESUMABLE_SUBDIR}')
+    parser.add_argument('--no-random', action='store_true',
+                        help='Do not include the random player as a reference')
+    parser.add_argument('--promote', type=str, default=None,
+                        help='Copy the best-rated model to this path, e.g. models/final_model.pt')
+    parser.add_argument('--min-games', type=int, default=0,
+                        help='Minimum number of games for a model to be promoted (default: 0)')
+    return parser.parse_args()
+
+def main():
+    """Main function to run the tournament."""
+    args = parse_arguments()
+
+    os.makedirs('logs', exist_ok=True)
+    logger.setup_logger('logs')
+
+    ratings = run_tournament(args.checkpoint_dir, args.db, args.deals, args.seed, args.workers,
+                             not args.no_random, args.k_factor, args.pattern, not args.no_resumable)
+    print(format_ratings(ratings))
+
+    if args.promote:
+        best = promote_best(ratings, args.promote, args.min_games)
+        if best:
+            print(f"Promoted {best['name']} ({best['rating']:.1f}) to {args.promote}")
+        else:
+            print("No model qualifies for promotion")
+
+if __name__ == "__main__":
+    main()
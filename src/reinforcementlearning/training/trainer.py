@@ -7,6 +7,8 @@ It supports training for card playing, making Re/Contra announcements, and selec
 import os
 import sys
 import time
+import logging
+import argparse
 import numpy as np
 from typing import List, Dict, Any, Tuple
 
@@ -15,8 +17,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 import src.backend.utils.logger as logger
 from src.backend.game.doppelkopf import TEAM_RE, TEAM_KONTRA
+from src.reinforcementlearning.training.checkpoint import (
+    CheckpointWriter, build_checkpoint, load_checkpoint, resolve_checkpoint_path
+)
+from src.reinforcementlearning.training.profiler import NULL_PROFILER, PhaseProfiler
+from src.reinforcementlearning.training.rewards import calculate_reward, end_game_reward
 
-def train(game, rl_agent, opponents, num_episodes: int, eval_interval: int, save_interval: int, model_dir: str):
+def train(game, rl_agent, opponents, num_episodes: int, eval_interval: int, save_interval: int, model_dir: str,
+          resume: str = None, checkpoint_interval: int = None, keep_checkpoints: int = 3, profiler=None,
+          recorder=None, log_interval: int = 100, fast_forward: bool = False):
     """
     Train the RL agent.
     
@@ -28,35 +37,82 @@ def train(game, rl_agent, opponents, num_episodes: int, eval_interval: int, save
         eval_interval: Evaluate the agent every N episodes
         save_interval: Save the agent every N episodes
         model_dir: Directory to save models
+        resume: Checkpoint file or directory to resume from, or 'latest'
+        checkpoint_interval: Write a resumable checkpoint every N episodes (default: save_interval)
+        keep_checkpoints: Number of resumable checkpoints to keep
+        profiler: Optional PhaseProfiler to time the phases of the training loop
+        recorder: Optional DatasetRecorder that stores the RL agent's decisions
+        log_interval: Log a summary of the last N episodes every N episodes
+        fast_forward: Play the RL agent's forced moves without a decision (see play_episode)
+    
+    Returns:
+        Tuple of (the reward of every episode, whether the RL agent's team won each episode)
     """
     # Ensure we have the right number of opponents
     assert len(opponents) == game.num_players - 1, \
         f"Expected {game.num_players - 1} opponents, got {len(opponents)}"
     
-    logger.info(f"Starting training for {num_episodes} episodes")
+    os.makedirs(model_dir, exist_ok=True)
+    checkpoint_dir = os.path.join(model_dir, "checkpoints")
     
     # Training statistics
     episode_rewards = []
     episode_wins = []
+    start_episode = 1
+    
+    # Restore the full training state if resuming
+    if resume:
+        checkpoint_path = resolve_checkpoint_path(resume, checkpoint_dir)
+        if checkpoint_path:
+            bundle = load_checkpoint(checkpoint_path, rl_agent)
+            start_episode = bundle['episode'] + 1
+            episode_rewards = bundle['stats'].get('episode_rewards', [])
+            episode_wins = bundle['stats'].get('episode_wins', [])
+        else:
+            logger.warning(f"No checkpoint found for resume={resume}, starting from scratch")
+    
+    checkpoint_interval = checkpoint_interval or save_interval
+    checkpoint_writer = CheckpointWriter(checkpoint_dir, keep_last=keep_checkpoints)
     
-    for episode in range(1, num_episodes + 1):
+    # Share the profiler with the agent so its forward passes and updates are timed too
+    profiler = profiler or NULL_PROFILER
+    rl_agent.profiler = profiler
+    
+    logger.info("Starting training for episodes %d-%d", start_episode, num_episodes)
+    interval_start = time.time()
+    
+    for episode in range(start_episode, num_episodes + 1):
+        profiler.begin_episode(episode)
+        
         # Reset the game
-        game.reset()
+        with profiler.phase('engine_step'):
+            game.reset()
+        
+        # Let opponents that change between episodes (e.g. league seats) prepare
+        for opponent in opponents:
+            if hasattr(opponent, 'begin_episode'):
+                opponent.begin_episode(episode)
         
         # Play one episode
-        episode_reward, episode_win = play_episode(game, rl_agent, opponents)
+        episode_reward, episode_win = play_episode(game, rl_agent, opponents, profiler, recorder, fast_forward)
+        
+        for opponent in opponents:
+            if hasattr(opponent, 'end_episode'):
+                opponent.end_episode(episode_win)
         
         # Record statistics
         episode_rewards.append(episode_reward)
         episode_wins.append(episode_win)
         
-        # Log progress
-        if episode % 100 == 0:
-            avg_reward = np.mean(episode_rewards[-100:])
-            win_rate = np.mean(episode_wins[-100:])
-            logger.info(f"Episode {episode}/{num_episodes} - "
-                            f"Avg Reward: {avg_reward:.2f}, "
-                            f"Win Rate: {win_rate:.2f}")
+        # Log a summary of the last episodes instead of per-card lines
+        if episode % log_interval == 0:
+            with profiler.phase('logging'):
+                elapsed = time.time() - interval_start
+                interval_start = time.time()
+                logger.info("Episode %d/%d - Avg Reward: %.2f, Win Rate: %.2f, Epsilon: %.3f, Episodes/s: %.1f",
+                            episode, num_episodes, np.mean(episode_rewards[-log_interval:]),
+                            np.mean(episode_wins[-log_interval:]), rl_agent.epsilon,
+                            log_interval / max(elapsed, 1e-9))
         
         # Evaluate the agent
         if episode % eval_interval == 0:
@@ -66,76 +122,32 @@ def train(game, rl_agent, opponents, num_episodes: int, eval_interval: int, save
         if episode % save_interval == 0:
             model_path = os.path.join(model_dir, f"model_episode_{episode}.pt")
             rl_agent.save(model_path)
-            logger.info(f"Saved model to {model_path}")
-
-def calculate_reward(game, player_idx: int, action_type: str = 'card', announcement: str = None) -> float:
-    """
-    Calculate the reward for the given player.
-    
-    Args:
-        game: The game instance
-        player_idx: Index of the player
-        action_type: Type of action ('card', 'announce', or 'variant')
-        announcement: The announcement made ('re' or 'contra')
-        
-    Returns:
-        The reward value
-    """
-    # Basic reward structure
-    reward = 0
-    
-    # Get the player's team
-    player_team = game.teams[player_idx]
-    team_idx = 0 if player_team == TEAM_RE else 1
-    
-    # Reward for winning a trick (only applies to card actions)
-    if action_type == 'card' and game.trick_winner == player_idx:
-        # Simple reward for winning a trick
-        reward += 1.0
-    
-    # Reward for making announcements
-    if action_type == 'announce':
-        # Small immediate reward for making an announcement
-        reward += 1.0
+            logger.info("Saved model to %s", model_path)
         
-        # Additional reward based on the player's team
-        if (announcement == 're' and player_team == TEAM_RE) or \
-           (announcement == 'contra' and player_team == TEAM_KONTRA):
-            # Correct team announcement
-            reward += 1.0
-            
-        # Reward based on current score advantage
-        if game.scores[team_idx] > game.scores[1 - team_idx]:
-            # If player's team is ahead, announcing is good
-            reward += 1.0
-    
-    # Reward for selecting game variants
-    if action_type == 'variant':
-        # Small immediate reward for selecting a variant
-        reward += 0.5
-        
-        # We could add more sophisticated rewards based on the hand and variant
-        # For example, reward for selecting hochzeit when having both Queens of Clubs
-        if announcement == 'hochzeit' and hasattr(game, 'has_hochzeit') and game.has_hochzeit(player_idx):
-            reward += 2.0
-        
-        # Reward for selecting solo variants when appropriate
-        if announcement in ['queen_solo', 'jack_solo'] and player_idx == 0:
-            # Simple reward for selecting a solo variant
-            reward += 1.0
-    
-    # Continuous reward based on score difference
-    if hasattr(game, 'scores') and len(game.scores) == 2:
-        # Get the score difference between the player's team and the opponent team
-        score_diff = game.scores[team_idx] - game.scores[1 - team_idx]
+        # Queue a resumable checkpoint, including one of the final state; it is written on a background thread
+        if episode % checkpoint_interval == 0 or episode == num_episodes:
+            checkpoint_writer.save(build_checkpoint(rl_agent, episode, {
+                'episode_rewards': episode_rewards,
+                'episode_wins': episode_wins
+            }))
         
-        # Give a small continuous reward based on the score difference
-        # This encourages the agent to maximize the score difference throughout the game
-        reward += score_diff / 50.0  # Scale down to avoid overshadowing other rewards
+        profiler.end_episode(episode)
     
-    return reward
+    # Let opponents that keep state across episodes (e.g. league results) persist it
+    for opponent in opponents:
+        if hasattr(opponent, 'close'):
+            opponent.close()
+    
+    # Wait for the last checkpoint to reach the disk
+    checkpoint_writer.close()
+    profiler.close()
+    if recorder is not None:
+        recorder.close()
+    
+    return episode_rewards, episode_wins
 
-def play_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
+def play_episode(game, rl_agent, opponents, profiler=NULL_PROFILER, recorder=None,
+                 fast_forward: bool = False) -> Tuple[float, bool]:
     """
     Play one episode of the game.
     
@@ -143,6 +155,12 @@ def play_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
         game: The game instance
         rl_agent: The RL agent
         opponents: List of opponent agents
+        profiler: Profiler to time the phases of the episode
+        recorder: Optional DatasetRecorder that stores the RL agent's decisions, with
+            exploratory ones flagged as not greedy
+        fast_forward: Play the RL agent's forced moves (a single legal card and no announcement)
+            directly instead of storing them as decisions; their rewards are added to the
+            preceding decision
         
     Returns:
         Tuple of (total reward for the RL agent, whether the RL agent's team won)
@@ -153,54 +171,68 @@ def play_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
     # Track the total reward for the RL agent
     total_reward = 0
     
+    # Per-card tracing is only formatted when debug logging is enabled
+    trace = logger.is_enabled_for(logging.DEBUG)
+    
     # Add variant selection phase flag to the game
     game.variant_selection_phase = True
     
-    logger.info("Starting new episode - Variant selection phase")
+    if trace:
+        logger.debug("Starting new episode - Variant selection phase")
+    
+    # Collect the agent's transitions so the returns are computed at the end of the episode
+    rl_agent.begin_episode()
+    if recorder is not None:
+        recorder.begin_episode()
     
     # First, select game variant (only for player 0)
     if rl_player_idx == 0:
         # Get the current state
-        state = game.get_state_for_player(rl_player_idx)
+        with profiler.phase('get_state'):
+            state = game.get_state_for_player(rl_player_idx)
         
         # Select a variant action
-        action_result = rl_agent.select_action(game, rl_player_idx)
+        with profiler.phase('select_action'):
+            action_result = rl_agent.select_action(game, rl_player_idx)
+        # Exploratory actions are recorded, but not as imitation targets
+        explored = rl_agent.last_action_explored
         
         if action_result and action_result[0] == 'variant':
             action_type, variant = action_result
+            legal_mask = rl_agent.legal_action_mask(game, rl_player_idx) if recorder is not None else None
             
-            # Set the game variant
-            from src.backend.game.doppelkopf import VARIANT_NORMAL, VARIANT_HOCHZEIT, VARIANT_QUEEN_SOLO, VARIANT_JACK_SOLO, VARIANT_FLESHLESS
-            if variant == 'normal':
-                game.game_variant = VARIANT_NORMAL
-            elif variant == 'hochzeit':
-                game.game_variant = VARIANT_HOCHZEIT
-            elif variant == 'queen_solo':
-                game.game_variant = VARIANT_QUEEN_SOLO
-            elif variant == 'jack_solo':
-                game.game_variant = VARIANT_JACK_SOLO
-            elif variant == 'fleshless':
-                game.game_variant = VARIANT_FLESHLESS
+            # Use the set_variant method to properly update the game state
+            with profiler.phase('engine_step'):
+                game.set_variant(variant, rl_player_idx)
             
             # Get the next state
-            next_state = game.get_state_for_player(rl_player_idx)
+            with profiler.phase('get_state'):
+                next_state = game.get_state_for_player(rl_player_idx)
             
             # Calculate reward for variant selection
             reward = calculate_reward(game, rl_player_idx, 'variant', variant)
             
             # Observe the action and train
-            rl_agent.observe_action(state, variant, next_state, reward, 'variant')
-            rl_agent.train()
+            with profiler.phase('observe'):
+                rl_agent.observe_action(state, variant, next_state, reward, 'variant')
+            with profiler.phase('learn'):
+                rl_agent.train()
+            profiler.count('transitions')
+            if recorder is not None:
+                recorder.record(state, legal_mask, rl_agent.action_index(variant, 'variant'), reward, greedy=not explored)
             total_reward += reward
     
-    # End variant selection phase
-    game.variant_selection_phase = False
+    # Let all other players select a variant (they choose 'normal'); this ends the selection phase
+    with profiler.phase('engine_step'):
+        for i in range(1, game.num_players):
+            game.set_variant('normal', i)
     
     # Track announcements to avoid duplicates
     re_announced = False
     contra_announced = False
     
-    logger.info("Starting card play phase")
+    if trace:
+        logger.debug("Starting card play phase")
     
     # Play until the game is over
     trick_count = 0
@@ -210,16 +242,40 @@ def play_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
         current_player = game.current_player
         
         # Get the current state
-        state = game.get_state_for_player(current_player)
+        with profiler.phase('get_state'):
+            state = game.get_state_for_player(current_player)
         
         # Log current game state
         if len(game.current_trick) == 0:
             trick_count += 1
-            logger.info(f"Starting trick #{trick_count}")
+            if trace:
+                with profiler.phase('logging'):
+                    logger.debug("Starting trick #%d", trick_count)
+        
+        # Play a forced move of the RL agent without a decision
+        forced = None
+        if fast_forward and current_player == rl_player_idx:
+            forced = rl_agent.forced_action(game, current_player)
+        if forced is not None:
+            card_count += 1
+            if trace:
+                with profiler.phase('logging'):
+                    logger.debug("Player %d (RL agent) plays forced card #%d", current_player, card_count)
+            with profiler.phase('engine_step'):
+                game.play_card(current_player, forced[1])
+            reward = calculate_reward(game, current_player, 'card')
+            rl_agent.add_reward(reward)
+            if recorder is not None:
+                recorder.add_reward(reward)
+            profiler.count('forced_moves')
+            total_reward += reward
         
         # Select an action
-        if current_player == rl_player_idx:
-            action_result = rl_agent.select_action(game, current_player)
+        elif current_player == rl_player_idx:
+            with profiler.phase('select_action'):
+                action_result = rl_agent.select_action(game, current_player)
+            explored = rl_agent.last_action_explored
+            legal_mask = rl_agent.legal_action_mask(game, current_player) if recorder is not None else None
             
             # Handle different action types
             if action_result and isinstance(action_result, tuple) and len(action_result) == 2:
@@ -228,23 +284,32 @@ def play_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
                 if action_type == 'card':
                     # Log card play
                     card_count += 1
-                    logger.info(f"Player {current_player} (RL agent) plays card #{card_count}")
+                    if trace:
+                        with profiler.phase('logging'):
+                            logger.debug("Player %d (RL agent) plays card #%d", current_player, card_count)
                     
                     # Play the card
-                    game.play_card(current_player, action)
+                    with profiler.phase('engine_step'):
+                        game.play_card(current_player, action)
                     
                     # Convert the card to an action index for the RL agent
                     action_idx = game.card_to_idx(action)
                     
                     # Get the next state
-                    next_state = game.get_state_for_player(current_player)
+                    with profiler.phase('get_state'):
+                        next_state = game.get_state_for_player(current_player)
                     
                     # Calculate reward for playing a card
                     reward = calculate_reward(game, current_player, 'card')
                     
                     # Observe the action and train
-                    rl_agent.observe_action(state, action_idx, next_state, reward, 'card')
-                    rl_agent.train()
+                    with profiler.phase('observe'):
+                        rl_agent.observe_action(state, action_idx, next_state, reward, 'card')
+                    with profiler.phase('learn'):
+                        rl_agent.train()
+                    profiler.count('transitions')
+                    if recorder is not None:
+                        recorder.record(state, legal_mask, action_idx, reward, greedy=not explored)
                     total_reward += reward
                 
                 elif action_type == 'announce':
@@ -261,8 +326,13 @@ def play_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
                         reward = calculate_reward(game, current_player, 'announce', 're')
                         
                         # Observe the action and train
-                        rl_agent.observe_action(state, 're', next_state, reward, 'announce')
-                        rl_agent.train()
+                        with profiler.phase('observe'):
+                            rl_agent.observe_action(state, 're', next_state, reward, 'announce')
+                        with profiler.phase('learn'):
+                            rl_agent.train()
+                        profiler.count('transitions')
+                        if recorder is not None:
+                            recorder.record(state, legal_mask, rl_agent.action_index('re', 'announce'), reward, greedy=not explored)
                         total_reward += reward
                     
                     elif action == 'contra' and not contra_announced:
@@ -277,46 +347,46 @@ def play_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
                         reward = calculate_reward(game, current_player, 'announce', 'contra')
                         
                         # Observe the action and train
-                        rl_agent.observe_action(state, 'contra', next_state, reward, 'announce')
-                        rl_agent.train()
+                        with profiler.phase('observe'):
+                            rl_agent.observe_action(state, 'contra', next_state, reward, 'announce')
+                        with profiler.phase('learn'):
+                            rl_agent.train()
+                        profiler.count('transitions')
+                        if recorder is not None:
+                            recorder.record(state, legal_mask, rl_agent.action_index('contra', 'announce'), reward, greedy=not explored)
                         total_reward += reward
             
         else:
             # Opponent's turn - they only play cards, no announcements
             opponent_idx = current_player - 1  # Adjust for the RL agent
-            action = select_opponent_action(opponents[opponent_idx], game, current_player)
+            with profiler.phase('opponent'):
+                action = select_opponent_action(opponents[opponent_idx], game, current_player)
             
             # Log card play
             card_count += 1
-            logger.info(f"Player {current_player} (AI opponent) plays card #{card_count}")
+            if trace:
+                with profiler.phase('logging'):
+                    logger.debug("Player %d (AI opponent) plays card #%d", current_player, card_count)
             
             # Play the card
-            game.play_card(current_player, action)
+            with profiler.phase('engine_step'):
+                game.play_card(current_player, action)
     
-    # Check if the RL agent's team won
-    rl_team = game.teams[rl_player_idx]
-    win = game.winner == rl_team
+    # End-game reward from the score difference and whether the RL agent's team won
+    final_reward, win, score_diff = end_game_reward(game, rl_player_idx)
+    total_reward += final_reward
     
-    # Get the player's team index
-    team_idx = 0 if rl_team == TEAM_RE else 1
-    
-    # Calculate score difference
-    score_diff = game.scores[team_idx] - game.scores[1 - team_idx]
-    
-    # Add a reward based on score difference
-    # This encourages maximizing the score difference, not just winning
-    score_reward = score_diff / 10.0  # Scale appropriately
-    
-    # Still give a bonus for winning, but make it smaller compared to score difference
-    win_bonus = 5 if win else -5
-    
-    # Total end-game reward
-    end_game_reward = score_reward + win_bonus
-    total_reward += end_game_reward
+    # Write the episode's transitions, with the end-game reward on the last one
+    with profiler.phase('observe'):
+        rl_agent.end_episode(final_reward)
+    if recorder is not None:
+        recorder.end_episode(final_reward)
     
     # Log game end
     winner_team = "RE" if win else "KONTRA"
-    logger.info(f"Game over! {winner_team} team wins with score {score_diff}. RL agent reward: {total_reward:.2f}")
+    if trace:
+        logger.debug("Game over! %s team wins with score %d. RL agent reward: %.2f",
+                     winner_team, score_diff, total_reward)
     
     return total_reward, win
 
@@ -368,25 +438,16 @@ def play_evaluation_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
         if action_result and action_result[0] == 'variant':
             action_type, variant = action_result
             
-            # Set the game variant
-            from src.backend.game.doppelkopf import VARIANT_NORMAL, VARIANT_HOCHZEIT, VARIANT_QUEEN_SOLO, VARIANT_JACK_SOLO, VARIANT_FLESHLESS
-            if variant == 'normal':
-                game.game_variant = VARIANT_NORMAL
-            elif variant == 'hochzeit':
-                game.game_variant = VARIANT_HOCHZEIT
-            elif variant == 'queen_solo':
-                game.game_variant = VARIANT_QUEEN_SOLO
-            elif variant == 'jack_solo':
-                game.game_variant = VARIANT_JACK_SOLO
-            elif variant == 'fleshless':
-                game.game_variant = VARIANT_FLESHLESS
+            # Use the set_variant method to properly update the game state
+            game.set_variant(variant, rl_player_idx)
             
             # Calculate reward for variant selection
             reward = calculate_reward(game, rl_player_idx, 'variant', variant)
             total_reward += reward
     
-    # End variant selection phase
-    game.variant_selection_phase = False
+    # Let all other players select a variant (they choose 'normal'); this ends the selection phase
+    for i in range(1, game.num_players):
+        game.set_variant('normal', i)
     
     # Track announcements to avoid duplicates
     re_announced = False
@@ -440,26 +501,9 @@ def play_evaluation_episode(game, rl_agent, opponents) -> Tuple[float, bool]:
             # Play the card
             game.play_card(current_player, action)
     
-    # Check if the RL agent's team won
-    rl_team = game.teams[rl_player_idx]
-    win = game.winner == rl_team
-    
-    # Get the player's team index
-    team_idx = 0 if rl_team == TEAM_RE else 1
-    
-    # Calculate score difference
-    score_diff = game.scores[team_idx] - game.scores[1 - team_idx]
-    
-    # Add a reward based on score difference
-    # This encourages maximizing the score difference, not just winning
-    score_reward = score_diff / 10.0  # Scale appropriately
-    
-    # Still give a bonus for winning, but make it smaller compared to score difference
-    win_bonus = 5 if win else -5
-    
-    # Total end-game reward
-    end_game_reward = score_reward + win_bonus
-    total_reward += end_game_reward
+    # End-game reward from the score difference and whether the RL agent's team won
+    final_reward, win, score_diff = end_game_reward(game, rl_player_idx)
+    total_reward += final_reward
     
     return total_reward, win
 
@@ -503,3 +547,97 @@ def evaluate(game, rl_agent, opponents, num_episodes: int):
     avg_reward = np.mean(eval_rewards)
     win_rate = np.mean(eval_wins)
     logger.info(f"Evaluation - Avg Reward: {avg_reward:.2f}, Win Rate: {win_rate:.2f}")
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Train a Doppelkopf RL agent against random opponents')
+    parser.add_argument('--episodes', type=int, default=10000,
+                        help='Number of episodes to train for (default: 10000)')
+    parser.add_argument('--eval-interval', type=int, default=1000,
+                        help='Evaluate the agent every N episodes (default: 1000)')
+    parser.add_argument('--save-interval', type=int, default=1000,
+                        help='Save the agent every N episodes (default: 1000)')
+    parser.add_argument('--model-dir', type=str, default='models/training',
+                        help='Directory to save models (default: models/training)')
+    parser.add_argument('--resume', type=str, default=None,
+                        help="Resume from a checkpoint file or directory, or 'latest' in <model-dir>/checkpoints")
+    parser.add_argument('--checkpoint-interval', type=int, default=None,
+                        help='Write a resumable checkpoint every N episodes (default: same as --save-interval)')
+    parser.add_argument('--keep-checkpoints', type=int, default=3,
+                        help='Number of resumable checkpoints to keep (default: 3)')
+    parser.add_argument('--league-dir', type=str, default=None,
+                        help='Train against a self-play league whose snapshot pool is stored in this directory')
+    parser.add_argument('--league-interval', type=int, default=1000,
+                        help='Add a snapshot of the agent to the league every N episodes (default: 1000)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Log a per-phase timing breakdown of the training loop')
+    parser.add_argument('--profile-interval', type=int, default=100,
+                        help='Log the timing breakdown every N episodes (default: 100)')
+    parser.add_argument('--cprofile-episodes', type=str, default=None,
+                        help='Run cProfile for an episode range FIRST-LAST, e.g. 200-220')
+    parser.add_argument('--cprofile-output', type=str, default='training.prof',
+                        help='File to write the cProfile stats to (default: training.prof)')
+    parser.add_argument('--augment', action='store_true',
+                        help='Train on random suit-symmetric equivalents of the sampled transitions')
+    parser.add_argument('--network', type=str, default='mlp', choices=['mlp', 'card_embedding'],
+                        help='Q-network architecture (default: mlp)')
+    parser.add_argument('--n-step', type=int, default=1,
+                        help='Number of rewards summed per replay transition (default: 1)')
+    parser.add_argument('--td-lambda', type=float, default=None,
+                        help='Store lambda-returns with this lambda instead of n-step returns')
+    parser.add_argument('--init-model', type=str, default=None,
+                        help='Start from a saved model, e.g. one pretrained by behavior cloning')
+    parser.add_argument('--log-interval', type=int, default=100,
+                        help='Log a summary every N episodes (default: 100)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Trace every trick and card in the log (slow)')
+    parser.add_argument('--fast-forward', action='store_true',
+                        help="Play the agent's forced moves without storing them as decisions")
+    parser.add_argument('--record-dir', type=str, default=None,
+                        help="Record the RL agent's decisions into a memory-mapped dataset in this directory")
+    return parser.parse_args()
+
+def main():
+    """Main function to run the training."""
+    from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+    from src.reinforcementlearning.agents.rl_agent import RLAgent
+    from src.reinforcementlearning.agents.random_agent import select_random_action
+    
+    args = parse_arguments()
+    
+    # Initialize logger
+    os.makedirs('logs', exist_ok=True)
+    logger.setup_logger('logs', level=logging.DEBUG if args.verbose else logging.INFO)
+    
+    game = DoppelkopfGame()
+    rl_agent = RLAgent(game.get_state_size(), game.get_action_size(), augment=args.augment,
+                       network=args.network, n_step=args.n_step, td_lambda=args.td_lambda)
+    if args.init_model:
+        rl_agent.load(args.init_model)
+    opponents = [select_random_action] * (game.num_players - 1)
+    if args.league_dir:
+        from src.reinforcementlearning.training.league import League
+        league = League(rl_agent, args.league_dir, snapshot_interval=args.league_interval)
+        opponents = league.seats(game.num_players - 1)
+    
+    recorder = None
+    if args.record_dir:
+        from src.reinforcementlearning.training.recorder import DatasetRecorder
+        recorder = DatasetRecorder(args.record_dir, rl_agent.state_size, rl_agent.total_action_size,
+                                   metadata={'source': 'trainer'})
+    
+    profiler = None
+    if args.profile or args.cprofile_episodes:
+        cprofile_episodes = None
+        if args.cprofile_episodes:
+            first, _, last = args.cprofile_episodes.partition('-')
+            cprofile_episodes = (int(first), int(last or first))
+        profiler = PhaseProfiler(args.profile_interval, cprofile_episodes, args.cprofile_output)
+    
+    train(game, rl_agent, opponents, args.episodes, args.eval_interval, args.save_interval, args.model_dir,
+          resume=args.resume, checkpoint_interval=args.checkpoint_interval,
+          keep_checkpoints=args.keep_checkpoints, profiler=profiler, recorder=recorder,
+          log_interval=args.log_interval, fast_forward=args.fast_forward)
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,29 @@ from tests.test_card_giver_turn import test_player_turn_after_card_dealing
 
 # Import unittest-based test modules
 from tests.test_play_with_trained_model import TestPlayWithTrainedModel
+from tests.test_checkpoint import TestCheckpoint
+from tests.test_duplicate import TestDuplicate
+from tests.test_profiler import TestProfiler
+from tests.test_augmentation import TestAugmentation
+from tests.test_recorder import TestRecorder
+from tests.test_behavior_cloning import TestBehaviorCloning
+from tests.test_packing import TestPacking
+from tests.test_card_embedding import TestCardEmbedding
+from tests.test_returns import TestReturns
+from tests.test_sweep import TestSweep
+from tests.test_tournament import TestTournament
+from tests.test_driver import TestDriver
+from tests.test_model_registry import TestModelRegistry
+from tests.test_inference_policy import TestInferencePolicy
+from tests.test_inference_service import TestInferenceService
+from tests.test_game_state_view import TestGameStateView
+from tests.test_export import TestExport
+from tests.test_q_cache import TestQValueCache
+from tests.test_seat_policies import TestSeatPolicies
+from tests.test_anytime_policy import TestAnytimePolicy
+from tests.test_ai_workers import TestAIWorkers
+from tests.test_league import TestLeague
+from tests.test_logger import TestLogger
 
 def run_legacy_tests():
     """Run the legacy function-based tests."""
@@ -65,6 +88,29 @@ def run_unittest_tests():
     
     # Add the test cases
     suite.addTest(loader.loadTestsFromTestCase(TestPlayWithTrainedModel))
+    suite.addTest(loader.loadTestsFromTestCase(TestCheckpoint))
+    suite.addTest(loader.loadTestsFromTestCase(TestDuplicate))
+    suite.addTest(loader.loadTestsFromTestCase(TestProfiler))
+    suite.addTest(loader.loadTestsFromTestCase(TestAugmentation))
+    suite.addTest(loader.loadTestsFromTestCase(TestRecorder))
+    suite.addTest(loader.loadTestsFromTestCase(TestBehaviorCloning))
+    suite.addTest(loader.loadTestsFromTestCase(TestPacking))
+    suite.addTest(loader.loadTestsFromTestCase(TestCardEmbedding))
+    suite.addTest(loader.loadTestsFromTestCase(TestReturns))
+    suite.addTest(loader.loadTestsFromTestCase(TestSweep))
+    suite.addTest(loader.loadTestsFromTestCase(TestTournament))
+    suite.addTest(loader.loadTestsFromTestCase(TestDriver))
+    suite.addTest(loader.loadTestsFromTestCase(TestModelRegistry))
+    suite.addTest(loader.loadTestsFromTestCase(TestInferencePolicy))
+    suite.addTest(loader.loadTestsFromTestCase(TestInferenceService))
+    suite.addTest(loader.loadTestsFromTestCase(TestGameStateView))
+    suite.addTest(loader.loadTestsFromTestCase(TestExport))
+    suite.addTest(loader.loadTestsFromTestCase(TestQValueCache))
+    suite.addTest(loader.loadTestsFromTestCase(TestSeatPolicies))
+    suite.addTest(loader.loadTestsFromTestCase(TestAnytimePolicy))
+    suite.addTest(loader.loadTestsFromTestCase(TestAIWorkers))
+    suite.addTest(loader.loadTestsFromTestCase(TestLeague))
+    suite.addTest(loader.loadTestsFromTestCase(TestLogger))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the AI worker pool of the web server.
+These tests verify that the AI tasks of one game run in order and one at a time, that games
+run in parallel, and that decisions in worker processes play legal cards with the checkpoint
+version their game is pinned to.
+"""
+
+import os
+import sys
+import copy
+import time
+import tempfile
+import threading
+import unittest
+
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backend.ai_workers import AIWorkerPool
+from src.backend.model_registry import ModelRegistry
+from src.backend.game.doppelkopf import create_game_state, set_variant, get_legal_actions, card_to_idx, play_card
+from src.reinforcementlearning.agents.heuristic_agent import select_heuristic_action
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+
+class TestAIWorkers(unittest.TestCase):
+    """Test case for the AI worker pool."""
+
+    def test_per_game_order(self):
+        """Test that one game's tasks run in order, one at a time, while another game runs alongside."""
+        pool = AIWorkerPool(num_workers=2)
+        events = []
+        release = threading.Event()
+
+        def task(name, wait=False):
+            events.append(('start', name))
+            if wait:
+                release.wait(5)
+            events.append(('end', name))
+
+        first = pool.submit('a', task, 'a1', True)
+        second = pool.submit('a', task, 'a2')
+        other = pool.submit('b', task, 'b1')
+        other.result(5)
+        self.assertTrue(pool.busy('a'))
+        self.assertFalse(pool.busy('b'))
+        self.assertNotIn(('start', 'a2'), events)
+
+        release.set()
+        first.result(5)
+        second.result(5)
+        a_events = [event for event in events if event[1].startswith('a')]
+        self.assertEqual(a_events, [('start', 'a1'), ('end', 'a1'), ('start', 'a2'), ('end', 'a2')])
+        # The game is no longer busy once its last task has returned
+        deadline = time.time() + 5
+        while pool.busy('a') and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(pool.busy('a'))
+        self.assertEqual(pool.stats()['completed'], 3)
+        pool.shutdown()
+
+    def test_failed_task_keeps_queue_running(self):
+        """Test that a failing task does not block the game's later tasks."""
+        pool = AIWorkerPool(num_workers=1)
+        failed = pool.submit('a', lambda: 1 / 0)
+        done = pool.submit('a', lambda: 'done')
+        self.assertEqual(done.result(5), 'done')
+        self.assertIsInstance(failed.exception(5), ZeroDivisionError)
+        self.assertEqual(pool.stats()['failed'], 1)
+        pool.shutdown()
+
+    def test_process_decisions(self):
+        """Test that a decision process resolves the seat's spec and plays a legal card."""
+        game = create_game_state()
+        for i in range(4):
+            set_variant(game, 'normal', i)
+        player = game['current_player']
+        legal = [card_to_idx(card) for card in get_legal_actions(game, player)]
+
+        pool = AIWorkerPool(num_workers=1, mode='process')
+        action, search = pool.decide(None, 'heuristic', game, player)
+        self.assertEqual(card_to_idx(action), card_to_idx(select_heuristic_action(game, player)))
+        action, search = pool.decide(None, 'anytime:heuristic', game, player)
+        self.assertIn(card_to_idx(action), legal)
+        pool.shutdown()
+
+        with self.assertRaises(ValueError):
+            AIWorkerPool(mode='greenlet')
+
+    def test_process_decisions_keep_pinned_version(self):
+        """Test that a game keeps its checkpoint version in a decision process after a reload."""
+        # Positions of one game, one per trick card, to compare the two versions' choices on
+        game = create_game_state()
+        for i in range(4):
+            set_variant(game, 'normal', i)
+        positions = []
+        for _ in range(16):
+            player = game['current_player']
+            positions.append((copy.deepcopy(game), player))
+            play_card(game, player, select_heuristic_action(game, player))
+
+        with tempfile.TemporaryDirectory() as model_dir:
+            path = os.path.join(model_dir, 'model.pt')
+            torch.manual_seed(0)
+            RLAgent(161, 48).save(path)
+            registry = ModelRegistry(validator=None)
+            old = registry.policy(path)
+            pool = AIWorkerPool(num_workers=1, mode='process')
+
+            # Rewrite the checkpoint and reload it, as /admin/reload_model does
+            torch.manual_seed(1)
+            RLAgent(161, 48).save(path)
+            mtime = os.path.getmtime(path)
+            os.utime(path, (mtime + 10, mtime + 10))
+            new = registry.reload(path)
+            self.assertNotEqual(new.mtime, old.model.mtime)
+            new = registry.policy(path)
+
+            differ = False
+            for position, player in positions:
+                old_action, _ = pool.decide(old, f'rl:{path}', position, player)
+                new_action, _ = pool.decide(new, f'rl:{path}', position, player)
+                self.assertEqual(old_action, old.select_action(position, player))
+                self.assertEqual(new_action, new.select_action(position, player))
+                differ = differ or old_action != new_action
+            # An anytime seat searches with the same pinned version
+            position, player = positions[0]
+            action, search = pool.decide(old, f'anytime:rl:{path}', position, player)
+            self.assertIsNotNone(search)
+            pool.shutdown()
+        # The two versions must be told apart for the test to mean anything
+        self.assertTrue(differ)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the anytime search policy.
+These tests verify that the search stays within its time budget, falls back to the prior's
+move without time, and only deals cards the searching player has not seen.
+"""
+
+import os
+import sys
+import time
+import random
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.anytime_policy import AnytimePolicy, public_information
+from src.reinforcementlearning.agents.heuristic_agent import select_heuristic_action
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.backend.game.doppelkopf import card_to_idx, is_trump
+from src.backend.model_registry import ModelRegistry
+from src.backend.seat_policies import resolve_policy
+
+class TestAnytimePolicy(unittest.TestCase):
+    """Test case for the anytime search policy."""
+
+    def play_until(self, num_cards, seed=0):
+        """Create a normal game and play cards at random until num_cards are on the table."""
+        random.seed(seed)
+        game = DoppelkopfGame()
+        for i in range(game.num_players):
+            game.set_variant('normal', i)
+        for _ in range(num_cards):
+            game.play_card(game.current_player, random.choice(game.get_legal_actions(game.current_player)))
+        return game
+
+    def test_deadline_and_fallback(self):
+        """Test that the search returns a legal card within its budget, or the prior's card without one."""
+        game = self.play_until(6)
+        player = game.current_player
+        legal = [card_to_idx(card) for card in game.get_legal_actions(player)]
+
+        searcher = AnytimePolicy(lambda g, p: ('card', select_heuristic_action(g, p)), time_budget=0.05)
+        start = time.perf_counter()
+        action_type, card = searcher.select_action(game, player)
+        self.assertLess(time.perf_counter() - start, 0.15)
+        self.assertEqual(action_type, 'card')
+        self.assertIn(card_to_idx(card), legal)
+        if searcher.last_search is not None:
+            self.assertGreater(searcher.last_search['samples'], 0)
+
+        no_time = AnytimePolicy(select_heuristic_action, time_budget=0.0)
+        self.assertEqual(no_time.select_action(game, player), select_heuristic_action(game, player))
+
+    def test_public_information(self):
+        """Test that the unseen cards are the other hands and that known voids are real."""
+        for seed in range(5):
+            game = self.play_until(17, seed)
+            player = game.current_player
+            info = public_information(game.state, player)
+
+            others = sorted(card_to_idx(card) for p, hand in enumerate(game.hands) if p != player for card in hand)
+            self.assertEqual(sorted(card_to_idx(card) for card in info['unseen']), others)
+            for p, voids in enumerate(info['voids']):
+                for card in game.hands[p]:
+                    card_type = 'trump' if is_trump(card, game.game_variant) else card['suit']
+                    self.assertNotIn(card_type, voids)
+
+    def test_seat_spec(self):
+        """Test that an anytime seat spec wraps the named policy with the think time."""
+        factory = resolve_policy('anytime:heuristic', ModelRegistry(), think_time=0.2)
+        policy = factory()
+        self.assertIsInstance(policy, AnytimePolicy)
+        self.assertIs(policy.prior, select_heuristic_action)
+        self.assertEqual(policy.time_budget, 0.2)
+        self.assertIsNot(factory(), policy)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for suit-permutation data augmentation.
+These tests verify that an augmented transition is exactly the transition of the relabelled game.
+"""
+
+import os
+import sys
+import random
+import unittest
+
+import numpy as np
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.training.augmentation import SuitAugmentation, VARIANT_OFFSET
+from src.reinforcementlearning.training.duplicate import generate_deals
+from src.backend.game.doppelkopf import (
+    card_to_idx, idx_to_card, get_state_size, get_action_size, VARIANT_NORMAL, VARIANT_QUEEN_SOLO
+)
+
+def play_game(deal, variant, choose):
+    """Play a game and record (player, card index, state before) for every card."""
+    game = DoppelkopfGame()
+    game.reset(hands=deal)
+    game.set_variant(variant, 0)
+    for player_idx in range(1, game.num_players):
+        game.set_variant('normal', player_idx)
+
+    history = []
+    while not game.game_over:
+        player_idx = game.current_player
+        state = game.get_state_for_player(player_idx)
+        card = choose(game, player_idx)
+        history.append((player_idx, card_to_idx(card), np.asarray(state, dtype=np.float32)))
+        assert game.play_card(player_idx, card), "the relabelled card must be legal"
+    return game, history
+
+class TestAugmentation(unittest.TestCase):
+    """Test case for the suit-permutation augmentation."""
+
+    def setUp(self):
+        """Set up the augmentation tables."""
+        self.augmentation = SuitAugmentation(get_state_size(), get_action_size(), get_action_size() + 7)
+
+    def check_relabelled_game(self, variant, expected_variant, row, seed):
+        """Replay a game with relabelled cards and compare it with the augmented transitions."""
+        rng = random.Random(seed)
+        deal = generate_deals(1, seed=seed)[0]
+        game, history = play_game(deal, variant, lambda g, p: rng.choice(g.get_legal_actions(p)))
+        self.assertEqual(int(history[-1][2][VARIANT_OFFSET:VARIANT_OFFSET + 6].argmax()) + 1, expected_variant)
+
+        flips = torch.randint(0, 2, (1, 24), generator=torch.Generator().manual_seed(seed))
+        rows = torch.tensor([row])
+
+        def relabel(card_idx):
+            action = torch.tensor([card_idx])
+            state = torch.zeros((1, get_state_size()))
+            return int(self.augmentation.apply(state, action, state, torch.tensor([True]), rows, flips)[1])
+
+        mapped_deal = [[idx_to_card(relabel(card_to_idx(card))) for card in hand] for hand in deal]
+        cards = iter([relabel(card_idx) for _, card_idx, _ in history])
+        mapped_game, mapped_history = play_game(mapped_deal, variant, lambda g, p: self._pick(g, p, cards))
+
+        self.assertEqual(game.scores, mapped_game.scores)
+        self.assertEqual(game.winner, mapped_game.winner)
+
+        states = torch.tensor(np.stack([h[2] for h in history]))
+        actions = torch.tensor([h[1] for h in history])
+        batch_rows = rows.expand(len(history))
+        batch_flips = flips.expand(len(history), -1)
+        mask = torch.ones(len(history), dtype=torch.bool)
+        aug_states, aug_actions, aug_next = self.augmentation.apply(
+            states, actions, states, mask, batch_rows, batch_flips)
+
+        expected_states = torch.tensor(np.stack([h[2] for h in mapped_history]))
+        self.assertTrue(torch.equal(aug_states, expected_states))
+        self.assertTrue(torch.equal(aug_next, expected_states))
+        self.assertEqual(aug_actions.tolist(), [h[1] for h in mapped_history])
+
+    @staticmethod
+    def _pick(game, player_idx, cards):
+        """Play the next relabelled card."""
+        card_idx = next(cards)
+        return next(c for c in game.get_legal_actions(player_idx) if card_to_idx(c) == card_idx)
+
+    def test_normal_game_swaps_clubs_and_spades(self):
+        """Swapping the plain Clubs and Spades gives the same game in a normal game."""
+        row = int(self.augmentation.variant_offsets[0]) + 1
+        self.check_relabelled_game('normal', VARIANT_NORMAL, row, seed=5)
+
+    def test_queen_solo_permutes_all_suits(self):
+        """Any suit permutation of the non-Queens gives the same game in a Queen solo."""
+        row = int(self.augmentation.variant_offsets[VARIANT_QUEEN_SOLO - 1]) + 17
+        self.check_relabelled_game('queen_solo', VARIANT_QUEEN_SOLO, row, seed=11)
+
+    def test_variant_selection_is_not_permuted(self):
+        """Variant selections only get copy swaps, and announcements keep their index."""
+        state = torch.zeros((2, get_state_size()))
+        state[:, VARIANT_OFFSET + VARIANT_QUEEN_SOLO - 1] = 1
+        rows = self.augmentation.sample_rows(state, torch.tensor([get_action_size() + 2, get_action_size()]))
+        self.assertEqual(int(rows[0]), 0)
+        self.assertGreater(int(rows[1]), 0)
+
+if __name__ == "__main__":
+    unittest.main()
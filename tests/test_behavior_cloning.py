@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for behavior-cloning pretraining.
+These tests verify the masked loss, that exploratory decisions are not imitated, that the
+heuristic player can label games, and that a pretrained model warm-starts the RL agent.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.training.behavior_cloning import (
+    BehaviorCloningDataset, label_games, masked_cross_entropy, pretrain
+)
+from src.reinforcementlearning.agents.heuristic_agent import select_heuristic_action
+from src.reinforcementlearning.training.recorder import DatasetRecorder
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+
+def lowest_card(game, player_idx):
+    """A deterministic teacher: always play the legal card with the lowest index."""
+    return min(game.get_legal_actions(player_idx), key=game.card_to_idx)
+
+class TestBehaviorCloning(unittest.TestCase):
+    """Test case for the behavior-cloning pipeline."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_masked_loss_ignores_illegal_actions(self):
+        """Illegal actions do not contribute to the loss, however large their logits."""
+        logits = torch.tensor([[0.0, 0.0, 100.0]])
+        masks = torch.tensor([[True, True, False]])
+        loss = masked_cross_entropy(logits, masks, torch.tensor([0]))
+        self.assertAlmostEqual(loss.item(), torch.log(torch.tensor(2.0)).item(), places=5)
+
+    def test_pretrained_model_loads_into_agent(self):
+        """Cloning a teacher lowers the loss and produces a model RLAgent.load accepts."""
+        dataset_dir = os.path.join(self.tmp_dir.name, 'teacher')
+        num_rows = label_games(dataset_dir, lowest_card, num_games=20, seed=1, shard_size=256)
+        self.assertEqual(num_rows, 20 * 40)
+
+        dataset = BehaviorCloningDataset([dataset_dir])
+        observations, legal_masks, actions = dataset[[0, 5, 3]]
+        self.assertEqual(observations.shape, (3, get_state_size()))
+        self.assertTrue(legal_masks[torch.arange(3), actions].all())
+
+        model_path = os.path.join(self.tmp_dir.name, 'pretrained.pt')
+        first = pretrain([dataset_dir], model_path, epochs=1, batch_size=64, workers=0)
+        last = pretrain([dataset_dir], model_path, epochs=5, batch_size=64, workers=0, init_path=model_path)
+        self.assertLess(last['train_loss'], first['train_loss'])
+
+        rl_agent = RLAgent(get_state_size(), get_action_size())
+        rl_agent.load(model_path)
+
+    def test_exploratory_decisions_are_not_imitated(self):
+        """Rows recorded as exploration are left out of the training rows."""
+        dataset_dir = os.path.join(self.tmp_dir.name, 'selfplay')
+        recorder = DatasetRecorder(dataset_dir, get_state_size(), get_action_size() + 7)
+        recorder.begin_episode()
+        legal_mask = np.ones(get_action_size() + 7, dtype=bool)
+        for i in range(6):
+            recorder.record(np.zeros(get_state_size(), dtype=np.float32), legal_mask, i, 0.0, greedy=i % 3 != 0)
+        recorder.end_episode()
+        recorder.close()
+
+        dataset = BehaviorCloningDataset([dataset_dir])
+        self.assertEqual(len(dataset), 6)
+        self.assertEqual(dataset.rows.tolist(), [1, 2, 4, 5])
+
+    def test_heuristic_teacher(self):
+        """The heuristic player labels every card of its games as a greedy decision."""
+        dataset_dir = os.path.join(self.tmp_dir.name, 'heuristic')
+        num_rows = label_games(dataset_dir, select_heuristic_action, num_games=2, seed=3)
+        self.assertEqual(num_rows, 2 * 40)
+        self.assertEqual(len(BehaviorCloningDataset([dataset_dir]).rows), num_rows)
+
+if __name__ == "__main__":
+    unittest.main()
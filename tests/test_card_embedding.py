@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the card-embedding Q-network.
+These tests verify that the dense and the compact forward passes agree on real game states
+and that saved card-embedding models are recognized when they are loaded.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.agents.rl_agent import (
+    RLAgent, CardEmbeddingDQN, encode_compact_states, network_from_state_dict
+)
+from src.reinforcementlearning.agents.random_agent import select_random_action
+
+class TestCardEmbedding(unittest.TestCase):
+    """Test case for the card-embedding network."""
+
+    def setUp(self):
+        """Set up a game in the playing phase."""
+        torch.manual_seed(0)
+        self.game = DoppelkopfGame()
+        for player_idx in range(self.game.num_players):
+            self.game.set_variant('normal', player_idx)
+
+    def test_dense_and_compact_forward_agree(self):
+        """Test that both input formats give the same Q-values over a whole game."""
+        net = CardEmbeddingDQN(self.game.get_state_size(), 55)
+        dense, compact = [], []
+        while not self.game.game_over:
+            player_idx = self.game.current_player
+            dense.append(self.game.get_state_for_player(player_idx))
+            compact.append(self.game.get_compact_state_for_player(player_idx))
+            self.game.play_card(player_idx, select_random_action(self.game, player_idx))
+
+        with torch.no_grad():
+            dense_q = net(torch.tensor(dense, dtype=torch.float32))
+            compact_q = net.forward_compact(*encode_compact_states(compact))
+        self.assertTrue(torch.allclose(dense_q, compact_q, atol=1e-5))
+
+    def test_load_switches_architecture(self):
+        """Test that a default agent loads a saved card-embedding model."""
+        state_size, action_size = self.game.get_state_size(), self.game.get_action_size()
+        trained = RLAgent(state_size, action_size, network='card_embedding')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.pt')
+            trained.save(path)
+            self.assertEqual(network_from_state_dict(torch.load(path))[0], 'card_embedding')
+
+            agent = RLAgent(state_size, action_size)
+            agent.load(path)
+        self.assertEqual(agent.network, 'card_embedding')
+        self.assertIsInstance(agent.policy_net, CardEmbeddingDQN)
+
+        agent.epsilon = 0.0
+        player_idx = self.game.current_player
+        action_type, card = agent.select_action(self.game, player_idx)
+        self.assertEqual(action_type, 'card')
+        self.assertIn(card, self.game.get_legal_actions(player_idx))
+
+    def test_checkpoint_restores_architecture(self):
+        """Test that a checkpoint of a card-embedding agent restores into a default agent."""
+        state_size, action_size = self.game.get_state_size(), self.game.get_action_size()
+        trained = RLAgent(state_size, action_size, network='card_embedding')
+        agent = RLAgent(state_size, action_size)
+        agent.load_checkpoint_state(trained.get_checkpoint_state())
+        self.assertIsInstance(agent.policy_net, CardEmbeddingDQN)
+        for name, weight in trained.policy_net.state_dict().items():
+            self.assertTrue(torch.equal(weight, agent.policy_net.state_dict()[name]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable training checkpoints.
+These tests verify that a checkpoint restores the complete training state of the RL agent.
+"""
+
+import os
+import sys
+import random
+import tempfile
+import unittest
+
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.training.checkpoint import (
+    CheckpointWriter, build_checkpoint, load_checkpoint, list_checkpoints, find_latest_checkpoint
+)
+from src.reinforcementlearning.training.trainer import train
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+
+def fill_agent(rl_agent, num_transitions):
+    """Push random transitions into the agent and run a few training steps."""
+    for _ in range(num_transitions):
+        state = [random.random() for _ in range(rl_agent.state_size)]
+        next_state = [random.random() for _ in range(rl_agent.state_size)]
+        rl_agent.observe_action(state, random.randrange(rl_agent.action_size), next_state, random.random())
+        rl_agent.train()
+
+class TestCheckpoint(unittest.TestCase):
+    """Test case for the checkpoint bundle and the background writer."""
+
+    def setUp(self):
+        """Set up an agent with some training history."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rl_agent = RLAgent(get_state_size(), get_action_size(), batch_size=8)
+        fill_agent(self.rl_agent, 20)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_roundtrip_restores_training_state(self):
+        """A restored agent matches the original in every resumable component."""
+        writer = CheckpointWriter(self.tmp_dir.name)
+        writer.save(build_checkpoint(self.rl_agent, 7, {'episode_wins': [True, False]}))
+        writer.close()
+        expected_random = random.random()
+
+        restored = RLAgent(get_state_size(), get_action_size(), batch_size=8)
+        bundle = load_checkpoint(find_latest_checkpoint(self.tmp_dir.name), restored)
+
+        self.assertEqual(bundle['episode'], 7)
+        self.assertEqual(bundle['stats']['episode_wins'], [True, False])
+        self.assertEqual(restored.steps_done, self.rl_agent.steps_done)
+        self.assertEqual(restored.epsilon, self.rl_agent.epsilon)
+        self.assertEqual(len(restored.replay_buffer), len(self.rl_agent.replay_buffer))
+        for name, tensor in self.rl_agent.policy_net.state_dict().items():
+            self.assertTrue(torch.equal(tensor, restored.policy_net.state_dict()[name]))
+        self.assertEqual(restored.optimizer.state_dict()['state'].keys(),
+                         self.rl_agent.optimizer.state_dict()['state'].keys())
+
+        # The RNG state was captured before expected_random was drawn
+        self.assertEqual(random.random(), expected_random)
+
+    def test_snapshot_is_independent_of_further_training(self):
+        """Training after taking a snapshot does not change the snapshot."""
+        bundle = build_checkpoint(self.rl_agent, 1)
+        snapshot_weights = bundle['agent']['policy_net']['fc1.weight'].clone()
+        fill_agent(self.rl_agent, 10)
+        self.assertTrue(torch.equal(bundle['agent']['policy_net']['fc1.weight'], snapshot_weights))
+
+    def test_writer_keeps_last_checkpoints(self):
+        """Only the configured number of checkpoints is kept."""
+        writer = CheckpointWriter(self.tmp_dir.name, keep_last=2)
+        for episode in range(1, 5):
+            writer.save(build_checkpoint(self.rl_agent, episode))
+            writer.close()
+            writer = CheckpointWriter(self.tmp_dir.name, keep_last=2)
+        writer.close()
+
+        checkpoints = [os.path.basename(p) for p in list_checkpoints(self.tmp_dir.name)]
+        self.assertEqual(checkpoints, ['checkpoint_episode_3.pt', 'checkpoint_episode_4.pt'])
+        self.assertTrue(find_latest_checkpoint(self.tmp_dir.name).endswith('checkpoint_episode_4.pt'))
+
+    def test_trainer_checkpoints_final_episode(self):
+        """A run whose length is not a multiple of the interval still ends with a checkpoint."""
+        train(DoppelkopfGame(), self.rl_agent, [select_random_action] * 3, num_episodes=3, eval_interval=1000,
+              save_interval=1000, model_dir=self.tmp_dir.name, checkpoint_interval=2)
+
+        checkpoints = list_checkpoints(os.path.join(self.tmp_dir.name, 'checkpoints'))
+        self.assertEqual([os.path.basename(p) for p in checkpoints],
+                         ['checkpoint_episode_2.pt', 'checkpoint_episode_3.pt'])
+
+if __name__ == "__main__":
+    unittest.main()
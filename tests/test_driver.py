@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests for the training driver and its step-based environments.
+These tests verify the environment's masks and episode flow, that a vector of environments
+plays frozen opponents in batches with the same results as one environment at a time, and short
+driver runs on the in-process and worker-process backends.
+"""
+
+import os
+import sys
+import glob
+import random
+import logging
+import tempfile
+import unittest
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.backend.utils.logger as logger
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.training.envs import DoppelkopfEnv, VectorEnv, VARIANT_OFFSET, NUM_ACTIONS
+from src.reinforcementlearning.training.driver import build_config, run, run_profile
+
+class TestDriver(unittest.TestCase):
+    """Test case for the training driver."""
+
+    def test_env_episode(self):
+        """Test that an episode runs from the variant choice to the end-game reward."""
+        random.seed(3)
+        env = DoppelkopfEnv([select_random_action] * 3)
+        observation, mask = env.reset()
+        self.assertEqual(mask.shape, (NUM_ACTIONS,))
+        self.assertTrue(mask[VARIANT_OFFSET:].all())
+        self.assertFalse(mask[:VARIANT_OFFSET].any())
+
+        decisions = 0
+        done = False
+        while not done:
+            action = random.choice(np.flatnonzero(mask))
+            observation, mask, reward, done, info = env.step(action)
+            decisions += 1
+            if not done:
+                self.assertTrue(mask.any())
+                self.assertFalse(mask[VARIANT_OFFSET:].any())
+
+        # The variant, one card per trick and at most one announcement
+        tricks = len(env.game.tricks)
+        self.assertIn(decisions, (1 + tricks, 2 + tricks))
+        self.assertTrue(env.game.game_over)
+        self.assertEqual(set(info), {'final_reward', 'win', 'score_diff', 'episode_reward'})
+
+    def test_fast_forward(self):
+        """Test that forced moves are played without a decision and keep their rewards."""
+        random.seed(5)
+        env = DoppelkopfEnv([select_random_action] * 3, fast_forward=True)
+        decisions = 0
+        for _ in range(5):
+            observation, mask = env.reset()
+            done = False
+            rewards = 0.0
+            while not done:
+                # Every decision is a choice between cards or includes an announcement
+                self.assertTrue(mask.sum() > 1 or mask[VARIANT_OFFSET - 2:VARIANT_OFFSET].any())
+                observation, mask, reward, done, info = env.step(random.choice(np.flatnonzero(mask)))
+                rewards += reward
+                decisions += 1
+            self.assertEqual(len(env.game.tricks), 10)
+            self.assertAlmostEqual(rewards + info['final_reward'], info['episode_reward'], places=4)
+
+        # The trainer stores one transition per decision, not per card
+        from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+        from src.reinforcementlearning.agents.rl_agent import RLAgent
+        from src.reinforcementlearning.training.trainer import play_episode
+        game = DoppelkopfGame()
+        agent = RLAgent(game.get_state_size(), game.get_action_size(), batch_size=1000)
+        play_episode(game, agent, [select_random_action] * 3, fast_forward=True)
+        self.assertLessEqual(len(agent.replay_buffer), 1 + len(game.tricks) + 1)
+        self.assertIsNone(agent.forced_action(game, 0))
+
+    def test_vector_env_batches_frozen_opponents(self):
+        """Test that a vector of environments asks a frozen opponent for all its seats at once."""
+        from src.reinforcementlearning.agents.rl_agent import RLAgent, network_from_state_dict
+        from src.reinforcementlearning.training.league import FrozenPolicy
+        from src.backend.game.doppelkopf import get_state_size, get_action_size
+
+        state_dict = RLAgent(get_state_size(), get_action_size()).policy_net.state_dict()
+        _, output_size = network_from_state_dict(state_dict)
+        policy = FrozenPolicy(state_dict, get_state_size(), output_size, get_action_size())
+        batch_sizes = []
+        select_actions = policy.select_actions
+        policy.select_actions = lambda states, masks: batch_sizes.append(len(states)) or select_actions(states, masks)
+
+        def play(step_together):
+            random.seed(11)
+            envs = [DoppelkopfEnv([policy] * 3, fast_forward=True) for _ in range(4)]
+            vector = VectorEnv(envs)
+            observations, masks = vector.reset()
+            results = []
+            for _ in range(40):
+                # The first legal action keeps the agent's choices the same in both runs
+                actions = [int(np.flatnonzero(mask)[0]) for mask in masks]
+                if step_together:
+                    observations, masks, rewards, dones, infos = vector.step(actions)
+                else:
+                    steps = [env.step(action) for env, action in zip(envs, actions)]
+                    steps = [env.reset() + step[2:] if step[3] else step for env, step in zip(envs, steps)]
+                    observations, masks, rewards, dones, infos = zip(*steps)
+                results.append((np.stack(observations).tolist(), list(rewards), list(dones), list(infos)))
+            return results
+
+        together = play(True)
+        self.assertGreater(max(batch_sizes), 1)
+        self.assertEqual(together, play(False))
+
+    def test_config(self):
+        """Test that profiles and overrides combine and unknown settings are rejected."""
+        config = build_config('debug', {'episodes': 2, 'reward': None})
+        self.assertEqual(config['episodes'], 2)
+        self.assertEqual(config['reward'], 'shaped')
+        self.assertEqual(config['num_envs'], 1)
+        with self.assertRaises(ValueError):
+            build_config('smoke', {'backend': 'cluster'})
+        with self.assertRaises(ValueError):
+            build_config('smoke', {'unknown': 1})
+
+    def test_run_backends(self):
+        """Test short runs with games in-process and in worker processes."""
+        for backend in ('vector', 'subproc'):
+            config = build_config('smoke', {'episodes': 4, 'backend': backend, 'num_envs': 2, 'workers': 2,
+                                            'save_interval': 0, 'log_interval': 0, 'batch_size': 8,
+                                            'n_step': 3, 'seed': 0})
+            result = run(config)
+            self.assertEqual(result['episodes'], 4)
+            self.assertGreaterEqual(result['transitions'], 4 * 2)
+            self.assertGreater(len(result['learner'].agent.replay_buffer), 0)
+
+    def test_run_profile(self):
+        """Test that a profile run, as used by the training scripts, trains and saves the final model."""
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_profile('debug', episodes=2, model_dir=tmp, log_dir=os.path.join(tmp, 'logs'),
+                                 save_interval=1, verbose=False)
+            self.assertEqual(result['episodes'], 2)
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'final_model.pt')))
+
+    def test_debug_logging(self):
+        """Test that the debug profile logs every move, trick winner, reward and learner update."""
+        with tempfile.TemporaryDirectory() as tmp:
+            logger.setup_logger(tmp, level=logging.DEBUG, console=False)
+            try:
+                run(build_config('debug', {'episodes': 2, 'model_dir': tmp, 'log_dir': tmp, 'save_interval': 0,
+                                           'batch_size': 8, 'seed': 0}))
+            finally:
+                logger.shutdown()
+                logging.getLogger('doppelkopf_ai').setLevel(logging.INFO)
+            log_files = glob.glob(os.path.join(tmp, 'training_*.log'))
+            self.assertEqual(len(log_files), 1)
+            with open(log_files[0]) as f:
+                text = f.read()
+        self.assertIn('(RL agent) chooses', text)
+        self.assertIn('(RL agent) plays', text)
+        self.assertIn('(opponent) plays', text)
+        self.assertIn('won by player', text)
+        self.assertIn('Game over!', text)
+        self.assertIn('Environment 0: action', text)
+        self.assertIn('transitions: loss', text)
+
+if __name__ == '__main__':
+    unittest.main()
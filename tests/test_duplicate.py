@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for duplicate-deal evaluation.
+These tests verify the fixed deal set and complete games played through the RL game wrapper.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.training.duplicate import (
+    generate_deals, play_duplicate_game, summarize
+)
+from src.backend.game.doppelkopf import card_to_idx
+
+class TestDuplicate(unittest.TestCase):
+    """Test case for the duplicate evaluator."""
+
+    def test_deals_are_reproducible(self):
+        """The same seed gives the same deals, and every deal uses the whole deck."""
+        deals = generate_deals(5, seed=42)
+        self.assertEqual(deals, generate_deals(5, seed=42))
+        self.assertNotEqual(deals, generate_deals(5, seed=43))
+
+        for deal in deals:
+            self.assertEqual([len(hand) for hand in deal], [10, 10, 10, 10])
+            indices = sorted(card_to_idx(card) for hand in deal for card in hand)
+            self.assertEqual(len(set(indices)), 40)
+
+    def test_game_is_played_to_the_end(self):
+        """A duplicate game finishes and is reproducible for the same seed."""
+        deal = generate_deals(1, seed=7)[0]
+        result = play_duplicate_game(deal, select_random_action, select_random_action, agent_seat=2, seed=1)
+
+        self.assertEqual(result['variant'], 'NORMAL')
+        self.assertIn(result['win'], (True, False))
+        self.assertEqual(result, play_duplicate_game(deal, select_random_action, select_random_action, 2, 1))
+
+    def test_wrapper_clears_completed_tricks(self):
+        """The game wrapper plays all ten tricks and distributes all 240 points."""
+        game = DoppelkopfGame()
+        game.reset(hands=generate_deals(1, seed=3)[0])
+        for player_idx in range(game.num_players):
+            game.set_variant('normal', player_idx)
+
+        while not game.game_over:
+            player_idx = game.current_player
+            self.assertLess(len(game.current_trick), game.num_players)
+            self.assertTrue(game.play_card(player_idx, select_random_action(game, player_idx)))
+            if game.trick_winner is not None:
+                # The trick winner leads the next trick
+                self.assertEqual(game.current_player, game.trick_winner)
+
+        self.assertEqual(len(game.tricks), 10)
+        self.assertEqual(sum(game.scores), 240)
+
+    def test_summary_groups_by_deal_and_variant(self):
+        """The summary reports every game and every variant."""
+        deals = generate_deals(3, seed=0)
+        results = []
+        for deal_idx, deal in enumerate(deals):
+            for seat in range(4):
+                result = play_duplicate_game(deal, select_random_action, select_random_action, seat, deal_idx * 4 + seat)
+                result['deal'] = deal_idx
+                results.append(result)
+
+        summary = summarize(results)
+        self.assertEqual(summary['overall']['games'], 12)
+        self.assertEqual(sum(s['games'] for s in summary['by_variant'].values()), 12)
+        win_rate, ci = summary['overall']['win_rate']
+        self.assertTrue(0.0 <= win_rate <= 1.0)
+        self.assertGreaterEqual(ci, 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
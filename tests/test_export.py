@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for exporting trained models as TorchScript artifacts.
+These tests verify that float32 and int8 artifacts match the eager model and that the
+model registry serves a valid artifact instead of the checkpoint.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.training.export import (
+    artifact_path, export_model, load_artifact, load_eager_network, reference_observations, validate_artifact
+)
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+from src.backend.model_registry import load_policy
+
+class TestExport(unittest.TestCase):
+    """Test case for model export."""
+
+    def setUp(self):
+        """Create a directory for the models and a small reference set."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reference_set = reference_observations(64)
+
+    def tearDown(self):
+        """Remove the models."""
+        self.tmp.cleanup()
+
+    def save_model(self, network):
+        """Save an untrained model with the given architecture."""
+        path = os.path.join(self.tmp.name, f'{network}.pt')
+        RLAgent(get_state_size(), get_action_size(), network=network).save(path)
+        return path
+
+    def test_export_matches_eager_model(self):
+        """Test that both artifacts of both architectures pass validation after loading."""
+        for network in ('mlp', 'card_embedding'):
+            path = self.save_model(network)
+            reference = load_eager_network(path)
+            for quantized in (False, True):
+                with self.subTest(network=network, quantized=quantized):
+                    metadata = export_model(path, quantized, reference_set=self.reference_set)
+                    self.assertEqual(metadata['path'], artifact_path(path, quantized))
+
+                    module, saved = load_artifact(metadata['path'])
+                    self.assertEqual(saved['quantized'], quantized)
+                    result = validate_artifact(module, reference, quantized, self.reference_set)
+                    self.assertTrue(result['passed'], result)
+                    if not quantized:
+                        self.assertLess(result['max_error'], 1e-4)
+
+    def test_registry_prefers_artifact(self):
+        """Test that the registry loader serves the int8 artifact unless it is stale."""
+        path = self.save_model('mlp')
+        export_model(path, quantized=True, reference_set=self.reference_set)
+
+        policy = load_policy(path)
+        self.assertNotIsInstance(policy.network, type(load_eager_network(path)))
+        game = DoppelkopfGame()
+        game.variant_selection_phase = False
+        action_type, _ = policy.select_action(game, game.current_player)
+        self.assertIn(action_type, ('card', 'announce'))
+
+        # A checkpoint newer than its artifact is served as is
+        mtime = os.path.getmtime(artifact_path(path, True))
+        os.utime(path, (mtime + 10, mtime + 10))
+        self.assertIsInstance(load_policy(path).network, type(load_eager_network(path)))
+        self.assertIsInstance(load_policy(path, prefer_optimized=False).network, type(load_eager_network(path)))
+
+if __name__ == '__main__':
+    unittest.main()
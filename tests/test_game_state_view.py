@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the DoppelkopfGame view over a game state dictionary.
+These tests verify that the agents act on web-server style state dictionaries directly.
+"""
+
+import os
+import sys
+import random
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.backend.game.doppelkopf import (
+    create_game_state, set_variant, play_card, announce, get_state_for_player,
+    get_state_size, get_action_size
+)
+from src.reinforcementlearning.doppelkopf_game import GameStateView
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.agents.inference_policy import InferencePolicy
+
+class TestGameStateView(unittest.TestCase):
+    """Test case for the game state view."""
+
+    def test_view_reads_state_live(self):
+        """Test that the view exposes the state entries without copying them."""
+        state = create_game_state()
+        view = GameStateView(state)
+        self.assertIs(view.hands, state['hands'])
+        self.assertTrue(view.variant_selection_phase)
+        for i in range(state['num_players']):
+            set_variant(state, 'normal', i)
+        self.assertFalse(view.variant_selection_phase)
+        self.assertEqual(view.get_state_for_player(0), get_state_for_player(state, 0))
+        with self.assertRaises(AttributeError):
+            view.play_card
+
+    def test_agents_play_on_state_dict(self):
+        """Test that RLAgent and InferencePolicy play a full game on a state dictionary."""
+        random.seed(11)
+        agent = RLAgent(get_state_size(), get_action_size(), epsilon_start=0.0, epsilon_end=0.0)
+        policy = InferencePolicy.from_state_dict(agent.policy_net.state_dict())
+
+        state = create_game_state()
+        for i in range(state['num_players']):
+            set_variant(state, 'normal', i)
+
+        while not state['game_over']:
+            player = state['current_player']
+            action_type, action = agent.select_action(state, player)
+            self.assertEqual(policy.select_action(state, player), (action_type, action))
+            if action_type == 'announce':
+                self.assertTrue(announce(state, player, action))
+                continue
+            self.assertTrue(play_card(state, player, action))
+            if state['trick_winner'] is not None:
+                state['current_trick'] = []
+                state['current_player'] = state['trick_winner']
+                state['trick_winner'] = None
+
+if __name__ == '__main__':
+    unittest.main()
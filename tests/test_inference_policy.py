@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the inference-only serving policy.
+These tests verify that it selects the same actions as a greedy RLAgent with the same weights.
+"""
+
+import os
+import sys
+import random
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.agents.inference_policy import InferencePolicy
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+
+class TestInferencePolicy(unittest.TestCase):
+    """Test case for the inference policy."""
+
+    def test_matches_greedy_agent(self):
+        """Test that every decision of a game matches the greedy RLAgent."""
+        random.seed(7)
+        for network in ('mlp', 'card_embedding'):
+            agent = RLAgent(get_state_size(), get_action_size(), epsilon_start=0.0, epsilon_end=0.0,
+                            network=network)
+            policy = InferencePolicy.from_state_dict(agent.policy_net.state_dict())
+            self.assertFalse(hasattr(policy, 'optimizer'))
+
+            game = DoppelkopfGame()
+            game.variant_selection_phase = True
+            self.assertEqual(policy.select_action(game, 0), agent.select_action(game, 0))
+            for i in range(game.num_players):
+                game.set_variant('normal', i)
+
+            while not game.game_over:
+                player = game.current_player
+                expected = agent.select_action(game, player)
+                self.assertEqual(policy.select_action(game, player), expected)
+                action_type, action = expected
+                if action_type == 'card':
+                    game.play_card(player, action)
+                else:
+                    game.announce(player, action)
+
+if __name__ == '__main__':
+    unittest.main()
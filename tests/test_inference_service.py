@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-batching inference service.
+These tests verify that concurrent requests are answered in shared batches with the same
+actions as unbatched inference, and that the metrics count them.
+"""
+
+import os
+import sys
+import unittest
+import threading
+import numpy as np
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import DQN
+from src.reinforcementlearning.agents.inference_policy import InferencePolicy
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.backend.game.doppelkopf import get_state_size
+from src.backend.inference_service import InferenceService, BatchedPolicy
+
+class TestInferenceService(unittest.TestCase):
+    """Test case for the inference service."""
+
+    def setUp(self):
+        """Create a policy and a service running its network."""
+        self.policy = InferencePolicy(DQN(get_state_size(), 55))
+        self.service = InferenceService(self.policy.network, max_batch_size=8, max_wait_us=50000)
+
+    def tearDown(self):
+        """Stop the service."""
+        self.service.close()
+
+    def test_concurrent_requests(self):
+        """Test that concurrent requests share forward passes and get their own masked argmax."""
+        rng = np.random.default_rng(0)
+        observations = rng.random((16, get_state_size()), dtype=np.float32)
+        masks = rng.random((16, 55)) < 0.3
+        masks[:, 0] = True
+        results = [None] * 16
+
+        def request(i):
+            results[i] = self.service.submit(observations[i], masks[i]).result(timeout=5)
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with torch.no_grad():
+            q_values = self.policy.network(torch.from_numpy(observations)).numpy()
+        expected = np.where(masks, q_values, -np.inf).argmax(axis=1)
+        self.assertEqual(results, expected.tolist())
+
+        stats = self.service.stats()
+        self.assertEqual(stats['requests'], 16)
+        self.assertLess(stats['batches'], 16)
+        self.assertLessEqual(max(stats['batch_sizes']), 8)
+        self.assertIn('p95', stats)
+
+    def test_batched_policy(self):
+        """Test that the batched policy plays like the inference policy."""
+        batched = BatchedPolicy(self.policy, self.service)
+        game = DoppelkopfGame()
+        for i in range(game.num_players):
+            game.set_variant('normal', i)
+        while not game.game_over:
+            player = game.current_player
+            action = batched.select_action(game, player)
+            self.assertEqual(action, self.policy.select_action(game, player))
+            if action[0] == 'card':
+                game.play_card(player, action[1])
+            else:
+                game.announce(player, action[1])
+
+if __name__ == '__main__':
+    unittest.main()
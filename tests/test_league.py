@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the self-play league.
+These tests verify that snapshots rotate through a bounded pool, that opponents are sampled
+towards recent and strong snapshots, that results survive a restart of the training, and that
+frozen snapshots choose the same cards in a batch as one at a time.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent, network_from_state_dict
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.training.league import League, FrozenPolicy, POOL_INDEX
+from src.reinforcementlearning.training.trainer import train
+from src.backend.game.doppelkopf import get_state_size, get_action_size, card_to_idx
+
+class TestLeague(unittest.TestCase):
+    """Test case for the self-play league."""
+
+    def setUp(self):
+        """Create an agent and a pool directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pool_dir = os.path.join(self.tmp.name, 'pool')
+        self.rl_agent = RLAgent(get_state_size(), get_action_size())
+
+    def tearDown(self):
+        """Remove the pool directory."""
+        self.tmp.cleanup()
+
+    def test_snapshots_rotate(self):
+        """Test that a snapshot is taken every interval and the oldest ones are removed."""
+        league = League(self.rl_agent, self.pool_dir, snapshot_interval=2, max_size=2)
+        for episode in range(1, 7):
+            league.begin_episode(episode)
+            league.end_episode(False)
+
+        self.assertEqual([entry['episode'] for entry in league.pool], [4, 6])
+        snapshots = sorted(name for name in os.listdir(self.pool_dir) if name.endswith('.pt'))
+        self.assertEqual(snapshots, ['snapshot_episode_4.pt', 'snapshot_episode_6.pt'])
+
+    def test_sample_weights(self):
+        """Test that recent snapshots and snapshots the agent loses against are sampled more often."""
+        league = League(self.rl_agent, self.pool_dir, recency_decay=0.5)
+        league.pool = [{'name': f's{i}', 'episode': i, 'games': 0, 'agent_wins': 0} for i in range(3)]
+        weights = league.sample_weights()
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertTrue(np.all(np.diff(weights) > 0))
+
+        league.pool[2].update(games=20, agent_wins=20)
+        league.pool[1].update(games=20, agent_wins=0)
+        weights = league.sample_weights()
+        self.assertGreater(weights[1], weights[2])
+
+    def test_seats_play_assigned_policies(self):
+        """Test that each opponent seat plays the policy the league assigned to it."""
+        league = League(self.rl_agent, self.pool_dir, random_prob=0.0)
+        seats = league.seats(3)
+        league.begin_episode(1)
+        self.assertTrue(all(isinstance(league.policy_for_seat(seat), FrozenPolicy) for seat in range(3)))
+
+        game = DoppelkopfGame()
+        for i in range(game.num_players):
+            game.set_variant('normal', i)
+        player = game.current_player
+        self.assertIn(seats[0].select_action(game, player), game.get_legal_actions(player))
+        league.end_episode(True)
+
+        league.random_prob = 1.0
+        league.begin_episode(2)
+        self.assertIs(league.policy_for_seat(1), select_random_action)
+
+    def test_training_results_survive_restart(self):
+        """Test that the trainer plays league seats and the pool index keeps the results after training."""
+        league = League(self.rl_agent, self.pool_dir, random_prob=0.0)
+        game = DoppelkopfGame()
+        train(game, self.rl_agent, league.seats(game.num_players - 1), num_episodes=3, eval_interval=1000,
+              save_interval=1000, model_dir=os.path.join(self.tmp.name, 'models'))
+        self.assertEqual(sum(entry['games'] for entry in league.pool), 3)
+
+        # Fewer than 100 results are only written by the flush at the end of training
+        with open(os.path.join(self.pool_dir, POOL_INDEX)) as f:
+            self.assertEqual(json.load(f), league.pool)
+        restarted = League(self.rl_agent, self.pool_dir)
+        self.assertEqual(restarted.pool, league.pool)
+
+    def test_batched_actions_match_single(self):
+        """Test that select_actions picks the cards select_action picks one observation at a time."""
+        state_dict = self.rl_agent.policy_net.state_dict()
+        _, output_size = network_from_state_dict(state_dict)
+        policy = FrozenPolicy(state_dict, get_state_size(), output_size, get_action_size())
+        game = DoppelkopfGame()
+        game.reset()
+        for i in range(game.num_players):
+            game.set_variant('normal', i)
+        states, masks, single = [], [], []
+        while not game.game_over:
+            player = game.current_player
+            mask = np.zeros(get_action_size(), dtype=bool)
+            for card in game.get_legal_actions(player):
+                mask[card_to_idx(card)] = True
+            states.append(np.asarray(game.get_state_for_player(player), dtype=np.float32))
+            masks.append(mask)
+            card = policy.select_action(game, player)
+            single.append(card_to_idx(card))
+            game.play_card(player, card)
+
+        self.assertEqual(policy.select_actions(np.stack(states), np.stack(masks)).tolist(), single)
+
+if __name__ == '__main__':
+    unittest.main()
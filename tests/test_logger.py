@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the training logger.
+These tests verify that queued records reach the rotating log file, that disabled levels
+are skipped, that the file is rotated and that forked processes write to their own file.
+"""
+
+import os
+import sys
+import glob
+import logging
+import tempfile
+import multiprocessing
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.backend.utils.logger as logger
+
+class TestLogger(unittest.TestCase):
+    """Test case for the queue-based logger."""
+
+    def setUp(self):
+        """Create a temporary log directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Stop the listener and remove the log directory."""
+        logger.shutdown()
+        self.tmp_dir.cleanup()
+
+    def test_lazy_messages_reach_file(self):
+        """Test that enabled messages are formatted and written, and disabled ones are skipped."""
+        log_file = logger.setup_logger(self.tmp_dir.name, console=False)
+        self.assertFalse(logger.is_enabled_for(logging.DEBUG))
+        logger.info("Episode %d - Win Rate: %.2f", 7, 0.5)
+        logger.debug("Player %d plays card #%d", 1, 2)
+        logger.info("100% literal")
+        logger.shutdown()
+
+        with open(log_file) as f:
+            content = f.read()
+        self.assertIn("Episode 7 - Win Rate: 0.50", content)
+        self.assertIn("100% literal", content)
+        self.assertNotIn("plays card", content)
+
+    def test_rotation(self):
+        """Test that the log file is rotated when it reaches its maximum size."""
+        log_file = logger.setup_logger(self.tmp_dir.name, level=logging.DEBUG, console=False,
+                                       max_bytes=1000, backup_count=2)
+        self.assertTrue(logger.is_enabled_for(logging.DEBUG))
+        for i in range(200):
+            logger.debug("Line %d of the rotation test", i)
+        logger.shutdown()
+
+        self.assertEqual(len(glob.glob(f"{log_file}.*")), 2)
+        self.assertLessEqual(os.path.getsize(log_file), 1000)
+
+    @unittest.skipUnless(hasattr(os, 'register_at_fork'), "requires os.register_at_fork")
+    def test_forked_process_has_own_file(self):
+        """Test that a forked process logs to a file of its own instead of rotating the parent's."""
+        log_file = logger.setup_logger(self.tmp_dir.name, console=False)
+        logger.info("Parent before the fork")
+        process = multiprocessing.get_context('fork').Process(target=_log_in_child)
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        logger.info("Parent after the fork")
+        logger.shutdown()
+
+        with open(log_file) as f:
+            content = f.read()
+        self.assertIn("Parent before the fork", content)
+        self.assertIn("Parent after the fork", content)
+        self.assertNotIn("Child", content)
+
+        root, ext = os.path.splitext(log_file)
+        child_file = f"{root}_pid{process.pid}{ext}"
+        with open(child_file) as f:
+            content = f.read()
+        self.assertIn(f"Child {process.pid} logging", content)
+        self.assertNotIn("Parent", content)
+
+def _log_in_child():
+    """Log from a forked process and write the record before exiting."""
+    logger.info("Child %d logging", os.getpid())
+    logger.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
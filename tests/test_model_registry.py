@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the web server's model registry.
+These tests verify that a checkpoint is loaded once, shared between seat handles and
+loaded again when the file changes, and that a broken new version is not swapped in.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+from src.backend.model_registry import ModelRegistry, load_policy
+
+class TestModelRegistry(unittest.TestCase):
+    """Test case for the model registry."""
+
+    def setUp(self):
+        """Save a model and create a registry that counts its loads."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'model.pt')
+        RLAgent(get_state_size(), get_action_size()).save(self.path)
+        self.loads = []
+
+        def counting_loader(path):
+            self.loads.append(path)
+            return load_policy(path)
+
+        self.registry = ModelRegistry(counting_loader)
+
+    def tearDown(self):
+        """Remove the saved model."""
+        self.tmp.cleanup()
+
+    def test_loaded_once_and_shared(self):
+        """Test that all seat handles share one loaded agent."""
+        first = self.registry.policy(self.path)
+        second = self.registry.policy(self.path)
+        self.assertEqual(len(self.loads), 1)
+        self.assertIs(first.model.policy, second.model.policy)
+        self.assertEqual(first.model.policy.epsilon, 0.0)
+
+        game = DoppelkopfGame()
+        game.variant_selection_phase = False
+        action_type, _ = first.select_action(game, game.current_player)
+        self.assertIn(action_type, ('card', 'announce'))
+
+    def test_reload_on_change(self):
+        """Test that a rewritten checkpoint is loaded again and old handles keep their version."""
+        old = self.registry.policy(self.path)
+        mtime = os.path.getmtime(self.path)
+        os.utime(self.path, (mtime + 10, mtime + 10))
+
+        new = self.registry.policy(self.path)
+        self.assertEqual(len(self.loads), 2)
+        self.assertIsNot(old.model.policy, new.model.policy)
+        self.assertEqual(old.version[1], mtime)
+        self.assertEqual(self.registry.loaded(), {os.path.abspath(self.path): mtime + 10})
+
+    def test_rejected_version_keeps_serving(self):
+        """Test that a broken new version is rejected and the loaded version stays in service."""
+        old = self.registry.policy(self.path)
+        with open(self.path, 'wb') as f:
+            f.write(b'not a model')
+        mtime = os.path.getmtime(self.path)
+        os.utime(self.path, (mtime + 10, mtime + 10))
+
+        self.assertIs(self.registry.policy(self.path).model, old.model)
+        self.assertIs(self.registry.policy(self.path).model, old.model)
+        self.assertEqual(len(self.loads), 2)
+        self.assertIsNotNone(self.registry.stats()[os.path.abspath(self.path)]['rejected'])
+
+    def test_watcher_swaps_new_version(self):
+        """Test that the watcher swaps in a rewritten checkpoint while old handles keep theirs."""
+        old = self.registry.policy(self.path)
+        mtime = os.path.getmtime(self.path)
+        os.utime(self.path, (mtime + 10, mtime + 10))
+
+        self.registry.watch(interval=0.01)
+        try:
+            for _ in range(500):
+                if self.registry.loaded()[os.path.abspath(self.path)] == mtime + 10:
+                    break
+                time.sleep(0.01)
+        finally:
+            self.registry.stop_watching()
+        self.assertEqual(len(self.loads), 2)
+        self.assertEqual(self.registry.policy(self.path).version[1], mtime + 10)
+        self.assertEqual(old.version[1], mtime)
+
+    def test_batching(self):
+        """Test that with batching the shared model answers through an inference service."""
+        self.registry.enable_batching(max_batch_size=4, max_wait_us=100)
+        handle = self.registry.policy(self.path)
+        game = DoppelkopfGame()
+        for i in range(game.num_players):
+            game.set_variant('normal', i)
+        handle.select_action(game, game.current_player)
+
+        stats = self.registry.stats()[os.path.abspath(self.path)]
+        self.assertEqual(stats['inference']['requests'], 1)
+        handle.model.policy.service.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for packed observation storage.
+These tests verify that packing is lossless for the game's observations, that observations
+packed with the older float16 score layout are upgraded, and that the packed replay buffer and
+datasets return the same batches as the float32 storage.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.agents.rl_agent import RLAgent, ReplayBuffer, PackedReplayBuffer
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.training.packing import (
+    PACKED_SIZE, NUM_BIT_BYTES, SCORE_INDICES, pack_observations, unpack_observations, upgrade_packed_observations
+)
+from src.reinforcementlearning.training.recorder import DatasetRecorder, DatasetReader
+
+def game_observations():
+    """Observations of all players over one complete random game."""
+    game = DoppelkopfGame()
+    for player_idx in range(game.num_players):
+        game.set_variant('normal', player_idx)
+    observations = []
+    while not game.game_over:
+        player_idx = game.current_player
+        observations.append(np.asarray(game.get_state_for_player(player_idx), dtype=np.float32))
+        game.play_card(player_idx, select_random_action(game, player_idx))
+    return np.stack(observations)
+
+class TestPacking(unittest.TestCase):
+    """Test case for packed observations."""
+
+    def test_roundtrip_matches_observations(self):
+        """Unpacking restores every observation of a game exactly, scores included."""
+        observations = game_observations()
+        packed = pack_observations(observations)
+        self.assertEqual(packed.shape, (len(observations), PACKED_SIZE))
+        self.assertEqual(packed.dtype, np.uint8)
+
+        unpacked = unpack_observations(packed).numpy()
+        self.assertTrue(np.array_equal(unpacked, observations))
+        self.assertTrue(((unpacked == 0) | (unpacked == 1))[:, :157].all())
+        self.assertGreater(unpacked[-1, SCORE_INDICES].sum(), 0)
+
+    def test_scores_beyond_card_points(self):
+        """Bonus points can take a score below 0 or above 240; those are packed exactly too."""
+        observation = game_observations()[-1]
+        for re_score, kontra_score in ((-3, 243), (241, -1), (0, 240), (121, 119)):
+            observation[SCORE_INDICES] = np.array([re_score, kontra_score], dtype=np.float32) / np.float32(240)
+            unpacked = unpack_observations(pack_observations(observation)[None]).numpy()[0]
+            self.assertTrue(np.array_equal(unpacked, observation))
+
+    def test_upgrade_float16_scores(self):
+        """Observations packed with float16 scores are converted to the exact layout."""
+        observations = game_observations()
+        old_packed = pack_observations(observations)
+        old_packed[:, NUM_BIT_BYTES:] = np.ascontiguousarray(observations[:, SCORE_INDICES], dtype=np.float16).view(np.uint8)
+
+        upgraded = upgrade_packed_observations(old_packed, 1)
+        self.assertTrue(np.array_equal(upgraded, pack_observations(observations)))
+        self.assertIs(upgrade_packed_observations(upgraded, 2), upgraded)
+
+        # A replay checkpoint from before the packing version was stored
+        buffer = PackedReplayBuffer(100)
+        for i in range(len(observations)):
+            buffer.push(observations[i], 0, None, 0.0)
+        buffer_state = buffer.get_state()
+        buffer_state['states'] = old_packed
+        del buffer_state['packing_version']
+        restored = PackedReplayBuffer(100)
+        restored.load_state(buffer_state)
+        self.assertTrue(np.array_equal(restored.states[:len(observations)], upgraded))
+
+    def test_packed_buffer_samples_like_tensor_buffer(self):
+        """Both replay buffers return the same batch for the same stored transitions."""
+        observations = game_observations()
+        packed_buffer = PackedReplayBuffer(100)
+        tensor_buffer = ReplayBuffer(100)
+        for i in range(len(observations) - 1):
+            next_state = observations[i + 1] if i < len(observations) - 2 else None
+            packed_buffer.push(observations[i], i % 48, next_state, float(i))
+            tensor_buffer.push(torch.tensor(observations[i]), torch.tensor([i % 48]),
+                               torch.tensor(next_state) if next_state is not None else None,
+                               torch.tensor([float(i)]))
+
+        batch_size = len(packed_buffer)
+        states, actions, rewards, mask, next_states, discounts = packed_buffer.sample_batch(batch_size)
+        order = torch.argsort(rewards)
+        self.assertTrue(torch.equal(rewards[order], torch.arange(batch_size, dtype=torch.float32)))
+        expected = tensor_buffer.sample_batch(batch_size)
+        expected_order = torch.argsort(expected[2])
+        self.assertTrue(torch.equal(states[order], expected[0][expected_order]))
+        self.assertTrue(torch.equal(actions[order], expected[1][expected_order]))
+        self.assertEqual(int(mask.sum()), batch_size - 1)
+        self.assertEqual(len(next_states), batch_size - 1)
+        self.assertTrue(torch.equal(discounts, expected[5]))
+
+    def test_packed_buffer_checkpoint_roundtrip(self):
+        """A packed buffer survives a checkpoint and can be restored into a tensor buffer."""
+        rl_agent = RLAgent(161, 48, batch_size=4)
+        observations = game_observations()
+        for i in range(len(observations) - 1):
+            rl_agent.observe_action(observations[i], i % 48, observations[i + 1], 1.0)
+            rl_agent.train()
+        self.assertIsInstance(rl_agent.replay_buffer, PackedReplayBuffer)
+
+        checkpoint_state = rl_agent.get_checkpoint_state()
+        restored = RLAgent(161, 48, batch_size=4)
+        restored.load_checkpoint_state(checkpoint_state)
+        self.assertTrue(np.array_equal(restored.replay_buffer.states[:len(observations) - 1],
+                                       rl_agent.replay_buffer.states[:len(observations) - 1]))
+
+        unpacked_agent = RLAgent(161, 48, batch_size=4, packed_replay=False)
+        unpacked_agent.load_checkpoint_state(checkpoint_state)
+        self.assertEqual(len(unpacked_agent.replay_buffer), len(rl_agent.replay_buffer))
+        self.assertIsNotNone(unpacked_agent.train())
+
+    def test_dataset_stores_packed_observations(self):
+        """Datasets with the game's layout are stored packed and read back as float32."""
+        observations = game_observations()
+        with tempfile.TemporaryDirectory() as dataset_dir:
+            recorder = DatasetRecorder(dataset_dir, observations.shape[1], 55)
+            recorder.begin_episode()
+            for observation in observations:
+                recorder.record(observation, np.ones(55, dtype=bool), 0, 0.0)
+            recorder.end_episode()
+            recorder.close()
+
+            reader = DatasetReader(dataset_dir)
+            self.assertTrue(reader.packed)
+            self.assertEqual(reader.shard_arrays(0)['observations'].dtype, np.uint8)
+            batch = reader.get_batch(np.arange(len(observations)))
+            self.assertEqual(batch['observations'].dtype, np.float32)
+            self.assertTrue(np.array_equal(batch['observations'], observations))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the training-loop phase profiler.
+These tests verify that an instrumented training episode records every phase.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.training.profiler import PhaseProfiler, NULL_PROFILER
+from src.reinforcementlearning.training.trainer import play_episode
+
+class TestProfiler(unittest.TestCase):
+    """Test case for the phase profiler."""
+
+    def test_episode_records_phases(self):
+        """Playing an instrumented episode times the engine, the agent and the learner."""
+        game = DoppelkopfGame()
+        rl_agent = RLAgent(game.get_state_size(), game.get_action_size(), batch_size=4)
+        profiler = PhaseProfiler(report_interval=1000)
+        rl_agent.profiler = profiler
+
+        # Transitions reach the replay buffer at the end of an episode, so learning starts in the second
+        for _ in range(2):
+            game.reset()
+            play_episode(game, rl_agent, [select_random_action] * 3, profiler)
+
+        for name in ('engine_step', 'get_state', 'select_action', 'opponent', 'observe', 'learn'):
+            self.assertGreater(profiler.phase(name).calls, 0, name)
+        self.assertGreater(profiler.phase('learn.backprop').calls, 0)
+        self.assertGreater(profiler._counters['transitions'], 0)
+        self.assertIn('transitions/s', profiler.report())
+
+    def test_null_profiler_is_inert(self):
+        """The disabled profiler accepts every call and records nothing."""
+        with NULL_PROFILER.phase('anything'):
+            NULL_PROFILER.count('transitions')
+        NULL_PROFILER.begin_episode(1)
+        NULL_PROFILER.end_episode(1)
+        self.assertFalse(NULL_PROFILER.enabled)
+
+if __name__ == "__main__":
+    unittest.main()
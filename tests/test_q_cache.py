@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the Q-value cache.
+These tests verify the LRU eviction and counters, that cached policies choose the same
+actions as uncached ones, and that the model registry drops the entries of a replaced model.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.agents.inference_policy import InferencePolicy
+from src.reinforcementlearning.agents.q_cache import QValueCache
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+from src.backend.model_registry import ModelRegistry
+
+class TestQValueCache(unittest.TestCase):
+    """Test case for the Q-value cache."""
+
+    def setUp(self):
+        """Save a model."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'model.pt')
+        RLAgent(get_state_size(), get_action_size()).save(self.path)
+
+    def tearDown(self):
+        """Remove the saved model."""
+        self.tmp.cleanup()
+
+    def new_game(self):
+        """Create a normal game in which the first player has a choice of cards."""
+        game = DoppelkopfGame()
+        for player_idx in range(game.num_players):
+            game.set_variant('normal', player_idx)
+        return game
+
+    def test_lru_eviction_and_counters(self):
+        """Test that the least recently used entry is evicted and lookups are counted."""
+        cache = QValueCache(max_size=2)
+        observations = np.eye(3, get_state_size(), dtype=np.float32)
+        keys = [cache.key(observation, 'v1') for observation in observations]
+        self.assertNotEqual(keys[0], cache.key(observations[0], 'v2'))
+
+        cache.put(keys[0], np.zeros(4))
+        cache.put(keys[1], np.ones(4))
+        self.assertIsNotNone(cache.get(keys[0]))
+        cache.put(keys[2], np.ones(4))
+
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertEqual(cache.stats(), {'entries': 2, 'hits': 2, 'misses': 1, 'hit_rate': 2 / 3})
+
+    def test_cached_policy_matches_uncached(self):
+        """Test that repeated observations are answered from the cache with the same actions."""
+        cache = QValueCache()
+        uncached = InferencePolicy.load(self.path)
+        cached = InferencePolicy(uncached.network, cache=cache, version='v1')
+
+        game = self.new_game()
+        for _ in range(3):
+            self.assertEqual(cached.select_action(game, game.current_player),
+                             uncached.select_action(game, game.current_player))
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_registry_invalidates_replaced_model(self):
+        """Test that the registry drops the cached Q-values of a rewritten checkpoint."""
+        registry = ModelRegistry()
+        registry.enable_cache(max_size=16)
+        game = self.new_game()
+
+        old = registry.policy(self.path)
+        old.select_action(game, game.current_player)
+        self.assertEqual(registry.cache_stats()['entries'], 1)
+
+        mtime = os.path.getmtime(self.path)
+        os.utime(self.path, (mtime + 10, mtime + 10))
+        new = registry.policy(self.path)
+        self.assertEqual(registry.cache_stats()['entries'], 0)
+        self.assertIs(new.model.policy.cache, registry.cache)
+        self.assertNotEqual(new.model.policy.version, old.model.policy.version)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for episode-level return computation.
+These tests compare the vectorized n-step and lambda-returns with step-by-step references
+and check that an agent writes a whole episode, including the end-game reward, to its buffer.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.training.returns import EpisodeAccumulator, n_step_returns, lambda_returns
+
+class TestReturns(unittest.TestCase):
+    """Test case for n-step and lambda-returns."""
+
+    def setUp(self):
+        """Set up a random episode."""
+        rng = np.random.default_rng(0)
+        self.rewards = rng.normal(size=12)
+        self.values = rng.normal(size=12)
+        self.gamma = 0.9
+
+    def test_n_step_returns_match_loop(self):
+        """Test the n-step returns against a direct sum."""
+        n_step = 3
+        returns, bootstrap, has_next, discounts = n_step_returns(self.rewards, self.gamma, n_step)
+        length = len(self.rewards)
+        for t in range(length):
+            end = min(t + n_step, length)
+            expected = sum(self.gamma ** (k - t) * self.rewards[k] for k in range(t, end))
+            self.assertAlmostEqual(returns[t], expected)
+            self.assertEqual(has_next[t], t + n_step < length)
+            self.assertEqual(bootstrap[t], end - 1)
+            self.assertAlmostEqual(discounts[t], self.gamma ** n_step if has_next[t] else 0.0)
+
+    def test_lambda_returns_match_recursion(self):
+        """Test the lambda-returns against the backward recursion."""
+        for lam in (0.0, 0.7, 1.0):
+            expected = np.zeros(len(self.rewards))
+            following = 0.0
+            for t in reversed(range(len(self.rewards))):
+                next_value = self.values[t] if t < len(self.rewards) - 1 else 0.0
+                following = self.rewards[t] + self.gamma * ((1 - lam) * next_value + lam * following)
+                expected[t] = following
+            np.testing.assert_allclose(lambda_returns(self.rewards, self.values, self.gamma, lam), expected)
+
+    def test_accumulator_adds_final_reward(self):
+        """Test that the end-game reward reaches the last, terminal transition."""
+        accumulator = EpisodeAccumulator(self.gamma)
+        for t in range(4):
+            accumulator.add(np.full(3, t), t, np.full(3, t + 1), 1.0)
+        batch = accumulator.finish(final_reward=10.0)
+        np.testing.assert_allclose(batch['rewards'], [1.0, 1.0, 1.0, 11.0])
+        np.testing.assert_array_equal(batch['has_next'], [True, True, True, False])
+        np.testing.assert_array_equal(batch['next_states'][0], np.full(3, 1))
+        self.assertEqual(len(accumulator), 0)
+
+    def test_agent_writes_episode_at_end(self):
+        """Test that an agent pushes the episode's n-step transitions in one batch."""
+        rl_agent = RLAgent(161, 48, gamma=self.gamma, n_step=2)
+        rl_agent.begin_episode()
+        for t in range(5):
+            state = np.zeros(161, dtype=np.float32)
+            state[t] = 1.0
+            rl_agent.observe_action(state, t, state, 1.0)
+        self.assertEqual(len(rl_agent.replay_buffer), 0)
+
+        rl_agent.end_episode(final_reward=5.0)
+        self.assertEqual(len(rl_agent.replay_buffer), 5)
+        _, actions, rewards, mask, _, discounts = rl_agent.replay_buffer.sample_batch(5)
+        by_action = {int(a): (float(r), bool(m), float(d)) for a, r, m, d in zip(actions, rewards, mask, discounts)}
+        self.assertAlmostEqual(by_action[0][0], 1.0 + self.gamma, places=5)
+        self.assertAlmostEqual(by_action[0][2], self.gamma ** 2, places=5)
+        self.assertAlmostEqual(by_action[3][0], 1.0 + self.gamma * 6.0, places=5)
+        self.assertEqual(by_action[3][1:], (False, 0.0))
+        self.assertAlmostEqual(by_action[4][0], 6.0)
+
+    def test_train_on_lambda_returns_without_packing(self):
+        """Test that training on lambda-returns, which never bootstrap, works with the unpacked buffer."""
+        rl_agent = RLAgent(161, 48, gamma=self.gamma, td_lambda=0.9, packed_replay=False, batch_size=4)
+        rl_agent.begin_episode()
+        for t in range(6):
+            state = np.zeros(161, dtype=np.float32)
+            state[t] = 1.0
+            rl_agent.observe_action(state, t, state, 1.0)
+        rl_agent.end_episode(final_reward=5.0)
+
+        _, _, _, mask, next_states, _ = rl_agent.replay_buffer.sample_batch(4)
+        self.assertFalse(mask.any())
+        self.assertEqual(tuple(next_states.shape), (0, 161))
+        self.assertTrue(np.isfinite(rl_agent.train()))
+
+if __name__ == '__main__':
+    unittest.main()
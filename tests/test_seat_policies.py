@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the seat-policy experiments of the web server.
+These tests verify that policy specs are resolved once, that new games are split across
+arms by weight, and that outcomes are aggregated per arm and per policy.
+"""
+
+import os
+import sys
+import random
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.agents.random_agent import select_random_action
+from src.reinforcementlearning.agents.heuristic_agent import select_heuristic_action
+from src.reinforcementlearning.doppelkopf_game import DoppelkopfGame
+from src.backend.game.doppelkopf import get_state_size, get_action_size
+from src.backend.model_registry import ModelRegistry
+from src.backend.seat_policies import Arm, SeatPolicyExperiment, ExperimentStats
+
+class TestSeatPolicies(unittest.TestCase):
+    """Test case for seat-policy experiments."""
+
+    def setUp(self):
+        """Save a model and create a registry."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'model.pt')
+        RLAgent(get_state_size(), get_action_size()).save(self.path)
+        self.registry = ModelRegistry()
+
+    def tearDown(self):
+        """Remove the saved model."""
+        self.tmp.cleanup()
+
+    def test_resolve_and_validate(self):
+        """Test that specs resolve to shared policies and invalid arms are rejected."""
+        experiment = SeatPolicyExperiment.default(self.path, 3, self.registry)
+        self.assertEqual(experiment.arms[0].seats, [f'rl:{self.path}', 'random', 'random'])
+        self.assertIs(experiment.create_policy('random'), select_random_action)
+        first = experiment.create_policy(f'rl:{self.path}')
+        second = experiment.create_policy(f'rl:{self.path}')
+        self.assertIs(first.model, second.model)
+
+        with self.assertRaises(ValueError):
+            SeatPolicyExperiment([Arm('a', 1, ['pimc', 'random', 'random'])], 3, self.registry)
+        with self.assertRaises(ValueError):
+            SeatPolicyExperiment([Arm('a', 1, ['random', 'random'])], 3, self.registry)
+        with self.assertRaises(ValueError):
+            SeatPolicyExperiment([Arm('a', 1, ['rl', 'random', 'random'])], 3, self.registry)
+
+    def test_weighted_split(self):
+        """Test that new games are split across the arms by weight."""
+        arms = [Arm('control', 3, ['random']), Arm('candidate', 1, ['heuristic']), Arm('off', 0, ['random'])]
+        experiment = SeatPolicyExperiment(arms, 1, self.registry, rng=random.Random(0))
+        names = [experiment.assign().name for _ in range(4000)]
+        self.assertNotIn('off', names)
+        self.assertAlmostEqual(names.count('candidate') / len(names), 0.25, delta=0.03)
+
+    def test_stats_per_arm_and_policy(self):
+        """Test that finished games are aggregated per arm and per seat policy."""
+        stats = ExperimentStats()
+        game = {'teams': [0, 1, 0, 1], 'winner': 1, 'player_game_points': [-1, 1, -1, 1]}
+        stats.record(game, {'arm': 'candidate', 'seats': {1: 'heuristic', 2: 'random', 3: 'heuristic'}})
+
+        summary = stats.summary()
+        self.assertEqual(summary['arms']['candidate']['games'], 1)
+        self.assertEqual(summary['arms']['candidate']['ai_seat_wins'], 2)
+        self.assertEqual(summary['policies']['heuristic']['win_rate'], 1.0)
+        self.assertEqual(summary['policies']['random']['mean_game_points'], -1)
+
+    def test_heuristic_plays_legal_cards(self):
+        """Test that the heuristic policy finishes games with legal cards only."""
+        game = DoppelkopfGame()
+        for i in range(game.num_players):
+            game.set_variant('normal', i)
+        while not game.game_over:
+            player = game.current_player
+            self.assertTrue(game.play_card(player, select_heuristic_action(game, player)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the hyperparameter sweep runner.
+These tests verify the search-space expansion, the early-stopping rule and a tiny sweep
+on the process pool.
+"""
+
+import os
+import sys
+import csv
+import tempfile
+import unittest
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.training.sweep import (
+    parse_param, grid_trials, random_trials, should_stop, run_sweep, RESULTS_FILE
+)
+
+class TestSweep(unittest.TestCase):
+    """Test case for the sweep runner."""
+
+    def test_search_space(self):
+        """Test grid expansion and random draws."""
+        space = dict([parse_param('learning_rate=0.001,0.0005'), parse_param('network=mlp,card_embedding')])
+        self.assertEqual(space['learning_rate'], [0.001, 0.0005])
+        self.assertEqual(len(grid_trials(space)), 4)
+
+        space.update([parse_param('gamma=uniform:0.9:0.99'), parse_param('batch_size=int:16:64')])
+        with self.assertRaises(ValueError):
+            grid_trials(space)
+        trials = random_trials(space, 20, seed=1)
+        self.assertEqual(trials, random_trials(space, 20, seed=1))
+        for trial in trials:
+            self.assertTrue(0.9 <= trial['gamma'] <= 0.99)
+            self.assertIsInstance(trial['batch_size'], int)
+            self.assertIn(trial['network'], ('mlp', 'card_embedding'))
+        with self.assertRaises(ValueError):
+            parse_param('unknown=1,2')
+
+    def test_median_stopping(self):
+        """Test that a trial below the other trials' median is stopped."""
+        progress = {(100, 1): 0.5, (100, 2): 0.6, (200, 1): 0.1}
+        self.assertFalse(should_stop(progress, 0, 100, 0.2))
+        progress[(100, 3)] = 0.55
+        self.assertTrue(should_stop(progress, 0, 100, 0.2))
+        self.assertFalse(should_stop(progress, 0, 100, 0.58))
+        self.assertFalse(should_stop(progress, 0, 100, 0.2, median_min_trials=0))
+        self.assertTrue(should_stop({}, 0, 100, 0.2, min_win_rate=0.3))
+
+    def test_run_sweep(self):
+        """Test a tiny sweep end to end."""
+        trials = grid_trials({'learning_rate': [0.001, 0.01]})
+        with tempfile.TemporaryDirectory() as sweep_dir:
+            rows = run_sweep(trials, sweep_dir, episodes=2, eval_interval=2, eval_deals=1, workers=1)
+            self.assertEqual(sorted(r['trial'] for r in rows), [0, 1])
+            self.assertTrue(all(0.0 <= r['win_rate'] <= 1.0 for r in rows))
+            self.assertTrue(os.path.exists(os.path.join(sweep_dir, 'trial_000', 'final_model.pt')))
+            with open(os.path.join(sweep_dir, RESULTS_FILE)) as f:
+                self.assertEqual(len(list(csv.DictReader(f))), 2)
+
+if __name__ == '__main__':
+    unittest.main()
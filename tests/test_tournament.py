@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the checkpoint tournament.
+These tests verify the Elo bookkeeping, that rerunning a tournament only schedules the
+matches of newly added checkpoints, and that the trainer's resumable checkpoints are rated.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+import torch
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reinforcementlearning.agents.rl_agent import RLAgent
+from src.reinforcementlearning.training.checkpoint import CheckpointWriter, build_checkpoint, load_policy_state_dict
+from src.reinforcementlearning.training.tournament import (
+    RatingStore, discover_checkpoints, expected_score, run_tournament, promote_best,
+    INITIAL_RATING, DEFAULT_DB_NAME
+)
+
+class TestTournament(unittest.TestCase):
+    """Test case for the checkpoint tournament."""
+
+    def test_elo_update_is_zero_sum(self):
+        """Test that a match moves both ratings by the same amount in opposite directions."""
+        self.assertAlmostEqual(expected_score(1000, 1000), 0.5)
+        self.assertGreater(expected_score(1200, 1000), 0.5)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = RatingStore(os.path.join(tmp_dir, 'ratings.sqlite'))
+            store.add_player('a', 'a.pt')
+            store.add_player('b', 'b.pt')
+            self.assertFalse(store.add_player('a', 'a.pt'))
+            rating_a, rating_b = store.record_match(
+                {'player_a': 'a', 'player_b': 'b', 'seed': 0, 'deals': 10,
+                 'wins': 7, 'draws': 1, 'losses': 2, 'point_diff': 3.0}, k_factor=4.0)
+            self.assertAlmostEqual(rating_a, INITIAL_RATING + 4.0 * (7.5 - 5.0))
+            self.assertAlmostEqual(rating_a + rating_b, 2 * INITIAL_RATING)
+            self.assertTrue(store.has_match('b', 'a', 0, 10))
+            self.assertFalse(store.has_match('a', 'b', 1, 10))
+            store.close()
+
+    def test_only_new_checkpoints_are_scheduled(self):
+        """Test that a rerun plays only the matches of an added checkpoint."""
+        torch.manual_seed(0)
+        with tempfile.TemporaryDirectory() as model_dir:
+            for episode in (10, 2):
+                RLAgent(161, 48).save(os.path.join(model_dir, f"model_episode_{episode}.pt"))
+            self.assertEqual([name for name, _ in discover_checkpoints(model_dir)],
+                             ['model_episode_2', 'model_episode_10'])
+
+            ratings = run_tournament(model_dir, deals=1, workers=1)
+            self.assertEqual(len(ratings), 3)
+            self.assertTrue(all(r['games'] == 2 for r in ratings))
+
+            RLAgent(161, 48).save(os.path.join(model_dir, "model_episode_20.pt"))
+            ratings = run_tournament(model_dir, deals=1, workers=1)
+            conn = sqlite3.connect(os.path.join(model_dir, DEFAULT_DB_NAME))
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0], 6)
+            conn.close()
+            self.assertTrue(all(r['games'] == 3 for r in ratings))
+
+            best = promote_best(ratings, os.path.join(model_dir, 'promoted', 'final_model.pt'))
+            self.assertIsNotNone(best)
+            self.assertTrue(os.path.exists(os.path.join(model_dir, 'promoted', 'final_model.pt')))
+
+    def test_ratings_are_reproducible(self):
+        """Test that parallel runs on the same deal set give the same ratings."""
+        torch.manual_seed(0)
+        with tempfile.TemporaryDirectory() as model_dir:
+            for episode in (1, 2, 3):
+                RLAgent(161, 48).save(os.path.join(model_dir, f"model_episode_{episode}.pt"))
+            runs = [run_tournament(model_dir, db_path=os.path.join(model_dir, f"run{i}.sqlite"), deals=2, workers=3)
+                    for i in range(2)]
+            self.assertEqual([(r['name'], r['rating']) for r in runs[0]],
+                             [(r['name'], r['rating']) for r in runs[1]])
+
+    def test_resumable_checkpoints_are_rated(self):
+        """Test that a CheckpointWriter bundle in checkpoints/ is rated and promoted as a model."""
+        torch.manual_seed(0)
+        with tempfile.TemporaryDirectory() as model_dir:
+            agent = RLAgent(161, 48)
+            agent.save(os.path.join(model_dir, "model_episode_1.pt"))
+            writer = CheckpointWriter(os.path.join(model_dir, "checkpoints"))
+            writer.save(build_checkpoint(agent, 2, {'episode_rewards': [1.0, 2.0]}))
+            writer.close()
+            self.assertEqual([name for name, _ in discover_checkpoints(model_dir)],
+                             ['model_episode_1', 'checkpoints/checkpoint_episode_2'])
+            self.assertEqual(discover_checkpoints(model_dir, include_resumable=False),
+                             [('model_episode_1', os.path.join(model_dir, "model_episode_1.pt"))])
+
+            ratings = run_tournament(model_dir, deals=1, workers=1, include_random=False)
+            self.assertEqual(len(ratings), 2)
+            self.assertTrue(all(r['games'] == 1 for r in ratings))
+
+            bundle = next(r for r in ratings if r['name'].startswith('checkpoints/'))
+            target = os.path.join(model_dir, 'promoted.pt')
+            promote_best([bundle], target)
+            promoted = torch.load(target, map_location='cpu', weights_only=True)
+            for key, value in agent.policy_net.state_dict().items():
+                self.assertTrue(torch.equal(promoted[key], value))
+            self.assertEqual(load_policy_state_dict(bundle['path']).keys(), promoted.keys())
+
+if __name__ == '__main__':
+    unittest.main()